@@ -4,7 +4,7 @@ Combines keyword detection + pattern memory + LLM consensus + local ML for maxim
 """
 import logging
 from typing import Dict, List, Optional, Any
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, asdict
 
 from utils.patterns import (
     URGENCY_KEYWORDS, FINANCIAL_KEYWORDS, AUTHORITY_KEYWORDS,
@@ -391,7 +391,7 @@ class EnhancedScamDetector:
             tactics=tactics,
             scammer_type=scammer_type,
             reasoning=reasoning,
-            pattern_matches=[m.__dict__ if hasattr(m, '__dict__') else m for m in memory_result["matches"]],
+            pattern_matches=[asdict(m) if isinstance(m, PatternMatch) else m for m in memory_result["matches"]],
             times_seen_before=memory_result["times_seen"],
             llm_consensus=llm_result.get("consensus")
         )
@@ -588,10 +588,8 @@ class EnhancedScamDetector:
     
     async def _get_llm_consensus(self, message: str) -> Dict:
         """Get consensus from multi-LLM ensemble (with caching for concurrent requests)."""
-        import hashlib
-        
         # Create cache key from message
-        cache_key = hashlib.sha256(message.strip().lower().encode()).hexdigest()[:32]
+        cache_key = llm_detection_cache.make_key(message)
         
         async def execute_detection():
             return await multi_llm_detector.detect_with_ensemble(message)
@@ -10,9 +10,12 @@ Supported FREE LLMs:
 - Cohere - Command models
 """
 import asyncio
+import json
 import logging
+import time
 import httpx
-from typing import Dict, List, Optional, Any, Tuple
+from collections import Counter
+from typing import Dict, List, Optional, Any, Tuple, Callable, Awaitable
 from dataclasses import dataclass
 from enum import Enum
 
@@ -20,6 +23,25 @@ from config import settings
 
 logger = logging.getLogger(__name__)
 
+# Optional provider SDKs - imported once here rather than on every call
+try:
+    from groq import AsyncGroq
+except ImportError:
+    AsyncGroq = None
+
+try:
+    from google import genai
+except ImportError:
+    genai = None
+
+# HTTP/2 multiplexes concurrent requests to one host over a single connection.
+# Requires the optional `h2` package (httpx[http2]); fall back to HTTP/1.1 without it.
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
 
 class LLMProvider(str, Enum):
     POLLINATIONS = "pollinations"  # Priority 1 - No rate limits, new endpoint!
@@ -30,7 +52,7 @@ class LLMProvider(str, Enum):
     COHERE = "cohere"
 
 
-@dataclass
+@dataclass(slots=True)
 class LLMResponse:
     """Response from an LLM."""
     provider: LLMProvider
@@ -62,27 +84,184 @@ Respond in this exact JSON format:
 JSON Response:"""
 
 
+SCAM_DETECTION_BATCH_PROMPT = """You are an expert fraud detection AI. Analyze each of the following messages and determine if it's a scam.
+
+MESSAGES (JSON array, analyze each element independently):
+{messages}
+
+Analyze each message for urgency tactics, authority impersonation, financial requests,
+suspicious URLs or contact info, emotional manipulation and too-good-to-be-true offers.
+
+Respond with ONLY a JSON array containing one object per message, in this exact format:
+[{{"index": 0, "is_scam": true/false, "confidence": 0.0-1.0, "scam_type": "banking/upi/phishing/lottery/job/impersonation/other/none", "reasoning": "brief explanation"}}, ...]
+
+JSON Response:"""
+
+# Messages packed into one batched provider call
+BATCH_SIZE = 16
+
+# Upper bound on startup warmup; DNS lookups have no timeout of their own
+WARMUP_TIMEOUT_SEC = 5.0
+
+# Output tokens for one compact object in a batch response array
+BATCH_ITEM_MAX_TOKENS = 80
+
+
+# OpenAI-compatible providers: (chat completions URL, model, max_tokens).
+# Model may be a callable so settings are read at call time.
+_OPENAI_COMPAT_PROVIDERS: Dict[LLMProvider, Tuple[str, Any, int]] = {
+    LLMProvider.POLLINATIONS: ("https://gen.pollinations.ai/v1/chat/completions", "openai", 500),
+    LLMProvider.CEREBRAS: ("https://api.cerebras.ai/v1/chat/completions", lambda: settings.CEREBRAS_MODEL, 200),
+    LLMProvider.TOGETHER: ("https://api.together.xyz/v1/chat/completions", "meta-llama/Llama-3-70b-chat-hf", 200),
+}
+
+# Ceiling on a batched call's max_tokens; Together's Llama-3-70b has an 8k context
+# shared with the prompt. Items that do not fit fall back to single calls.
+_BATCH_MAX_TOKENS: Dict[LLMProvider, int] = {
+    LLMProvider.POLLINATIONS: 2048,
+    LLMProvider.CEREBRAS: 2048,
+    LLMProvider.TOGETHER: 1024,
+}
+
+
+@dataclass(slots=True, frozen=True)
+class _Keys:
+    """Provider API keys, resolved from settings once at import."""
+    pollinations: Optional[str]
+    cerebras: Optional[str]
+    groq: Optional[str]
+    gemini: Optional[str]
+    together: Optional[str]
+    cohere: Optional[str]
+
+
+_KEYS = _Keys(
+    pollinations=getattr(settings, 'POLLINATIONS_API_KEY', None),
+    cerebras=getattr(settings, 'CEREBRAS_API_KEY', None),
+    groq=settings.GROQ_API_KEY,
+    gemini=settings.GEMINI_API_KEY,
+    together=getattr(settings, 'TOGETHER_API_KEY', None),
+    cohere=getattr(settings, 'COHERE_API_KEY', None),
+)
+
+_COHERE_URL = "https://api.cohere.ai/v1/chat"
+
+
 class MultiLLMDetector:
     """
     Multi-LLM ensemble for scam detection.
     Uses consensus from multiple models for higher accuracy.
     """
     
-    def __init__(self):
+    __slots__ = (
+        'pollinations_key', 'cerebras_key', 'groq_key', 'gemini_key',
+        'together_key', 'cohere_key', 'timeout', '_client',
+        '_groq_client', '_genai_client', '_detectors'
+    )
+    
+    def __init__(self, keys: _Keys = _KEYS):
         # API Keys - Priority Order: Pollinations → Cerebras → Groq → Gemini
-        self.pollinations_key = getattr(settings, 'POLLINATIONS_API_KEY', None)
-        self.cerebras_key = getattr(settings, 'CEREBRAS_API_KEY', None)
-        self.groq_key = settings.GROQ_API_KEY
-        self.gemini_key = settings.GEMINI_API_KEY
-        self.together_key = getattr(settings, 'TOGETHER_API_KEY', None)
-        self.cohere_key = getattr(settings, 'COHERE_API_KEY', None)
+        self.pollinations_key = keys.pollinations
+        self.cerebras_key = keys.cerebras
+        self.groq_key = keys.groq
+        self.gemini_key = keys.gemini
+        self.together_key = keys.together
+        self.cohere_key = keys.cohere
         
         self.timeout = 15.0
+        
+        # Shared client so connections (and TLS sessions) are reused across calls
+        self._client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            timeout=self.timeout,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=64)
+        )
+        
+        # SDK clients are built once; constructing them parses env and sets up transports
+        self._groq_client = None
+        self._genai_client = None
+        if self.groq_key and AsyncGroq is not None:
+            try:
+                self._groq_client = AsyncGroq(api_key=self.groq_key)
+            except Exception as e:
+                logger.warning(f"Failed to initialize Groq: {e}")
+        if self.gemini_key and genai is not None:
+            try:
+                self._genai_client = genai.Client(api_key=self.gemini_key)
+            except Exception as e:
+                logger.warning(f"Failed to initialize Gemini: {e}")
+        
+        # Key set is fixed for the process lifetime, so resolve the enabled
+        # detectors once - Priority Order: Pollinations → Cerebras → Groq → Gemini
+        candidates = (
+            (LLMProvider.POLLINATIONS, self.pollinations_key, self._detect_pollinations),
+            (LLMProvider.CEREBRAS, self.cerebras_key, self._detect_cerebras),
+            (LLMProvider.GROQ, self.groq_key, self._detect_groq),
+            (LLMProvider.GEMINI, self.gemini_key, self._detect_gemini),
+            (LLMProvider.TOGETHER, self.together_key, self._detect_together),
+            (LLMProvider.COHERE, self.cohere_key, self._detect_cohere),
+        )
+        self._detectors: Tuple[Tuple[LLMProvider, Callable[[str], Awaitable[LLMResponse]]], ...] = tuple(
+            (provider, detector) for provider, key, detector in candidates if key
+        )
+    
+    def _configured_hosts(self) -> Dict[str, bool]:
+        """Map each configured provider host to whether we reach it over HTTP ourselves."""
+        hosts = {}
+        for provider, (url, _, _) in _OPENAI_COMPAT_PROVIDERS.items():
+            if getattr(self, f"{provider.value}_key", None):
+                hosts[url] = True
+        if self.cohere_key:
+            hosts[_COHERE_URL] = True
+        # Groq and Gemini go through their SDKs; only their DNS can be primed
+        if self.groq_key:
+            hosts["https://api.groq.com"] = False
+        if self.gemini_key:
+            hosts["https://generativelanguage.googleapis.com"] = False
+        return hosts
+    
+    async def warmup(self) -> None:
+        """
+        Pre-resolve and pre-connect configured provider hosts.
+        
+        Called once at application startup so the first real detection
+        does not pay for DNS lookup and TLS handshake. Failures are ignored,
+        and startup never waits longer than WARMUP_TIMEOUT_SEC.
+        """
+        hosts = self._configured_hosts()
+        if not hosts:
+            return
+        
+        loop = asyncio.get_running_loop()
+        lookups = [
+            loop.getaddrinfo(httpx.URL(url).host, 443)
+            for url in hosts
+        ]
+        connects = [
+            self._client.head(url, timeout=5.0)
+            for url, direct in hosts.items() if direct
+        ]
+        try:
+            results = await asyncio.wait_for(
+                asyncio.gather(*lookups, *connects, return_exceptions=True),
+                timeout=WARMUP_TIMEOUT_SEC
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"LLM provider warmup timed out after {WARMUP_TIMEOUT_SEC}s, continuing")
+            return
+        
+        failed = sum(1 for r in results if isinstance(r, Exception))
+        logger.info(f"LLM provider warmup: {len(hosts)} hosts, {failed} failures")
+    
+    async def aclose(self) -> None:
+        """Close the shared HTTP client."""
+        await self._client.aclose()
     
     async def detect_with_ensemble(
         self, 
         message: str,
-        min_consensus: int = 2
+        min_consensus: int = 2,
+        verbose: bool = True
     ) -> Dict[str, Any]:
         """
         Run scam detection across multiple LLMs and return consensus.
@@ -90,51 +269,15 @@ class MultiLLMDetector:
         Args:
             message: Message to analyze
             min_consensus: Minimum LLMs that must agree
+            verbose: Include per-provider responses and combined reasoning
             
         Returns:
             Ensemble result with consensus confidence
         """
-        # Get available LLMs - Priority Order: Pollinations → Cerebras → Groq → Gemini
-        tasks = []
-        providers = []
-        
-        # Priority 1: Pollinations (No rate limits, new endpoint working!)
-        if self.pollinations_key:
-            tasks.append(self._detect_pollinations(message))
-            providers.append(LLMProvider.POLLINATIONS)
-        
-        # Priority 2: Cerebras (Llama 3.3 70B - fast and reliable)
-        if self.cerebras_key:
-            tasks.append(self._detect_cerebras(message))
-            providers.append(LLMProvider.CEREBRAS)
-        
-        # Priority 3: Groq (Fast inference)
-        if self.groq_key:
-            tasks.append(self._detect_groq(message))
-            providers.append(LLMProvider.GROQ)
-        
-        # Priority 4: Gemini (High rate limit backup)
-        if self.gemini_key:
-            tasks.append(self._detect_gemini(message))
-            providers.append(LLMProvider.GEMINI)
-        
-        # Optional: Together, Cohere
-        if self.together_key:
-            tasks.append(self._detect_together(message))
-            providers.append(LLMProvider.TOGETHER)
+        if not self._detectors:
+            return self._no_consensus("No LLM APIs configured")
         
-        if self.cohere_key:
-            tasks.append(self._detect_cohere(message))
-            providers.append(LLMProvider.COHERE)
-        
-        if not tasks:
-            return {
-                "ensemble_confidence": 0.0,
-                "is_scam": False,
-                "consensus_reached": False,
-                "responses": [],
-                "error": "No LLM APIs configured"
-            }
+        tasks = [detector(message) for _, detector in self._detectors]
         
         # Run all detections in parallel
         responses = await asyncio.gather(*tasks, return_exceptions=True)
@@ -143,34 +286,108 @@ class MultiLLMDetector:
         successful_responses = []
         for i, response in enumerate(responses):
             if isinstance(response, Exception):
-                logger.error(f"{providers[i]} failed: {response}")
+                logger.error(f"{self._detectors[i][0]} failed: {response}")
             elif isinstance(response, LLMResponse) and response.success:
                 successful_responses.append(response)
         
         if not successful_responses:
-            return {
-                "ensemble_confidence": 0.0,
-                "is_scam": False,
-                "consensus_reached": False,
-                "responses": [],
-                "error": "All LLM calls failed"
-            }
+            return self._no_consensus("All LLM calls failed")
         
         # Calculate consensus
-        return self._calculate_consensus(successful_responses, min_consensus)
+        return self._calculate_consensus(successful_responses, min_consensus, verbose)
+    
+    async def detect_batch(
+        self,
+        messages: List[str],
+        min_consensus: int = 2,
+        verbose: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Run ensemble detection over many messages with batched provider calls.
+        
+        OpenAI-compatible providers receive up to BATCH_SIZE messages per
+        request; SDK-based providers (Groq, Gemini) and Cohere are called
+        per message.
+        
+        Args:
+            messages: Messages to analyze
+            min_consensus: Minimum LLMs that must agree
+            verbose: Include per-provider responses and combined reasoning
+            
+        Returns:
+            One ensemble result per message, in input order
+        """
+        if not messages:
+            return []
+        
+        chunks = [messages[i:i + BATCH_SIZE] for i in range(0, len(messages), BATCH_SIZE)]
+        tasks = []
+        
+        for provider, detector in self._detectors:
+            if provider in _OPENAI_COMPAT_PROVIDERS:
+                tasks.extend(self._detect_openai_compat_batch(provider, chunk) for chunk in chunks)
+            else:
+                tasks.extend(self._detect_chunk_individually(detector, chunk) for chunk in chunks)
+        
+        if not tasks:
+            return [self._no_consensus("No LLM APIs configured") for _ in messages]
+        
+        # Each task returns one LLMResponse per message in its chunk, chunks in order
+        per_message: List[List[LLMResponse]] = [[] for _ in messages]
+        chunk_results = await asyncio.gather(*tasks)
+        for task_index, chunk_responses in enumerate(chunk_results):
+            offset = (task_index % len(chunks)) * BATCH_SIZE
+            for i, response in enumerate(chunk_responses):
+                if response.success:
+                    per_message[offset + i].append(response)
+        
+        return [
+            self._calculate_consensus(responses, min_consensus, verbose) if responses
+            else self._no_consensus("All LLM calls failed")
+            for responses in per_message
+        ]
+    
+    @staticmethod
+    def _no_consensus(error: str) -> Dict[str, Any]:
+        """Ensemble result when no LLM produced a usable answer."""
+        return {
+            "ensemble_confidence": 0.0,
+            "is_scam": False,
+            "consensus_reached": False,
+            "responses": [],
+            "error": error
+        }
     
     def _calculate_consensus(
         self, 
         responses: List[LLMResponse],
-        min_consensus: int
+        min_consensus: int,
+        verbose: bool = True
     ) -> Dict[str, Any]:
-        """Calculate ensemble consensus from multiple LLM responses."""
+        """
+        Calculate ensemble consensus from multiple LLM responses.
+        
+        With verbose=False only the aggregate fields are returned, skipping
+        the per-provider response dicts and combined reasoning string.
+        """
+        
+        # Single pass over responses: votes, confidence, scam types and reasoning
+        scam_votes = 0
+        total_confidence = 0.0
+        type_counts: Counter = Counter()
+        reasonings = []
+        for r in responses:
+            if r.is_scam:
+                scam_votes += 1
+            total_confidence += r.confidence
+            if r.scam_type and r.scam_type != "none":
+                type_counts[r.scam_type] += 1
+            if verbose:
+                reasonings.append(f"[{r.provider.value}] {r.reasoning}")
         
-        scam_votes = sum(1 for r in responses if r.is_scam)
         total_votes = len(responses)
         
         # Weighted average confidence
-        total_confidence = sum(r.confidence for r in responses)
         avg_confidence = total_confidence / total_votes
         
         # Consensus reached if majority agrees (>= for tie-breaker in favor of scam detection)
@@ -184,13 +401,9 @@ class MultiLLMDetector:
             avg_confidence = avg_confidence * 0.8
         
         # Get most common scam type
-        scam_types = [r.scam_type for r in responses if r.scam_type and r.scam_type != "none"]
-        most_common_type = max(set(scam_types), key=scam_types.count) if scam_types else None
+        most_common_type = type_counts.most_common(1)[0][0] if type_counts else None
         
-        # Combine reasoning
-        reasonings = [f"[{r.provider.value}] {r.reasoning}" for r in responses]
-        
-        return {
+        result = {
             "ensemble_confidence": round(avg_confidence, 3),
             "is_scam": is_scam,
             "consensus_reached": consensus_strength >= (min_consensus / total_votes),
@@ -200,8 +413,11 @@ class MultiLLMDetector:
                 "scam": scam_votes,
                 "not_scam": total_votes - scam_votes,
                 "total": total_votes
-            },
-            "responses": [
+            }
+        }
+        
+        if verbose:
+            result["responses"] = [
                 {
                     "provider": r.provider.value,
                     "is_scam": r.is_scam,
@@ -210,84 +426,147 @@ class MultiLLMDetector:
                     "response_time_ms": r.response_time_ms
                 }
                 for r in responses
-            ],
-            "combined_reasoning": "\n".join(reasonings)
+            ]
+            result["combined_reasoning"] = "\n".join(reasonings)
+        
+        return result
+    
+    @staticmethod
+    def _elapsed_ms(start: float) -> int:
+        """Milliseconds since a time.monotonic() start mark."""
+        return int((time.monotonic() - start) * 1000)
+    
+    def _ok(self, provider: LLMProvider, start: float, result: Dict[str, Any]) -> LLMResponse:
+        """Build a successful LLMResponse from a parsed LLM result."""
+        return LLMResponse(
+            provider=provider,
+            is_scam=result.get("is_scam", False),
+            confidence=result.get("confidence", 0.5),
+            scam_type=result.get("scam_type"),
+            reasoning=result.get("reasoning", ""),
+            response_time_ms=self._elapsed_ms(start),
+            success=True
+        )
+    
+    def _fail(self, provider: LLMProvider, start: float, error: Any, reasoning: str = "") -> LLMResponse:
+        """Build a failed LLMResponse."""
+        return LLMResponse(
+            provider=provider,
+            is_scam=False,
+            confidence=0.0,
+            scam_type=None,
+            reasoning=reasoning,
+            response_time_ms=self._elapsed_ms(start),
+            success=False,
+            error=str(error)
+        )
+    
+    async def _chat_completion(self, provider: LLMProvider, prompt: str, max_tokens: int) -> str:
+        """POST a prompt to an OpenAI-compatible provider and return the reply text."""
+        url, model, _ = _OPENAI_COMPAT_PROVIDERS[provider]
+        api_key = getattr(self, f"{provider.value}_key", None)
+        
+        # Set up headers with Bearer token auth
+        headers = {"Content-Type": "application/json"}
+        if api_key:
+            headers["Authorization"] = f"Bearer {api_key}"
+        
+        payload = {
+            "model": model() if callable(model) else model,
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": 0.1,
+            "max_tokens": max_tokens
         }
+        
+        response = await self._client.post(url, json=payload, headers=headers)
+        response.raise_for_status()
+        
+        # Parse OpenAI-compatible response
+        data = response.json()
+        return data["choices"][0]["message"]["content"]
     
-    async def _detect_pollinations(self, message: str) -> LLMResponse:
-        """Detect scam using Pollinations.ai - OpenAI-compatible endpoint."""
-        import time
-        start = time.time()
+    async def _detect_openai_compat(self, provider: LLMProvider, message: str) -> LLMResponse:
+        """Detect scam using any OpenAI-compatible chat completions endpoint."""
+        start = time.monotonic()
+        max_tokens = _OPENAI_COMPAT_PROVIDERS[provider][2]
         
         try:
-            # Build the prompt for scam detection
-            prompt = SCAM_DETECTION_PROMPT.format(message=message)
-            
-            # Use POST to OpenAI-compatible endpoint (new gen.pollinations.ai API)
-            url = "https://gen.pollinations.ai/v1/chat/completions"
-            
-            # Set up headers with Bearer token auth
-            headers = {"Content-Type": "application/json"}
-            if self.pollinations_key:
-                headers["Authorization"] = f"Bearer {self.pollinations_key}"
+            content = await self._chat_completion(
+                provider, SCAM_DETECTION_PROMPT.format(message=message), max_tokens
+            )
+            llm_response = self._ok(provider, start, self._parse_llm_response(content))
             
-            payload = {
-                "model": "openai",  # OpenAI model via Pollinations
-                "messages": [{"role": "user", "content": prompt}],
-                "temperature": 0.1,
-                "max_tokens": 500
-            }
+            logger.info(f"{provider.value} succeeded: is_scam={llm_response.is_scam}, conf={llm_response.confidence}, time={llm_response.response_time_ms}ms")
+            return llm_response
+        except Exception as e:
+            logger.error(f"{provider.value} detection failed: {e}")
+            return self._fail(provider, start, e)
+    
+    async def _detect_openai_compat_batch(
+        self,
+        provider: LLMProvider,
+        messages: List[str]
+    ) -> List[LLMResponse]:
+        """Detect scams for several messages with one OpenAI-compatible call."""
+        start = time.monotonic()
+        
+        max_tokens = min(BATCH_ITEM_MAX_TOKENS * len(messages), _BATCH_MAX_TOKENS[provider])
+        results: Dict[int, Dict[str, Any]] = {}
+        
+        prompt = SCAM_DETECTION_BATCH_PROMPT.format(
+            messages=json.dumps(messages, ensure_ascii=False)
+        )
+        try:
+            content = await self._chat_completion(provider, prompt, max_tokens)
+        except httpx.HTTPError as e:
+            # Rate limits, timeouts and HTTP errors would hit single calls too;
+            # fail the chunk and leave it to the rest of the ensemble
+            logger.error(f"{provider.value} batch detection failed: {e}")
+            return [self._fail(provider, start, e) for _ in messages]
+        
+        try:
+            for item in self._parse_llm_batch_response(content):
+                index = item.get("index")
+                if isinstance(index, int) and 0 <= index < len(messages):
+                    results[index] = item
             
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(url, json=payload, headers=headers)
-                response.raise_for_status()
-                
-                # Parse OpenAI-compatible response
-                data = response.json()
-                content = data["choices"][0]["message"]["content"]
-                result = self._parse_llm_response(content)
-                elapsed = int((time.time() - start) * 1000)
-                
-                logger.info(f"Pollinations succeeded: is_scam={result.get('is_scam')}, conf={result.get('confidence')}, time={elapsed}ms")
-                
-                return LLMResponse(
-                    provider=LLMProvider.POLLINATIONS,
-                    is_scam=result.get("is_scam", False),
-                    confidence=result.get("confidence", 0.5),
-                    scam_type=result.get("scam_type"),
-                    reasoning=result.get("reasoning", ""),
-                    response_time_ms=elapsed,
-                    success=True
-                )
+            logger.info(f"{provider.value} batch: {len(results)}/{len(messages)} parsed, time={self._elapsed_ms(start)}ms")
         except Exception as e:
-            elapsed = int((time.time() - start) * 1000)
-            logger.error(f"Pollinations detection failed: {e}")
-            return LLMResponse(
-                provider=LLMProvider.POLLINATIONS,
-                is_scam=False,
-                confidence=0.0,
-                scam_type=None,
-                reasoning="",
-                response_time_ms=elapsed,
-                success=False,
-                error=str(e)
-            )
+            logger.warning(f"{provider.value} batch response unparseable, falling back to single calls: {e}")
+        
+        responses = {index: self._ok(provider, start, result) for index, result in results.items()}
+        
+        # Fall back to single-message calls for anything the batch answered unusably
+        missing = [i for i in range(len(messages)) if i not in responses]
+        fallback = await asyncio.gather(*(
+            self._detect_openai_compat(provider, messages[i]) for i in missing
+        ))
+        responses.update(zip(missing, fallback))
+        
+        return [responses[i] for i in range(len(messages))]
+    
+    async def _detect_chunk_individually(self, detector, messages: List[str]) -> List[LLMResponse]:
+        """Run a single-message detector over each message in a chunk."""
+        return list(await asyncio.gather(*(detector(message) for message in messages)))
+    
+    async def _detect_pollinations(self, message: str) -> LLMResponse:
+        """Detect scam using Pollinations.ai - OpenAI-compatible endpoint."""
+        return await self._detect_openai_compat(LLMProvider.POLLINATIONS, message)
     
     async def _detect_gemini(self, message: str) -> LLMResponse:
         """Detect scam using Gemini (new google.genai package) with 10s timeout."""
-        import time
-        start = time.time()
+        start = time.monotonic()
+        
+        if self._genai_client is None:
+            return self._fail(LLMProvider.GEMINI, start, "Gemini client not available")
         
         try:
-            from google import genai
-            
-            client = genai.Client(api_key=self.gemini_key)
             prompt = SCAM_DETECTION_PROMPT.format(message=message)
             
             # Add 10 second timeout to prevent blocking
             response = await asyncio.wait_for(
                 asyncio.to_thread(
-                    client.models.generate_content,
+                    self._genai_client.models.generate_content,
                     model=settings.GEMINI_MODEL,
                     contents=prompt,
                     config={
@@ -298,236 +577,87 @@ class MultiLLMDetector:
                 timeout=10.0
             )
             
-            result = self._parse_llm_response(response.text)
-            elapsed = int((time.time() - start) * 1000)
-            
-            return LLMResponse(
-                provider=LLMProvider.GEMINI,
-                is_scam=result.get("is_scam", False),
-                confidence=result.get("confidence", 0.5),
-                scam_type=result.get("scam_type"),
-                reasoning=result.get("reasoning", ""),
-                response_time_ms=elapsed,
-                success=True
-            )
+            return self._ok(LLMProvider.GEMINI, start, self._parse_llm_response(response.text))
         except asyncio.TimeoutError:
-            elapsed = int((time.time() - start) * 1000)
             logger.warning(f"Gemini timed out after 10s")
-            return LLMResponse(
-                provider=LLMProvider.GEMINI,
-                is_scam=False,
-                confidence=0.0,
-                scam_type=None,
-                reasoning="Timeout",
-                response_time_ms=elapsed,
-                success=False,
-                error="Timeout after 10s"
-            )
+            return self._fail(LLMProvider.GEMINI, start, "Timeout after 10s", reasoning="Timeout")
         except Exception as e:
-            elapsed = int((time.time() - start) * 1000)
             logger.error(f"Gemini detection failed: {e}")
-            return LLMResponse(
-                provider=LLMProvider.GEMINI,
-                is_scam=False,
-                confidence=0.0,
-                scam_type=None,
-                reasoning="",
-                response_time_ms=elapsed,
-                success=False,
-                error=str(e)
-            )
+            return self._fail(LLMProvider.GEMINI, start, e)
     
     async def _detect_groq(self, message: str) -> LLMResponse:
         """Detect scam using Groq."""
-        import time
-        start = time.time()
+        start = time.monotonic()
+        
+        if self._groq_client is None:
+            return self._fail(LLMProvider.GROQ, start, "Groq client not available")
         
         try:
-            from groq import Groq
-            client = Groq(api_key=self.groq_key)
-            
             prompt = SCAM_DETECTION_PROMPT.format(message=message)
             
-            response = await asyncio.to_thread(
-                client.chat.completions.create,
+            response = await self._groq_client.chat.completions.create(
                 model=settings.GROQ_MODEL,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.1,
                 max_tokens=200
             )
             
-            result = self._parse_llm_response(response.choices[0].message.content)
-            elapsed = int((time.time() - start) * 1000)
-            
-            return LLMResponse(
-                provider=LLMProvider.GROQ,
-                is_scam=result.get("is_scam", False),
-                confidence=result.get("confidence", 0.5),
-                scam_type=result.get("scam_type"),
-                reasoning=result.get("reasoning", ""),
-                response_time_ms=elapsed,
-                success=True
-            )
+            return self._ok(LLMProvider.GROQ, start, self._parse_llm_response(response.choices[0].message.content))
         except Exception as e:
-            elapsed = int((time.time() - start) * 1000)
-            return LLMResponse(
-                provider=LLMProvider.GROQ,
-                is_scam=False,
-                confidence=0.0,
-                scam_type=None,
-                reasoning="",
-                response_time_ms=elapsed,
-                success=False,
-                error=str(e)
-            )
+            return self._fail(LLMProvider.GROQ, start, e)
     
     async def _detect_together(self, message: str) -> LLMResponse:
         """Detect scam using Together AI."""
-        import time
-        start = time.time()
-        
-        try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    "https://api.together.xyz/v1/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {self.together_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": "meta-llama/Llama-3-70b-chat-hf",
-                        "messages": [{"role": "user", "content": SCAM_DETECTION_PROMPT.format(message=message)}],
-                        "temperature": 0.1,
-                        "max_tokens": 200
-                    }
-                )
-                response.raise_for_status()
-                data = response.json()
-                
-                result = self._parse_llm_response(data["choices"][0]["message"]["content"])
-                elapsed = int((time.time() - start) * 1000)
-                
-                return LLMResponse(
-                    provider=LLMProvider.TOGETHER,
-                    is_scam=result.get("is_scam", False),
-                    confidence=result.get("confidence", 0.5),
-                    scam_type=result.get("scam_type"),
-                    reasoning=result.get("reasoning", ""),
-                    response_time_ms=elapsed,
-                    success=True
-                )
-        except Exception as e:
-            elapsed = int((time.time() - start) * 1000)
-            return LLMResponse(
-                provider=LLMProvider.TOGETHER,
-                is_scam=False,
-                confidence=0.0,
-                scam_type=None,
-                reasoning="",
-                response_time_ms=elapsed,
-                success=False,
-                error=str(e)
-            )
+        return await self._detect_openai_compat(LLMProvider.TOGETHER, message)
     
     async def _detect_cerebras(self, message: str) -> LLMResponse:
         """Detect scam using Cerebras (Llama 3.3 70B or GPT-OSS 120B)."""
-        import time
-        start = time.time()
-        
-        try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    "https://api.cerebras.ai/v1/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {self.cerebras_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": settings.CEREBRAS_MODEL,  # llama-3.3-70b or gpt-oss-120b
-                        "messages": [{"role": "user", "content": SCAM_DETECTION_PROMPT.format(message=message)}],
-                        "temperature": 0.1,
-                        "max_tokens": 200
-                    }
-                )
-                response.raise_for_status()
-                data = response.json()
-                
-                result = self._parse_llm_response(data["choices"][0]["message"]["content"])
-                elapsed = int((time.time() - start) * 1000)
-                
-                return LLMResponse(
-                    provider=LLMProvider.CEREBRAS,
-                    is_scam=result.get("is_scam", False),
-                    confidence=result.get("confidence", 0.5),
-                    scam_type=result.get("scam_type"),
-                    reasoning=result.get("reasoning", ""),
-                    response_time_ms=elapsed,
-                    success=True
-                )
-        except Exception as e:
-            elapsed = int((time.time() - start) * 1000)
-            return LLMResponse(
-                provider=LLMProvider.CEREBRAS,
-                is_scam=False,
-                confidence=0.0,
-                scam_type=None,
-                reasoning="",
-                response_time_ms=elapsed,
-                success=False,
-                error=str(e)
-            )
+        return await self._detect_openai_compat(LLMProvider.CEREBRAS, message)
     
     async def _detect_cohere(self, message: str) -> LLMResponse:
         """Detect scam using Cohere."""
-        import time
-        start = time.time()
+        start = time.monotonic()
         
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    "https://api.cohere.ai/v1/chat",
-                    headers={
-                        "Authorization": f"Bearer {self.cohere_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": "command",
-                        "message": SCAM_DETECTION_PROMPT.format(message=message),
-                        "temperature": 0.1,
-                        "max_tokens": 200
-                    }
-                )
-                response.raise_for_status()
-                data = response.json()
-                
-                result = self._parse_llm_response(data["text"])
-                elapsed = int((time.time() - start) * 1000)
-                
-                return LLMResponse(
-                    provider=LLMProvider.COHERE,
-                    is_scam=result.get("is_scam", False),
-                    confidence=result.get("confidence", 0.5),
-                    scam_type=result.get("scam_type"),
-                    reasoning=result.get("reasoning", ""),
-                    response_time_ms=elapsed,
-                    success=True
-                )
-        except Exception as e:
-            elapsed = int((time.time() - start) * 1000)
-            return LLMResponse(
-                provider=LLMProvider.COHERE,
-                is_scam=False,
-                confidence=0.0,
-                scam_type=None,
-                reasoning="",
-                response_time_ms=elapsed,
-                success=False,
-                error=str(e)
+            response = await self._client.post(
+                _COHERE_URL,
+                headers={
+                    "Authorization": f"Bearer {self.cohere_key}",
+                    "Content-Type": "application/json"
+                },
+                json={
+                    "model": "command",
+                    "message": SCAM_DETECTION_PROMPT.format(message=message),
+                    "temperature": 0.1,
+                    "max_tokens": 200
+                }
             )
+            response.raise_for_status()
+            data = response.json()
+            
+            return self._ok(LLMProvider.COHERE, start, self._parse_llm_response(data["text"]))
+        except Exception as e:
+            return self._fail(LLMProvider.COHERE, start, e)
+    
+    def _parse_llm_batch_response(self, text: str) -> List[Dict[str, Any]]:
+        """Parse a JSON array response from a batched LLM call."""
+        import re
+        
+        clean_text = re.sub(r'^```(?:json)?\s*', '', text.strip())
+        clean_text = re.sub(r'\s*```$', '', clean_text)
+        
+        start = clean_text.find('[')
+        end = clean_text.rfind(']')
+        if start == -1 or end <= start:
+            raise ValueError("No JSON array in batch response")
+        
+        items = json.loads(clean_text[start:end + 1])
+        if not isinstance(items, list):
+            raise ValueError("Batch response is not a JSON array")
+        return [item for item in items if isinstance(item, dict)]
     
     def _parse_llm_response(self, text: str) -> Dict[str, Any]:
         """Parse JSON response from LLM, handling various formats."""
-        import json
         import re
         
         # Clean the text
@@ -2,60 +2,304 @@
 Pattern Memory System - Remembers scam patterns for instant recognition.
 Stores message hashes, keywords, phone numbers, UPIs, URLs with frequency counts.
 """
+import atexit
 import hashlib
 import json
 import logging
-from datetime import datetime
-from typing import Dict, List, Optional, Set, Any
+import mmap
+import os
+import re
+import sys
+import threading
+import time
+from array import array
+from datetime import datetime, timezone
+from typing import Callable, Dict, Hashable, List, Optional, Set, Any
 from dataclasses import dataclass, field
 from collections import defaultdict
 
+from utils.wal import WriteAheadLog
+
 logger = logging.getLogger(__name__)
 
+# orjson is several times faster than stdlib json; fall back if not installed
+try:
+    import orjson
+    
+    def _dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+    
+    _loads = orjson.loads
+except ImportError:
+    orjson = None
+    
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode()
+    
+    _loads = json.loads
+
+# Background flusher: every SAVE_INTERVAL_SEC buffered WAL writes are flushed,
+# and the WAL is folded into a fresh snapshot once it holds WAL_ROTATE_ENTRIES
+SAVE_INTERVAL_SEC = 5.0
+WAL_ROTATE_ENTRIES = 10_000
+
+# Message normalization patterns, compiled once
+_DIGIT_RE = re.compile(r'\d+')
+_PUNCT_RE = re.compile(r'[^\w\s]')
+
+# Hot-path callables bound once, so calls skip the module attribute lookup
+_digit_sub = _DIGIT_RE.sub
+_punct_sub = _PUNCT_RE.sub
+_blake2b = hashlib.blake2b
+_md5 = hashlib.md5
+_time = time.time
+
+
+def _read_snapshot(f) -> Dict[str, Any]:
+    """Parse a snapshot file, straight from a memory map when orjson can take it."""
+    if orjson is None or os.fstat(f.fileno()).st_size == 0:
+        return _loads(f.read())
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        with memoryview(mm) as view:
+            return _loads(view)
+
+
+def _to_epoch(value: Any) -> int:
+    """Epoch seconds from a stored timestamp (int, or ISO string from older files)."""
+    if isinstance(value, (int, float)):
+        return int(value)
+    if not value:
+        return 0
+    return int(datetime.fromisoformat(value).replace(tzinfo=timezone.utc).timestamp())
+
+
+def _to_iso(epoch: int) -> str:
+    """UTC ISO timestamp for epoch seconds, as written to the pattern file."""
+    return datetime.fromtimestamp(epoch, timezone.utc).replace(tzinfo=None).isoformat() if epoch else ""
+
+
+# Scam types are free-form strings, so bits are assigned on first sight.
+# Per-pattern scam types are stored as a bitmask over this registry.
+_SCAM_TYPE_BITS: Dict[str, int] = {}
+_SCAM_TYPE_NAMES: List[str] = []
+_scam_type_lock = threading.Lock()
+
+
+def _scam_type_bit(scam_type: str) -> int:
+    """Bit for a scam type, registering it if new."""
+    bit = _SCAM_TYPE_BITS.get(scam_type)
+    if bit is None:
+        with _scam_type_lock:
+            bit = _SCAM_TYPE_BITS.get(scam_type)
+            if bit is None:
+                bit = 1 << len(_SCAM_TYPE_NAMES)
+                _SCAM_TYPE_NAMES.append(scam_type)
+                _SCAM_TYPE_BITS[scam_type] = bit
+    return bit
+
+
+def _scam_type_mask(scam_types: List[str]) -> int:
+    """Bitmask for a list of scam types."""
+    mask = 0
+    for scam_type in scam_types:
+        mask |= _scam_type_bit(scam_type)
+    return mask
+
+
+def _scam_type_list(mask: int) -> List[str]:
+    """Scam type names set in a bitmask, in registration order."""
+    names = []
+    while mask:
+        low = mask & -mask
+        names.append(_SCAM_TYPE_NAMES[low.bit_length() - 1])
+        mask ^= low
+    return names
+
+
+def _split_combo(combo_key: str) -> tuple:
+    """Keyword tuple for a "keyword1|keyword2|..." combo key from the pattern file."""
+    return tuple(map(sys.intern, combo_key.split("|")))
 
-@dataclass
+
+def _norm_url(url: str) -> str:
+    """Normalize a URL for matching: lowercase, no scheme, no trailing slash."""
+    return url.lower().removeprefix("https://").removeprefix("http://").rstrip("/")
+
+
+@dataclass(slots=True)
 class PatternMatch:
     """Represents a matched pattern."""
     pattern_type: str  # message_hash, phone, upi, url, keyword_combo
     pattern_value: str
     times_seen: int
-    first_seen: str
-    last_seen: str
+    first_seen: int  # epoch seconds
+    last_seen: int
     associated_scam_types: List[str]
     confidence_boost: float
 
 
+class PatternStore:
+    """
+    Column-oriented store for one kind of pattern (message hash, phone, UPI, ...).
+    
+    Each distinct pattern value gets a slot index; per-pattern fields live in
+    parallel columns instead of one small dict (plus list) per pattern.
+    """
+    
+    __slots__ = ("ids", "values", "counts", "first_seen", "last_seen", "scam_types")
+    
+    def __init__(self):
+        self.ids: Dict[Hashable, int] = {}  # pattern value -> slot
+        self.values: List[Hashable] = []
+        self.counts = array('I')
+        self.first_seen = array('q')  # epoch seconds
+        self.last_seen = array('q')
+        self.scam_types: List[int] = []  # bitmask, see _scam_type_bit
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+    
+    def __contains__(self, value: Hashable) -> bool:
+        return value in self.ids
+    
+    def get(self, value: Hashable) -> Optional[int]:
+        """Slot index for a pattern value, or None if unknown."""
+        return self.ids.get(value)
+    
+    def record(self, value: Hashable, now: int, scam_type: Optional[str] = None) -> int:
+        """Count one more sighting of a pattern value and return its slot."""
+        idx = self.ids.get(value)
+        if idx is None:
+            if type(value) is str:
+                # Share one object between ids, values and later snapshots
+                value = sys.intern(value)
+            idx = len(self.values)
+            self.ids[value] = idx
+            self.values.append(value)
+            self.counts.append(0)
+            self.first_seen.append(now)
+            self.last_seen.append(now)
+            self.scam_types.append(0)
+        
+        self.counts[idx] += 1
+        self.last_seen[idx] = now
+        if scam_type:
+            self.scam_types[idx] |= _scam_type_bit(scam_type)
+        return idx
+    
+    def rekey(self, old_value: str, new_value: str) -> bool:
+        """Move a pattern to a new value (e.g. a re-hashed key). Returns True if moved."""
+        if new_value in self.ids:
+            return False
+        idx = self.ids.pop(old_value, None)
+        if idx is None:
+            return False
+        self.ids[new_value] = idx
+        self.values[idx] = new_value
+        return True
+    
+    def to_dict(self, format_key: Optional[Callable[[Hashable], str]] = None) -> Dict[str, Dict]:
+        """
+        Serialize to the {value: {count, first_seen, last_seen, scam_types}} file format.
+        
+        Args:
+            format_key: Converts non-string pattern values to their file key
+        """
+        return {
+            (format_key(value) if format_key else value): {
+                "count": self.counts[idx],
+                "first_seen": _to_iso(self.first_seen[idx]),
+                "last_seen": _to_iso(self.last_seen[idx]),
+                "scam_types": _scam_type_list(self.scam_types[idx])
+            }
+            for value, idx in self.ids.items()
+        }
+    
+    @classmethod
+    def from_dict(
+        cls,
+        data: Dict[str, Dict],
+        parse_key: Optional[Callable[[str], Hashable]] = None
+    ) -> "PatternStore":
+        """
+        Build a store from the file format written by to_dict.
+        
+        Args:
+            data: Pattern records keyed by file key
+            parse_key: Converts file keys back to pattern values
+        """
+        store = cls()
+        records = data.values()
+        
+        # Build each column in one pass rather than appending slot by slot
+        store.values = list(map(parse_key or sys.intern, data))
+        store.ids = dict(zip(store.values, range(len(store.values))))
+        store.counts = array('I', [record.get("count", 0) for record in records])
+        store.first_seen = array('q', [_to_epoch(record.get("first_seen")) for record in records])
+        store.last_seen = array('q', [_to_epoch(record.get("last_seen")) for record in records])
+        store.scam_types = [_scam_type_mask(record.get("scam_types", [])) for record in records]
+        return store
+
+
 class PatternMemory:
     """
     Persistent pattern memory for scam detection.
     Remembers patterns and boosts confidence when seen again.
     """
     
+    # Pattern stores that are persisted and replayed by attribute name
+    STORE_NAMES = ("message_hashes", "phone_numbers", "upi_ids", "urls", "keyword_combos")
+    
     def __init__(self, storage_path: str = "pattern_memory.json"):
         self.storage_path = storage_path
+        self.wal_path = storage_path + ".wal"
+        
+        # Append-only log of changes since the last snapshot, buffered until flush()
+        self._wal = WriteAheadLog(self.wal_path, "pattern")
+        
+        # Guards stores and WAL against the background flusher
+        self._lock = threading.RLock()
         
         # In-memory stores
-        self.message_hashes: Dict[str, Dict] = {}  # hash -> {count, first_seen, last_seen, scam_types}
-        self.phone_numbers: Dict[str, Dict] = {}
-        self.upi_ids: Dict[str, Dict] = {}
-        self.urls: Dict[str, Dict] = {}
-        self.keyword_combos: Dict[str, Dict] = {}  # "keyword1|keyword2|..." -> count
+        self.message_hashes = PatternStore()  # normalized message hash
+        self.phone_numbers = PatternStore()
+        self.upi_ids = PatternStore()
+        self.urls = PatternStore()  # normalized URL (no scheme, no trailing slash)
+        self.keyword_combos = PatternStore()  # sorted keyword tuple; "keyword1|keyword2|..." on disk
         self.scammer_fingerprints: Dict[str, Dict] = {}  # fingerprint -> {sessions, patterns}
         
+        # Message hash keys still in the pre-BLAKE2 MD5 format; once empty, lookups
+        # skip the legacy hash
+        self._legacy_message_hashes: set = set()
+        
+        # Every keyword that appears in some recorded combo; a combo containing
+        # any other keyword cannot be known, so lookups skip the sort and join
+        self._combo_words: set = set()
+        
         # Load existing patterns
         self._load_patterns()
+        self._wal.replay(self._apply_wal_entry)
+        for combo in self.keyword_combos.ids:
+            self._combo_words.update(combo)
+        
+        # Background flusher, started by start() so only the shared instance owns a thread
+        self._stop = threading.Event()
+        self._flusher = None
     
     def _load_patterns(self):
         """Load patterns from storage."""
         try:
-            with open(self.storage_path, 'r') as f:
-                data = json.load(f)
-                self.message_hashes = data.get("message_hashes", {})
-                self.phone_numbers = data.get("phone_numbers", {})
-                self.upi_ids = data.get("upi_ids", {})
-                self.urls = data.get("urls", {})
-                self.keyword_combos = data.get("keyword_combos", {})
+            with open(self.storage_path, 'rb') as f:
+                data = _read_snapshot(f)
+                self.message_hashes = PatternStore.from_dict(data.get("message_hashes", {}))
+                self.phone_numbers = PatternStore.from_dict(data.get("phone_numbers", {}))
+                self.upi_ids = PatternStore.from_dict(data.get("upi_ids", {}))
+                self.urls = PatternStore.from_dict(data.get("urls", {}))
+                self.keyword_combos = PatternStore.from_dict(data.get("keyword_combos", {}), _split_combo)
                 self.scammer_fingerprints = data.get("scammer_fingerprints", {})
+                # Files written before the list was kept may hold legacy keys anywhere
+                legacy = data.get("legacy_message_hashes")
+                self._legacy_message_hashes = set(self.message_hashes.ids if legacy is None else legacy)
                 logger.info(f"Loaded {len(self.message_hashes)} message patterns, "
                            f"{len(self.phone_numbers)} phones, {len(self.upi_ids)} UPIs")
         except FileNotFoundError:
@@ -63,32 +307,150 @@ class PatternMemory:
         except Exception as e:
             logger.error(f"Error loading patterns: {e}")
     
+    def _apply_wal_entry(self, entry: Dict[str, Any]):
+        """Apply one logged change to the in-memory stores."""
+        kind = entry["k"]
+        if kind == "scammer_fingerprints":
+            self._record_fingerprint(entry["v"], entry["session"], entry["t"])
+        elif kind in self.STORE_NAMES:
+            store = getattr(self, kind)
+            value = entry["v"]
+            if kind == "keyword_combos":
+                value = _split_combo(value) if isinstance(value, str) else tuple(value)
+            if "r" in entry:
+                store.rekey(entry["r"], value)
+                if kind == "message_hashes":
+                    self._legacy_message_hashes.discard(entry["r"])
+            else:
+                store.record(value, _to_epoch(entry["t"]), entry.get("s"))
+    
+    def _log(self, entry: Dict[str, Any]):
+        """Append a change to the buffered WAL; the background flusher writes it out."""
+        self._wal.append(entry)
+    
+    def start(self):
+        """Start the background flusher so disk I/O happens off the request path."""
+        if self._flusher is not None:
+            return
+        self._stop.clear()
+        self._flusher = threading.Thread(target=self._flush_loop, name="pattern-memory-flush", daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
+    
+    def _flush_loop(self):
+        """Background thread: periodically flush the WAL and rotate it into a snapshot."""
+        while not self._stop.wait(SAVE_INTERVAL_SEC):
+            self.flush()
+    
+    def flush(self):
+        """Write out pending changes: snapshot if the WAL is large, else flush the WAL buffer."""
+        with self._lock:
+            if self._wal.entries >= WAL_ROTATE_ENTRIES:
+                self._save_patterns()
+            else:
+                self._wal.flush()
+    
+    def close(self):
+        """Stop the background flusher, flush pending changes and release the WAL."""
+        self._stop.set()
+        if self._flusher is not None:
+            atexit.unregister(self.close)
+            self._flusher.join()
+            self._flusher = None
+        with self._lock:
+            self.flush()
+            self._wal.close()
+    
     def _save_patterns(self):
-        """Save patterns to storage."""
+        """Save a full snapshot to storage and truncate the WAL it supersedes."""
+        with self._lock:
+            self._write_snapshot()
+    
+    def _write_snapshot(self):
+        """Write the snapshot and drop the WAL. Caller holds self._lock."""
         try:
             data = {
-                "message_hashes": self.message_hashes,
-                "phone_numbers": self.phone_numbers,
-                "upi_ids": self.upi_ids,
-                "urls": self.urls,
-                "keyword_combos": self.keyword_combos,
+                "message_hashes": self.message_hashes.to_dict(),
+                "phone_numbers": self.phone_numbers.to_dict(),
+                "upi_ids": self.upi_ids.to_dict(),
+                "urls": self.urls.to_dict(),
+                "keyword_combos": self.keyword_combos.to_dict("|".join),
                 "scammer_fingerprints": self.scammer_fingerprints,
+                "legacy_message_hashes": sorted(
+                    h for h in self._legacy_message_hashes if h in self.message_hashes
+                ),
                 "last_updated": datetime.utcnow().isoformat()
             }
-            with open(self.storage_path, 'w') as f:
-                json.dump(data, f, indent=2)
+            # Write to a temp file and swap it in so a crash never leaves a torn snapshot
+            tmp_path = self.storage_path + ".tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(_dumps(data))
+            os.replace(tmp_path, self.storage_path)
+            
+            self._wal.reset()
         except Exception as e:
             logger.error(f"Error saving patterns: {e}")
     
-    def _hash_message(self, message: str) -> str:
-        """Create normalized hash of message."""
+    def _normalize_message(self, message: str) -> str:
+        """Normalize message so template variations hash the same."""
         # Normalize: lowercase, remove extra spaces, remove numbers
         normalized = ' '.join(message.lower().split())
         # Remove variable parts (numbers, specific names)
-        import re
-        normalized = re.sub(r'\d+', 'NUM', normalized)
-        normalized = re.sub(r'[^\w\s]', '', normalized)
-        return hashlib.md5(normalized.encode()).hexdigest()[:16]
+        normalized = _digit_sub('NUM', normalized)
+        normalized = _punct_sub('', normalized)
+        return normalized
+    
+    @staticmethod
+    def _hash_normalized(normalized: str) -> str:
+        """Hash of an already normalized message."""
+        return _blake2b(normalized.encode(), digest_size=8).hexdigest()
+    
+    @staticmethod
+    def _legacy_hash_normalized(normalized: str) -> str:
+        """MD5-based hash used by pattern files written before the BLAKE2 switch."""
+        return _md5(normalized.encode()).hexdigest()[:16]
+    
+    def _hash_message(self, message: str) -> str:
+        """Create normalized hash of message."""
+        return self._hash_normalized(self._normalize_message(message))
+    
+    def _legacy_hash_message(self, message: str) -> str:
+        """Legacy MD5 hash of message."""
+        return self._legacy_hash_normalized(self._normalize_message(message))
+    
+    def _migrate_message_hash(self, normalized: str, msg_hash: str) -> None:
+        """Re-key a legacy MD5 message hash entry under its new hash, if present."""
+        if self._legacy_message_hashes and msg_hash not in self.message_hashes:
+            legacy_hash = self._legacy_hash_normalized(normalized)
+            if legacy_hash in self._legacy_message_hashes and self.message_hashes.rekey(legacy_hash, msg_hash):
+                self._legacy_message_hashes.discard(legacy_hash)
+                self._log({"k": "message_hashes", "v": msg_hash, "r": legacy_hash})
+    
+    def _record(self, kind: str, value: str, now: int, scam_type: Optional[str]):
+        """Record a pattern sighting in a store and log it to the WAL."""
+        getattr(self, kind).record(value, now, scam_type)
+        self._log({"k": kind, "v": value, "s": scam_type, "t": now})
+    
+    @staticmethod
+    def _match(
+        store: PatternStore,
+        idx: int,
+        pattern_type: str,
+        pattern_value: str,
+        boost_per_sighting: float,
+        max_boost: float
+    ) -> PatternMatch:
+        """Build a PatternMatch for slot idx of a store."""
+        count = store.counts[idx]
+        return PatternMatch(
+            pattern_type=pattern_type,
+            pattern_value=pattern_value,
+            times_seen=count,
+            first_seen=store.first_seen[idx],
+            last_seen=store.last_seen[idx],
+            associated_scam_types=_scam_type_list(store.scam_types[idx]),
+            confidence_boost=min(count * boost_per_sighting, max_boost)
+        )
     
     def check_patterns(
         self, 
@@ -100,80 +462,55 @@ class PatternMemory:
         Returns list of matches with confidence boosts.
         """
         matches = []
-        now = datetime.utcnow().isoformat()
+        append = matches.append
+        match = self._match
         
-        # Check message hash
-        msg_hash = self._hash_message(message)
-        if msg_hash in self.message_hashes:
-            pattern = self.message_hashes[msg_hash]
-            matches.append(PatternMatch(
-                pattern_type="message_template",
-                pattern_value=msg_hash,
-                times_seen=pattern["count"],
-                first_seen=pattern["first_seen"],
-                last_seen=pattern["last_seen"],
-                associated_scam_types=pattern.get("scam_types", []),
-                confidence_boost=min(pattern["count"] * 0.1, 0.4)  # Max 40% boost
+        # Check message hash (entries from older pattern files use the MD5 hash)
+        message_hashes = self.message_hashes
+        normalized = self._normalize_message(message)
+        msg_hash = self._hash_normalized(normalized)
+        idx = message_hashes.get(msg_hash)
+        if idx is None and self._legacy_message_hashes:
+            idx = message_hashes.get(self._legacy_hash_normalized(normalized))
+        if idx is not None:
+            append(match(
+                message_hashes, idx, "message_template", msg_hash, 0.1, 0.4  # Max 40% boost
             ))
         
         # Check phone numbers
+        phones = self.phone_numbers
         for phone in intelligence.get("phone_numbers", []):
-            if phone in self.phone_numbers:
-                pattern = self.phone_numbers[phone]
-                matches.append(PatternMatch(
-                    pattern_type="known_scam_phone",
-                    pattern_value=phone,
-                    times_seen=pattern["count"],
-                    first_seen=pattern["first_seen"],
-                    last_seen=pattern["last_seen"],
-                    associated_scam_types=pattern.get("scam_types", []),
-                    confidence_boost=min(pattern["count"] * 0.15, 0.5)  # Max 50% boost
+            idx = phones.get(phone)
+            if idx is not None:
+                append(match(
+                    phones, idx, "known_scam_phone", phone, 0.15, 0.5  # Max 50% boost
                 ))
         
         # Check UPI IDs
+        upis = self.upi_ids
         for upi in intelligence.get("upi_ids", []):
-            if upi in self.upi_ids:
-                pattern = self.upi_ids[upi]
-                matches.append(PatternMatch(
-                    pattern_type="known_scam_upi",
-                    pattern_value=upi,
-                    times_seen=pattern["count"],
-                    first_seen=pattern["first_seen"],
-                    last_seen=pattern["last_seen"],
-                    associated_scam_types=pattern.get("scam_types", []),
-                    confidence_boost=min(pattern["count"] * 0.15, 0.5)
+            idx = upis.get(upi)
+            if idx is not None:
+                append(match(
+                    upis, idx, "known_scam_upi", upi, 0.15, 0.5
                 ))
         
         # Check URLs
+        urls = self.urls
         for url in intelligence.get("urls", []):
-            # Normalize URL
-            url_key = url.lower().replace("https://", "").replace("http://", "").rstrip("/")
-            if url_key in self.urls:
-                pattern = self.urls[url_key]
-                matches.append(PatternMatch(
-                    pattern_type="known_scam_url",
-                    pattern_value=url,
-                    times_seen=pattern["count"],
-                    first_seen=pattern["first_seen"],
-                    last_seen=pattern["last_seen"],
-                    associated_scam_types=pattern.get("scam_types", []),
-                    confidence_boost=min(pattern["count"] * 0.2, 0.6)  # Max 60% boost
+            idx = urls.get(_norm_url(url))
+            if idx is not None:
+                append(match(
+                    urls, idx, "known_scam_url", url, 0.2, 0.6  # Max 60% boost
                 ))
         
         # Check keyword combinations
-        keywords = sorted(intelligence.get("keywords", [])[:5])  # Top 5 keywords
-        if len(keywords) >= 2:
-            combo_key = "|".join(keywords)
-            if combo_key in self.keyword_combos:
-                pattern = self.keyword_combos[combo_key]
-                matches.append(PatternMatch(
-                    pattern_type="keyword_combination",
-                    pattern_value=combo_key,
-                    times_seen=pattern["count"],
-                    first_seen=pattern["first_seen"],
-                    last_seen=pattern["last_seen"],
-                    associated_scam_types=pattern.get("scam_types", []),
-                    confidence_boost=min(pattern["count"] * 0.05, 0.2)
+        keywords = intelligence.get("keywords", [])[:5]  # Top 5 keywords
+        if len(keywords) >= 2 and self._combo_words.issuperset(keywords):
+            idx = self.keyword_combos.get(tuple(sorted(keywords)))
+            if idx is not None:
+                append(match(
+                    self.keyword_combos, idx, "keyword_combination", "|".join(sorted(keywords)), 0.05, 0.2
                 ))
         
         return matches
@@ -189,104 +526,46 @@ class PatternMemory:
         Record patterns from a message for future detection.
         Only records if scam is confirmed (confidence > threshold).
         """
-        now = datetime.utcnow().isoformat()
-        
-        # Record message hash
-        msg_hash = self._hash_message(message)
-        if msg_hash not in self.message_hashes:
-            self.message_hashes[msg_hash] = {
-                "count": 0,
-                "first_seen": now,
-                "last_seen": now,
-                "scam_types": []
-            }
-        self.message_hashes[msg_hash]["count"] += 1
-        self.message_hashes[msg_hash]["last_seen"] = now
-        if scam_type and scam_type not in self.message_hashes[msg_hash]["scam_types"]:
-            self.message_hashes[msg_hash]["scam_types"].append(scam_type)
-        
-        # Record phone numbers (only if likely scam)
-        if is_confirmed_scam:
-            for phone in intelligence.get("phone_numbers", []):
-                if phone not in self.phone_numbers:
-                    self.phone_numbers[phone] = {
-                        "count": 0,
-                        "first_seen": now,
-                        "last_seen": now,
-                        "scam_types": []
-                    }
-                self.phone_numbers[phone]["count"] += 1
-                self.phone_numbers[phone]["last_seen"] = now
-                if scam_type:
-                    if scam_type not in self.phone_numbers[phone]["scam_types"]:
-                        self.phone_numbers[phone]["scam_types"].append(scam_type)
+        with self._lock:
+            now = int(_time())
             
-            # Record UPI IDs
-            for upi in intelligence.get("upi_ids", []):
-                if upi not in self.upi_ids:
-                    self.upi_ids[upi] = {
-                        "count": 0,
-                        "first_seen": now,
-                        "last_seen": now,
-                        "scam_types": []
-                    }
-                self.upi_ids[upi]["count"] += 1
-                self.upi_ids[upi]["last_seen"] = now
-                if scam_type:
-                    if scam_type not in self.upi_ids[upi]["scam_types"]:
-                        self.upi_ids[upi]["scam_types"].append(scam_type)
+            # Record message hash
+            normalized = self._normalize_message(message)
+            msg_hash = self._hash_normalized(normalized)
+            self._migrate_message_hash(normalized, msg_hash)
+            self._record("message_hashes", msg_hash, now, scam_type)
             
-            # Record URLs
-            for url in intelligence.get("urls", []):
-                url_key = url.lower().replace("https://", "").replace("http://", "").rstrip("/")
-                if url_key not in self.urls:
-                    self.urls[url_key] = {
-                        "count": 0,
-                        "first_seen": now,
-                        "last_seen": now,
-                        "scam_types": []
-                    }
-                self.urls[url_key]["count"] += 1
-                self.urls[url_key]["last_seen"] = now
-                if scam_type:
-                    if scam_type not in self.urls[url_key]["scam_types"]:
-                        self.urls[url_key]["scam_types"].append(scam_type)
-        
-        # Record keyword combinations
-        keywords = sorted(intelligence.get("keywords", [])[:5])
-        if len(keywords) >= 2:
-            combo_key = "|".join(keywords)
-            if combo_key not in self.keyword_combos:
-                self.keyword_combos[combo_key] = {
-                    "count": 0,
-                    "first_seen": now,
-                    "last_seen": now,
-                    "scam_types": []
-                }
-            self.keyword_combos[combo_key]["count"] += 1
-            self.keyword_combos[combo_key]["last_seen"] = now
-            if scam_type:
-                if scam_type not in self.keyword_combos[combo_key]["scam_types"]:
-                    self.keyword_combos[combo_key]["scam_types"].append(scam_type)
-        
-        # Save periodically
-        total_patterns = (len(self.message_hashes) + len(self.phone_numbers) + 
-                         len(self.upi_ids) + len(self.urls))
-        if total_patterns % 10 == 0:  # Save every 10 new patterns
-            self._save_patterns()
+            # Record phone numbers (only if likely scam)
+            if is_confirmed_scam:
+                for phone in intelligence.get("phone_numbers", []):
+                    self._record("phone_numbers", phone, now, scam_type)
+                
+                # Record UPI IDs
+                for upi in intelligence.get("upi_ids", []):
+                    self._record("upi_ids", upi, now, scam_type)
+                
+                # Record URLs
+                for url in intelligence.get("urls", []):
+                    self._record("urls", _norm_url(url), now, scam_type)
+            
+            # Record keyword combinations
+            keywords = intelligence.get("keywords", [])[:5]
+            if len(keywords) >= 2:
+                # Keywords recur across many combos; keep one copy of each
+                keywords = sorted(map(sys.intern, keywords))
+                self._combo_words.update(keywords)
+                self._record("keyword_combos", tuple(keywords), now, scam_type)
     
     def calculate_memory_boost(self, matches: List[PatternMatch]) -> float:
         """Calculate total confidence boost from pattern matches."""
         if not matches:
             return 0.0
         
-        # Take the highest individual boost plus small bonuses for additional matches
-        boosts = sorted([m.confidence_boost for m in matches], reverse=True)
-        total_boost = boosts[0]  # Primary boost
-        
-        # Add 50% of remaining boosts
-        for boost in boosts[1:]:
-            total_boost += boost * 0.5
+        # Take the highest individual boost plus 50% of the remaining boosts;
+        # only the max and the sum are needed, so no sort
+        boosts = [m.confidence_boost for m in matches]
+        top = max(boosts)  # Primary boost
+        total_boost = top + 0.5 * (sum(boosts) - top)
         
         return min(total_boost, 0.8)  # Cap at 80% total boost
     
@@ -312,15 +591,19 @@ class PatternMemory:
         Create a behavioral fingerprint for a scammer.
         Used to identify same scammer across sessions.
         """
-        # Create fingerprint from patterns
-        fingerprint_data = {
-            "message_patterns": sorted(message_patterns),
-            "language": language_patterns or []
-        }
-        fingerprint = hashlib.md5(json.dumps(fingerprint_data, sort_keys=True).encode()).hexdigest()[:12]
+        # Create fingerprint from patterns (NUL between items, SOH between groups)
+        fingerprint_data = "\x00".join(sorted(message_patterns)) + "\x01" + "\x00".join(language_patterns or [])
+        fingerprint = _blake2b(fingerprint_data.encode(), digest_size=6).hexdigest()
         
         now = datetime.utcnow().isoformat()
+        with self._lock:
+            self._record_fingerprint(fingerprint, session_id, now)
+            self._log({"k": "scammer_fingerprints", "v": fingerprint, "session": session_id, "t": now})
         
+        return fingerprint
+    
+    def _record_fingerprint(self, fingerprint: str, session_id: str, now: str):
+        """Add a session encounter to a scammer fingerprint."""
         if fingerprint not in self.scammer_fingerprints:
             self.scammer_fingerprints[fingerprint] = {
                 "sessions": [],
@@ -332,9 +615,8 @@ class PatternMemory:
         self.scammer_fingerprints[fingerprint]["sessions"].append(session_id)
         self.scammer_fingerprints[fingerprint]["last_seen"] = now
         self.scammer_fingerprints[fingerprint]["total_encounters"] += 1
-        
-        return fingerprint
 
 
 # Global pattern memory instance
 pattern_memory = PatternMemory()
+pattern_memory.start()
@@ -4,16 +4,20 @@ Prevents duplicate LLM calls when multiple identical requests arrive simultaneou
 """
 import asyncio
 import hashlib
+import heapq
 import time
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from dataclasses import dataclass, field
-from collections import OrderedDict
 
 logger = logging.getLogger(__name__)
 
+# Used on every lookup; bound here to avoid the module attribute access
+_blake2b = hashlib.blake2b
+_time = time.time
 
-@dataclass
+
+@dataclass(slots=True)
 class CacheEntry:
     """Cache entry with result and metadata."""
     result: Any
@@ -22,7 +26,11 @@ class CacheEntry:
     pending: asyncio.Future = None
     
     def is_expired(self) -> bool:
-        return time.time() - self.created_at > self.ttl_seconds
+        return _time() - self.created_at > self.ttl_seconds
+    
+    @property
+    def expires_at(self) -> float:
+        return self.created_at + self.ttl_seconds
 
 
 class RequestCache:
@@ -38,10 +46,16 @@ class RequestCache:
     - Duplicate LLM API calls (saves quota)
     - Inconsistent results for same message
     - Rate limiting issues
+    
+    Completed entries are also tracked in a min-heap of (expires_at, key), so
+    expired results are reclaimed as soon as they lapse and size eviction drops
+    the entries closest to expiry first. Heap items for keys that have since been
+    refreshed or removed are skipped when popped.
     """
     
     def __init__(self, max_size: int = 1000, default_ttl: float = 60.0):
-        self.cache: OrderedDict[str, CacheEntry] = OrderedDict()
+        self.cache: Dict[str, CacheEntry] = {}
+        self._expiry: List[Tuple[float, str]] = []
         self.max_size = max_size
         self.default_ttl = default_ttl
         self._lock = asyncio.Lock()
@@ -49,14 +63,21 @@ class RequestCache:
             "hits": 0,
             "misses": 0,
             "pending_joins": 0,
-            "evictions": 0
+            "evictions": 0,
+            "expirations": 0
         }
     
-    def _make_key(self, message: str, session_id: str = None) -> str:
+    def make_key(self, message: str, session_id: str = None) -> str:
         """Create cache key from message (and optionally session)."""
         # Use message hash for key (same message = same key)
-        content = message.strip().lower()
-        return hashlib.sha256(content.encode()).hexdigest()[:32]
+        if message and (message[0].isspace() or message[-1].isspace()):
+            message = message.strip()
+        if message.isascii():
+            # bytes.lower() folds ASCII in one pass without a temporary str
+            content = message.encode().lower()
+        else:
+            content = message.lower().encode()
+        return _blake2b(content, digest_size=16).hexdigest()
     
     async def get_or_execute(
         self,
@@ -70,78 +91,114 @@ class RequestCache:
         If a request for the same key is already in progress,
         wait for it instead of starting a new one.
         """
+        self._purge_expired()
+        
+        # Fast path: a fresh completed result needs no lock. All callers run on
+        # the event loop thread, so nothing can change the entry between check and return.
+        entry = self.cache.get(key)
+        if entry is not None and entry.pending is None and entry.result is not None and not entry.is_expired():
+            self._stats["hits"] += 1
+            return entry.result
+        
         async with self._lock:
-            # Check if we have a cached or pending result
-            if key in self.cache:
-                entry = self.cache[key]
-                
-                # If result exists and not expired, return it
+            entry = self.cache.get(key)
+            future = None
+            
+            if entry is not None:
+                # Completed while we waited for the lock
                 if entry.result is not None and not entry.is_expired():
                     self._stats["hits"] += 1
                     logger.debug(f"Cache hit for key {key[:8]}...")
                     return entry.result
                 
-                # If pending, wait for the result
+                # If pending, join it (awaited after releasing the lock)
                 if entry.pending is not None and not entry.pending.done():
                     self._stats["pending_joins"] += 1
                     logger.info(f"Joining pending request for key {key[:8]}...")
-                    # Release lock while waiting
-                
-            else:
+                    future = entry.pending
+            
+            owner = future is None
+            if owner:
+                # Publish our pending entry before releasing the lock so
+                # concurrent callers join it instead of starting their own
                 self._stats["misses"] += 1
+                future = asyncio.get_running_loop().create_future()
+                self.cache[key] = CacheEntry(
+                    result=None,
+                    created_at=_time(),
+                    ttl_seconds=ttl or self.default_ttl,
+                    pending=future
+                )
+                self._evict_if_needed()
         
-        # Check again if we need to join a pending request (outside lock)
-        if key in self.cache and self.cache[key].pending is not None:
-            try:
-                return await self.cache[key].pending
-            except Exception:
-                pass  # If pending failed, we'll try again
-        
-        # Create pending entry
-        loop = asyncio.get_event_loop()
-        future = loop.create_future()
-        
-        async with self._lock:
-            self.cache[key] = CacheEntry(
-                result=None,
-                created_at=time.time(),
-                ttl_seconds=ttl or self.default_ttl,
-                pending=future
-            )
-            self._evict_if_needed()
+        if not owner:
+            return await future
         
         # Execute
         try:
             result = await executor()
-            
+        except BaseException as e:
+            # Remove failed entry (unless it has already been replaced)
             async with self._lock:
-                self.cache[key].result = result
-                self.cache[key].pending = None
-                self.cache[key].created_at = time.time()
-            
-            # Resolve future for any waiting requests
-            if not future.done():
-                future.set_result(result)
-            
-            return result
-            
-        except Exception as e:
-            # Remove failed entry
-            async with self._lock:
-                if key in self.cache:
+                entry = self.cache.get(key)
+                if entry is not None and entry.pending is future:
                     del self.cache[key]
             
             # Reject future for any waiting requests
             if not future.done():
-                future.set_exception(e)
-            
+                if isinstance(e, asyncio.CancelledError):
+                    future.cancel()
+                else:
+                    future.set_exception(e)
+                    future.exception()  # Mark retrieved in case nobody joined
             raise
+        
+        async with self._lock:
+            entry = self.cache.get(key)
+            if entry is not None and entry.pending is future:
+                entry.result = result
+                entry.pending = None
+                entry.created_at = _time()
+                heapq.heappush(self._expiry, (entry.expires_at, key))
+        
+        # Resolve future for any waiting requests
+        if not future.done():
+            future.set_result(result)
+        
+        return result
+    
+    def _pop_heap_entry(self) -> Optional[str]:
+        """Pop the soonest-expiring live key from the heap, skipping stale items."""
+        while self._expiry:
+            expires_at, key = heapq.heappop(self._expiry)
+            entry = self.cache.get(key)
+            if entry is not None and entry.pending is None and entry.expires_at == expires_at:
+                return key
+        return None
+    
+    def _purge_expired(self):
+        """Drop completed entries whose TTL has lapsed."""
+        now = _time()
+        while self._expiry and self._expiry[0][0] < now:
+            key = self._pop_heap_entry()
+            if key is None:
+                break
+            entry = self.cache[key]
+            if entry.expires_at >= now:
+                # Popped past the expired prefix; put it back
+                heapq.heappush(self._expiry, (entry.expires_at, key))
+                break
+            del self.cache[key]
+            self._stats["expirations"] += 1
     
     def _evict_if_needed(self):
-        """Evict oldest entries if cache is full."""
+        """Evict entries closest to expiry (then oldest pending) if cache is full."""
         while len(self.cache) > self.max_size:
-            oldest_key = next(iter(self.cache))
-            del self.cache[oldest_key]
+            key = self._pop_heap_entry()
+            if key is None:
+                # Only pending entries left; fall back to insertion order
+                key = next(iter(self.cache))
+            del self.cache[key]
             self._stats["evictions"] += 1
     
     def invalidate(self, key: str):
@@ -152,6 +209,7 @@ class RequestCache:
     def clear(self):
         """Clear all cache entries."""
         self.cache.clear()
+        self._expiry.clear()
     
     def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics."""
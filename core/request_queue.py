@@ -2,63 +2,213 @@
 Rate-Limit Aware Request Queue with Multi-Provider Waterfall.
 Implements:
 - Option A: Multi-provider failover (Gemini → Groq → Together → Local)
-- Option B: Request throttling with semaphore
+- Option B: Request throttling with semaphore and per-provider token buckets
 """
 import asyncio
+import heapq
+import random
+import re
 import time
 import logging
-from typing import Dict, Any, Optional, Callable, List
+import zlib
+from array import array
+from collections import OrderedDict, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, Callable, List, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 
+import httpx
+
 logger = logging.getLogger(__name__)
 
+# Provider SDK exception types that always mean "rate limited"
+_RATE_LIMIT_ERRORS: Tuple[type, ...] = ()
+try:
+    from groq import RateLimitError as GroqRateLimitError
+    _RATE_LIMIT_ERRORS += (GroqRateLimitError,)
+except ImportError:
+    pass
+
+# Fallback for errors that only say so in their message
+_RATE_LIMIT_RE = re.compile(r"429|rate[_ ]?limit|resource_exhausted|quota", re.IGNORECASE)
+
+
+def _is_rate_limit_error(error: Exception) -> bool:
+    """Check whether a provider error is a rate limit rather than a failure."""
+    if isinstance(error, _RATE_LIMIT_ERRORS):
+        return True
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code == 429
+    return _RATE_LIMIT_RE.search(str(error)) is not None
+
+
+# Queue stats are kept in an array; module-level indices avoid a dict
+# lookup per increment on the request path
+_STAT_NAMES = (
+    "queued", "processed", "errors", "cache_hits", "rate_limits", "total_requests",
+    "failovers", "local_fallbacks", "inflight_joins", "hedges", "shed"
+)
+(
+    _STAT_QUEUED, _STAT_PROCESSED, _STAT_ERRORS, _STAT_CACHE_HITS, _STAT_RATE_LIMITS, _STAT_TOTAL_REQUESTS,
+    _STAT_FAILOVERS, _STAT_LOCAL_FALLBACKS, _STAT_INFLIGHT_JOINS, _STAT_HEDGES, _STAT_SHED
+) = range(len(_STAT_NAMES))
+
+
+# Small shared pool for CPU-bound work (local detection, heavy parsing) so it
+# doesn't stall the event loop between provider calls
+_cpu_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="request-queue-cpu")
+
 
 class ProviderStatus(str, Enum):
     """Provider availability status."""
     AVAILABLE = "available"
     RATE_LIMITED = "rate_limited"
-    ERROR = "error"
+    ERROR = "error"  # Circuit open after repeated errors
+    HALF_OPEN = "half_open"  # One probe request allowed through
 
 
-@dataclass
+@dataclass(slots=True)
 class ProviderState:
     """Track state of each LLM provider."""
     name: str
     status: ProviderStatus = ProviderStatus.AVAILABLE
-    rate_limit_until: float = 0
+    rate_limit_until: float = 0  # time.monotonic() deadlines, like open_until
     consecutive_errors: int = 0
+    consecutive_rate_limits: int = 0
     total_requests: int = 0
     total_successes: int = 0
+    open_until: float = 0  # ERROR: when to allow a probe; HALF_OPEN: probe deadline
+    open_seconds: float = 30
     
-    def is_available(self) -> bool:
-        """Check if provider is available for requests."""
+    def is_available(self, claim_probe: bool = True) -> bool:
+        """
+        Check if provider is available for requests.
+        
+        Once an errored provider's open period passes, the next caller is let
+        through as a probe (status HALF_OPEN) and others are held off until the
+        probe succeeds or fails, or its deadline passes.
+        
+        Args:
+            claim_probe: If False, only report whether a probe could be sent
+        """
+        if self.status == ProviderStatus.AVAILABLE:
+            return True
+        now = time.monotonic()
         if self.status == ProviderStatus.RATE_LIMITED:
-            if time.time() > self.rate_limit_until:
+            if now > self.rate_limit_until:
                 self.status = ProviderStatus.AVAILABLE
                 return True
             return False
-        return self.status == ProviderStatus.AVAILABLE
+        # ERROR or HALF_OPEN
+        if now <= self.open_until:
+            return False
+        if claim_probe:
+            self.status = ProviderStatus.HALF_OPEN
+            self.open_until = now + self.open_seconds
+        return True
     
-    def mark_rate_limited(self, cooldown_seconds: float = 60):
-        """Mark provider as rate limited."""
+    def mark_rate_limited(self, cooldown_seconds: float = 30, max_cooldown: float = 600) -> float:
+        """
+        Mark provider as rate limited.
+        
+        The cooldown doubles for each rate limit since the last success (up to
+        max_cooldown), plus a few seconds of jitter so providers don't all
+        get re-probed at once.
+        
+        Returns:
+            The cooldown applied, in seconds
+        """
+        cooldown = min(max_cooldown, cooldown_seconds * (2 ** self.consecutive_rate_limits)) + random.random() * 5
+        self.consecutive_rate_limits += 1
         self.status = ProviderStatus.RATE_LIMITED
-        self.rate_limit_until = time.time() + cooldown_seconds
-        logger.warning(f"Provider {self.name} rate limited for {cooldown_seconds}s")
+        self.rate_limit_until = time.monotonic() + cooldown
+        logger.warning(f"Provider {self.name} rate limited for {cooldown:.0f}s")
+        return cooldown
     
     def mark_success(self):
         """Mark successful request."""
         self.status = ProviderStatus.AVAILABLE
         self.consecutive_errors = 0
+        self.consecutive_rate_limits = 0
         self.total_requests += 1
         self.total_successes += 1
     
     def mark_error(self):
-        """Mark failed request."""
+        """Mark failed request; opens the circuit after 3 errors or a failed probe."""
         self.consecutive_errors += 1
         self.total_requests += 1
-        if self.consecutive_errors >= 3:
+        if self.consecutive_errors >= 3 or self.status == ProviderStatus.HALF_OPEN:
             self.status = ProviderStatus.ERROR
+            self.open_until = time.monotonic() + self.open_seconds
+
+
+class Throttle:
+    """
+    Per-provider concurrency limit plus token-bucket pacing.
+    
+    Allows at most `concurrency` calls in flight and `rate` calls per `period`
+    (bursting up to `rate` after idle time), so bursts are spread out instead of
+    tripping the provider's 429s.
+    """
+    
+    def __init__(self, rate: float, concurrency: int, period: float = 1.0):
+        self.rate = rate
+        self.period = period
+        self.capacity = max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._lock = asyncio.Lock()
+    
+    def pause(self, seconds: float):
+        """Stop admitting calls for `seconds` (e.g. after a 429)."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+    
+    async def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for a concurrency slot and a token.
+        
+        Args:
+            timeout: Give up after this many seconds (None waits indefinitely)
+        
+        Returns:
+            True once admitted (caller must release()), or False if the
+            throttle is paused or the timeout passed, so the caller can fail
+            over instead of waiting
+        """
+        try:
+            async with asyncio.timeout(timeout):
+                return await self._acquire()
+        except TimeoutError:
+            return False
+    
+    async def _acquire(self) -> bool:
+        """Wait for a slot and a token without a deadline."""
+        await self._semaphore.acquire()
+        try:
+            async with self._lock:
+                while True:
+                    now = time.monotonic()
+                    if now < self._paused_until:
+                        self._semaphore.release()
+                        return False
+                    
+                    # Refill for the time since the last update
+                    self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate / self.period)
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return True
+                    await asyncio.sleep((1 - self._tokens) * self.period / self.rate)
+        except BaseException:
+            self._semaphore.release()
+            raise
+    
+    def release(self):
+        """Free the concurrency slot taken by acquire()."""
+        self._semaphore.release()
 
 
 class RateLimitAwareQueue:
@@ -66,7 +216,8 @@ class RateLimitAwareQueue:
     Request queue with rate limiting awareness.
     
     Features:
-    - Semaphore-based concurrent request limiting
+    - max_concurrent queue workers bound concurrent queued requests
+    - Per-provider token-bucket pacing
     - Multi-provider waterfall failover
     - Exponential backoff on rate limits
     - Request deduplication via cache
@@ -76,42 +227,55 @@ class RateLimitAwareQueue:
         self,
         max_concurrent: int = 3,
         cache_ttl_seconds: int = 300,
-        provider_order: List[str] = None
+        provider_order: List[str] = None,
+        max_cache_size: int = 1000,
+        provider_rates: Dict[str, float] = None,
+        hedge_delay: Optional[float] = None,
+        provider_wait_timeout: Optional[float] = None,
+        spread_load: bool = False
     ):
         self.max_concurrent = max_concurrent
         self.cache_ttl = cache_ttl_seconds
+        self.max_cache_size = max_cache_size
+        # Seconds to wait on a provider before also trying the next one (None disables hedging)
+        self.hedge_delay = hedge_delay
+        # Max seconds to wait for a busy provider's throttle before failing over
+        self.provider_wait_timeout = provider_wait_timeout
+        # Rotate provider_order per cache key instead of always starting at the top
+        self.spread_load = spread_load
         self.provider_order = provider_order or ["gemini", "groq", "together", "local"]
         
-        # Semaphore for throttling
-        self.semaphore = asyncio.Semaphore(max_concurrent)
-        
         # Provider states
         self.providers: Dict[str, ProviderState] = {
             name: ProviderState(name=name) for name in self.provider_order
         }
         
-        # Request cache
-        self.cache: Dict[str, Dict[str, Any]] = {}
-        
-        # Queue for pending requests
-        self.pending_queue: asyncio.Queue = asyncio.Queue()
-        
-        # Stats
-        self.stats = {
-            "queued": 0,
-            "processed": 0,
-            "errors": 0,
-            "cache_hits": 0,
-            "rate_limits": 0,
-            "total_requests": 0,
-            "failovers": 0,
-            "local_fallbacks": 0
+        # Per-provider pacing (calls/second); unlisted providers get max_concurrent/s
+        provider_rates = provider_rates or {}
+        self.throttles: Dict[str, Throttle] = {
+            name: Throttle(rate=provider_rates.get(name, max_concurrent), concurrency=max_concurrent)
+            for name in self.provider_order if name != "local"
         }
         
-        # Burst Protection: Map of client_key -> list of timestamps
-        self.client_request_history: Dict[str, List[float]] = {}
+        # Request cache in LRU order, plus a min-heap of (expires_at, key)
+        # so expired entries are found without scanning the cache
+        self.cache: OrderedDict[str, Dict[str, Any]] = OrderedDict()
+        self._expiry_heap: List[Tuple[float, str]] = []
+        
+        # Failover executions in progress, so identical requests share one
+        self.inflight: Dict[str, asyncio.Future] = {}
         
-        # Worker task (lazy initialized)
+        # Queue for pending requests, bounded so bursts get backpressure
+        self.pending_queue: asyncio.Queue = asyncio.Queue(maxsize=max_concurrent * 4)
+        
+        # Stats counters, indexed by the _STAT_* constants
+        self._counters = array('Q', bytes(8 * len(_STAT_NAMES)))
+        
+        # Burst Protection: Map of client_key -> timestamps, oldest first
+        self.client_request_history: Dict[str, deque] = defaultdict(deque)
+        self._last_history_reap = time.monotonic()
+        
+        # Task supervising the max_concurrent workers (lazy initialized)
         self._worker_task = None
 
     def check_client_limit(self, client_key: str, limit: int = 5, window: int = 60) -> bool:
@@ -119,29 +283,61 @@ class RateLimitAwareQueue:
         if not client_key:
             return True
             
-        now = time.time()
-        history = self.client_request_history.get(client_key, [])
-        history = [t for t in history if now - t < window]
+        now = time.monotonic()
+        cutoff = now - window
+        
+        # Drop clients that have gone quiet, at most once per window
+        if now - self._last_history_reap > window:
+            self._reap_client_history(cutoff)
+            self._last_history_reap = now
+        
+        history = self.client_request_history[client_key]
+        while history and history[0] <= cutoff:
+            history.popleft()
         
         if len(history) >= limit:
             logger.warning(f"Rate limit exceeded for client {client_key}")
             return False
             
         history.append(now)
-        self.client_request_history[client_key] = history
         return True
     
+    def _reap_client_history(self, cutoff: float):
+        """Forget clients with no requests since cutoff."""
+        idle = [key for key, history in self.client_request_history.items() if not history or history[-1] <= cutoff]
+        for key in idle:
+            del self.client_request_history[key]
+    
     def _ensure_worker_running(self):
-        """Ensure worker is running."""
+        """Ensure workers are running (restarting them if they crashed)."""
         if self._worker_task is None or self._worker_task.done():
+            if self._worker_task is not None and not self._worker_task.cancelled() and self._worker_task.exception():
+                logger.error(f"Queue workers crashed, restarting: {self._worker_task.exception()}")
             try:
                 loop = asyncio.get_running_loop()
-                self._worker_task = loop.create_task(self._worker())
+                self._worker_task = loop.create_task(self._run_workers())
             except RuntimeError:
                 pass  # No loop running yet
 
-    async def submit(self, request_func: Callable, cache_key: str = None, client_key: str = None) -> Any:
-        """Submit a request to the queue."""
+    async def submit(
+        self,
+        request_func: Callable,
+        cache_key: str = None,
+        client_key: str = None,
+        admission_timeout: float = 0.25
+    ) -> Any:
+        """
+        Submit a request to the queue.
+        
+        Args:
+            request_func: Async function to run
+            cache_key: Key for caching the result
+            client_key: Client identifier for burst limiting
+            admission_timeout: Seconds to wait for room in a full queue before
+                shedding the request with the default result
+        
+        Cached dict results are returned as copies, never the cached object.
+        """
         # Ensure worker is running
         self._ensure_worker_running()
         
@@ -151,51 +347,75 @@ class RateLimitAwareQueue:
             return None
 
         # Check cache
-        if cache_key and cache_key in self.cache:
-            entry = self.cache[cache_key]
-            if time.time() - entry["time"] < self.cache_ttl:
-                self.stats["cache_hits"] += 1
-                return entry["data"]
+        if cache_key:
+            cached = self._lookup(cache_key)
+            if cached is not None:
+                self._counters[_STAT_CACHE_HITS] += 1
+                return dict(cached) if isinstance(cached, dict) else cached
         
         # Create future for result
         loop = asyncio.get_running_loop()
         future = loop.create_future()
         
-        await self.pending_queue.put({
-            "func": request_func,
-            "future": future,
-            "cache_key": cache_key
-        })
+        try:
+            await asyncio.wait_for(self.pending_queue.put({
+                "func": request_func,
+                "future": future,
+                "cache_key": cache_key
+            }), timeout=admission_timeout)
+        except asyncio.TimeoutError:
+            self._counters[_STAT_SHED] += 1
+            logger.warning("Request queue full, shedding request")
+            return self._default_result()
         
-        self.stats["queued"] += 1
+        self._counters[_STAT_QUEUED] += 1
         return await future
 
+    async def _run_workers(self):
+        """Run max_concurrent workers; if one crashes, the rest are cancelled with it."""
+        async with asyncio.TaskGroup() as workers:
+            for n in range(self.max_concurrent):
+                workers.create_task(self._worker(), name=f"request-queue-worker-{n}")
+    
     async def _worker(self):
         """Worker to process queued requests."""
         while True:
+            item = await self.pending_queue.get()
             try:
-                item = await self.pending_queue.get()
-                func = item["func"]
-                future = item["future"]
-                cache_key = item.get("cache_key")
-                
-                async with self.semaphore:
-                    try:
-                        result = await func()
-                        if cache_key and result:
-                            self._cache_result(cache_key, result)
-                        
-                        if not future.done():
-                            future.set_result(result)
-                    except Exception as e:
-                        if not future.done():
-                            future.set_exception(e)
-                    finally:
-                        self.stats["processed"] += 1
-                        self.pending_queue.task_done()
-            except Exception as e:
-                logger.error(f"Queue worker error: {e}")
-                await asyncio.sleep(1)
+                await self._process(item)
+            finally:
+                self.pending_queue.task_done()
+    
+    async def _process(self, item: Dict[str, Any]):
+        """Run one queued request and resolve its future."""
+        future = item["future"]
+        if future.done():
+            return  # Caller gave up while queued
+        
+        try:
+            result = await item["func"]()
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+        else:
+            cache_key = item.get("cache_key")
+            if cache_key and result:
+                self._cache_result(cache_key, result)
+            
+            if not future.done():
+                future.set_result(result)
+        finally:
+            self._counters[_STAT_PROCESSED] += 1
+    
+    async def stop(self):
+        """Cancel the workers; queued requests stay queued until the next submit."""
+        if self._worker_task is not None and not self._worker_task.done():
+            self._worker_task.cancel()
+            try:
+                await self._worker_task
+            except asyncio.CancelledError:
+                pass
+        self._worker_task = None
     
     async def execute_with_failover(
         self,
@@ -208,106 +428,238 @@ class RateLimitAwareQueue:
         
         Args:
             cache_key: Unique key for caching
-            provider_functions: Dict mapping provider name to async function
-            local_fallback: Sync function for local-only detection
+            provider_functions: Dict mapping provider name to async function.
+                These should only await network I/O; hand CPU-heavy parsing
+                to run_cpu() so it doesn't block other requests.
+            local_fallback: Sync function for local-only detection (run via run_cpu)
             
         Returns:
-            Detection result from first successful provider
+            Detection result from first successful provider. Every caller gets
+            its own dict; the cached copy is never handed out.
         """
-        self.stats["total_requests"] += 1
-        
-        # Check cache first
-        cached = self._get_cached(cache_key)
-        if cached:
-            self.stats["cache_hits"] += 1
-            return cached
-        
-        # Acquire semaphore for rate limiting
-        async with self.semaphore:
-            result = None
-            used_provider = None
-            
-            # Try providers in order
-            for provider_name in self.provider_order:
-                if provider_name == "local":
-                    continue  # Handle local separately
-                
-                provider = self.providers.get(provider_name)
-                if not provider or not provider.is_available():
-                    continue
-                
-                func = provider_functions.get(provider_name)
-                if not func:
-                    continue
-                
-                try:
-                    result = await func()
-                    provider.mark_success()
+        self._counters[_STAT_TOTAL_REQUESTS] += 1
+        
+        # Check cache first (inlined _get_cached: this is the per-request hot path)
+        cache = self.cache
+        entry = cache.get(cache_key)
+        if entry is not None:
+            if time.monotonic() < entry["expires_at"]:
+                cache.move_to_end(cache_key)
+                self._counters[_STAT_CACHE_HITS] += 1
+                return {**entry["result"], "_cached": True}
+            else:
+                del cache[cache_key]
+        
+        # Join an identical request that is already calling providers
+        pending = self.inflight.get(cache_key)
+        if pending is not None:
+            self._counters[_STAT_INFLIGHT_JOINS] += 1
+            # Shielded so a cancelled joiner doesn't cancel the shared call
+            result = await asyncio.shield(pending)
+            return self._get_cached(cache_key) or dict(result)
+        
+        future = asyncio.get_running_loop().create_future()
+        self.inflight[cache_key] = future
+        try:
+            result = await self._run_failover(cache_key, provider_functions, local_fallback)
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                future.exception()  # Mark retrieved in case nobody joined
+            raise
+        finally:
+            self.inflight.pop(cache_key, None)
+        
+        future.set_result(result)
+        return result
+    
+    async def _run_failover(
+        self,
+        cache_key: str,
+        provider_functions: Dict[str, Callable],
+        local_fallback: Callable
+    ) -> Dict[str, Any]:
+        """Try providers in order, then local fallback, and cache the result."""
+        candidates = self._available_providers(cache_key, provider_functions)
+        
+        # Hedging costs extra provider calls, so skip it while any provider is rate limited
+        hedge = self.hedge_delay is not None and not any(
+            state.status == ProviderStatus.RATE_LIMITED for state in self.providers.values()
+        )
+        if hedge:
+            used_provider, result = await self._hedged_call(candidates)
+        else:
+            used_provider, result = None, None
+            for provider_name, func in candidates:
+                result = await self._call_provider(provider_name, func)
+                if result is not None:
                     used_provider = provider_name
                     break
-                    
-                except Exception as e:
-                    error_str = str(e).lower()
-                    
-                    # Check for rate limit errors
-                    if any(x in error_str for x in ["429", "rate_limit", "resource_exhausted", "quota"]):
-                        provider.mark_rate_limited(cooldown_seconds=60)
-                        self.stats["failovers"] += 1
-                        logger.warning(f"Rate limit hit on {provider_name}, failing over...")
-                    else:
-                        provider.mark_error()
-                        logger.error(f"Error from {provider_name}: {e}")
-            
-            # Fallback to local if all providers failed
-            if result is None:
-                try:
-                    result = local_fallback()
-                    used_provider = "local"
-                    self.stats["local_fallbacks"] += 1
-                    logger.info("Using local fallback detection")
-                except Exception as e:
-                    logger.error(f"Local fallback also failed: {e}")
-                    result = self._default_result()
-                    used_provider = "default"
+        
+        # Fallback to local if all providers failed
+        if result is None:
+            try:
+                result = await self.run_cpu(local_fallback)
+                used_provider = "local"
+                self._counters[_STAT_LOCAL_FALLBACKS] += 1
+                logger.info("Using local fallback detection")
+            except Exception as e:
+                logger.error(f"Local fallback also failed: {e}")
+                result = self._default_result()
+                used_provider = "default"
+        
+        # Add metadata
+        result["_provider"] = used_provider
+        result["_cached"] = False
+        
+        # Cache result
+        self._cache_result(cache_key, result)
+        
+        return result
+    
+    async def run_cpu(self, fn: Callable, *args) -> Any:
+        """Run a synchronous CPU-bound function on the shared worker pool."""
+        return await asyncio.get_running_loop().run_in_executor(_cpu_pool, fn, *args)
+    
+    def _available_providers(self, cache_key: str, provider_functions: Dict[str, Callable]):
+        """Yield (name, func) for providers to try, in order, checking each only when reached."""
+        # Handle local separately; look up functions first so a probe is only claimed if it will be sent
+        configured = [
+            (name, provider_functions[name]) for name in self.provider_order
+            if name != "local" and provider_functions.get(name)
+        ]
+        if self.spread_load and configured:
+            # Start at a provider picked by the key, so load spreads across
+            # providers while retries of one key keep hitting the same one
+            start = zlib.crc32(cache_key.encode()) % len(configured)
+            configured = configured[start:] + configured[:start]
+        
+        for provider_name, func in configured:
+            provider = self.providers.get(provider_name)
+            if not provider or not provider.is_available():
+                continue
             
-            # Add metadata
-            result["_provider"] = used_provider
-            result["_cached"] = False
+            yield provider_name, func
+    
+    async def _call_provider(self, provider_name: str, func: Callable) -> Optional[Dict[str, Any]]:
+        """Call one provider, recording the outcome. Returns None if it failed."""
+        provider = self.providers[provider_name]
+        
+        # Pace calls to the provider's rate budget
+        throttle = self.throttles[provider_name]
+        if not await throttle.acquire(self.provider_wait_timeout):
+            return None  # Paused by a rate limit, or busy past our deadline
+        
+        try:
+            result = await func()
+            provider.mark_success()
+            return result
             
-            # Cache result
-            self._cache_result(cache_key, result)
+        except Exception as e:
+            # Check for rate limit errors
+            if _is_rate_limit_error(e):
+                throttle.pause(provider.mark_rate_limited())
+                self._counters[_STAT_FAILOVERS] += 1
+                logger.warning(f"Rate limit hit on {provider_name}, failing over...")
+            else:
+                provider.mark_error()
+                logger.error(f"Error from {provider_name}: {e}")
+            return None
+        finally:
+            throttle.release()
+    
+    async def _hedged_call(self, candidates) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """
+        Call providers with hedging: if the current one hasn't answered within
+        hedge_delay (or has failed), start the next one alongside it and take
+        whichever answers first.
+        
+        Returns:
+            (provider name, result), or (None, None) if every provider failed
+        """
+        names: Dict[asyncio.Task, str] = {}
+        pending = set()
+        try:
+            for provider_name, func in candidates:
+                if pending:
+                    self._counters[_STAT_HEDGES] += 1  # Previous call is still running
+                task = asyncio.create_task(self._call_provider(provider_name, func))
+                names[task] = provider_name
+                pending.add(task)
+                
+                done, pending = await asyncio.wait(
+                    pending, timeout=self.hedge_delay, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.result() is not None:
+                        return names[task], task.result()
             
-            return result
+            # No more providers to add; wait for the ones still running
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.result() is not None:
+                        return names[task], task.result()
+            return None, None
+        finally:
+            # Cancel the slower calls
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+    
+    def _lookup_entry(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get the cache entry for key if still valid, marking it recently used."""
+        cached = self.cache.get(key)
+        if cached is None:
+            return None
+        if time.monotonic() >= cached["expires_at"]:
+            del self.cache[key]
+            return None
+        self.cache.move_to_end(key)
+        return cached
+    
+    def _lookup(self, key: str) -> Any:
+        """Get the cached result for key if still valid."""
+        cached = self._lookup_entry(key)
+        return None if cached is None else cached["result"]
     
     def _get_cached(self, key: str) -> Optional[Dict[str, Any]]:
-        """Get cached result if valid."""
-        if key in self.cache:
-            cached = self.cache[key]
-            if time.time() < cached["expires_at"]:
-                result = cached["result"].copy()
-                result["_cached"] = True
-                return result
-            else:
-                del self.cache[key]
-        return None
+        """Get a copy of the cached result, marked _cached=True, if valid."""
+        cached = self._lookup(key)
+        return None if cached is None else {**cached, "_cached": True}
     
     def _cache_result(self, key: str, result: Dict[str, Any]):
         """Cache a result."""
+        now = time.monotonic()
+        expires_at = now + self.cache_ttl
         self.cache[key] = {
-            "result": result,
-            "expires_at": time.time() + self.cache_ttl
+            # Snapshot so the caller that produced the result can't change the cached copy
+            "result": dict(result) if isinstance(result, dict) else result,
+            "expires_at": expires_at
         }
+        self.cache.move_to_end(key)
+        heapq.heappush(self._expiry_heap, (expires_at, key))
         
-        # Clean old entries if cache too large
-        if len(self.cache) > 1000:
-            self._cleanup_cache()
+        self._cleanup_cache(now)
+        
+        # Evict least recently used entries if cache still too large
+        while len(self.cache) > self.max_cache_size:
+            self.cache.popitem(last=False)
     
-    def _cleanup_cache(self):
+    def _cleanup_cache(self, now: float = None):
         """Remove expired cache entries."""
-        now = time.time()
-        expired = [k for k, v in self.cache.items() if v["expires_at"] < now]
-        for k in expired:
-            del self.cache[k]
+        if now is None:
+            now = time.monotonic()
+        heap = self._expiry_heap
+        while heap and heap[0][0] < now:
+            expires_at, key = heapq.heappop(heap)
+            cached = self.cache.get(key)
+            # Skip heap items for keys since refreshed or evicted
+            if cached is not None and cached["expires_at"] == expires_at:
+                del self.cache[key]
     
     def _default_result(self) -> Dict[str, Any]:
         """Default result when all methods fail."""
@@ -319,6 +671,11 @@ class RateLimitAwareQueue:
             "error": True
         }
     
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Counter values by name."""
+        return dict(zip(_STAT_NAMES, self._counters))
+    
     def get_stats(self) -> Dict[str, Any]:
         """Get queue statistics."""
         provider_stats = {}
@@ -339,7 +696,7 @@ class RateLimitAwareQueue:
     def get_available_providers(self) -> List[str]:
         """Get list of currently available providers."""
         return [name for name, state in self.providers.items() 
-                if state.is_available() and name != "local"]
+                if state.is_available(claim_probe=False) and name != "local"]
 
 
 # Global instance with NEW provider order: Pollinations → Cerebras → Groq → Gemini
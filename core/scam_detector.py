@@ -4,7 +4,7 @@ Scam detection engine with multi-stage analysis.
 import re
 import json
 import logging
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Set, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 
@@ -21,11 +21,70 @@ from utils.patterns import (
     TACTIC_PATTERNS,
     WHITELIST_PHRASES
 )
+from utils.keyword_index import KeywordIndex
 
 logger = logging.getLogger(__name__)
 
+# Keyword categories with their weights
+KEYWORD_CATEGORIES = [
+    (URGENCY_KEYWORDS, 0.8, "urgency"),
+    (FINANCIAL_KEYWORDS, 0.9, "financial"),
+    (AUTHORITY_KEYWORDS, 0.7, "authority"),
+    (THREAT_KEYWORDS, 0.85, "threat"),
+    (REWARD_KEYWORDS, 0.75, "reward"),
+    (JOB_KEYWORDS, 0.6, "job"),
+    (PHISHING_KEYWORDS, 0.85, "phishing")
+]
 
-@dataclass
+# One index over every keyword the detection stages look for, so each
+# text is scanned once and the stages only test set membership
+_keyword_index = KeywordIndex(
+    [kw for keywords, _, _ in KEYWORD_CATEGORIES for kw in keywords]
+    + [kw for patterns in (SCAM_TYPE_PATTERNS, SCAMMER_TYPE_PATTERNS, TACTIC_PATTERNS)
+       for keywords in patterns.values() for kw in keywords]
+    + ["verify", "account", "otp", "pin"]
+    + WHITELIST_PHRASES
+)
+_whitelist = frozenset(WHITELIST_PHRASES)
+_urgency_keywords = frozenset(URGENCY_KEYWORDS)
+_financial_keywords = frozenset(FINANCIAL_KEYWORDS)
+
+# Scam types, scammer types and tactics as rows of one table, with an
+# inverted incidence map from each keyword to the rows that list it, so
+# the found keywords are counted into every row in a single pass
+_pattern_lists = [
+    (name, keywords)
+    for patterns in (SCAM_TYPE_PATTERNS, SCAMMER_TYPE_PATTERNS, TACTIC_PATTERNS)
+    for name, keywords in patterns.items()
+]
+_pattern_rows = [(name, len(keywords)) for name, keywords in _pattern_lists]
+_scammer_rows_start = len(SCAM_TYPE_PATTERNS)
+_tactic_rows_start = _scammer_rows_start + len(SCAMMER_TYPE_PATTERNS)
+
+
+def _build_incidence(pattern_lists: List[Tuple[str, List[str]]]) -> Dict[str, Tuple[int, ...]]:
+    """Map each keyword to the rows whose keyword list contains it."""
+    incidence: Dict[str, Tuple[int, ...]] = {}
+    for row, (_, keywords) in enumerate(pattern_lists):
+        for kw in set(keywords):
+            incidence[kw] = incidence.get(kw, ()) + (row,)
+    return incidence
+
+
+_pattern_incidence = _build_incidence(_pattern_lists)
+
+
+def _message_text(msg: Any) -> str:
+    """Text of a history entry: its content, or the entry itself as a string."""
+    if type(msg) is str:
+        return msg
+    try:
+        return msg.content
+    except AttributeError:
+        return str(msg)
+
+
+@dataclass(slots=True)
 class ScamDetectionResult:
     """Result of scam detection analysis."""
     is_scam: bool = False
@@ -72,26 +131,27 @@ class ScamDetector:
         
         # Normalize message
         message_lower = message.lower()
+        found = _keyword_index.find(message_lower)
         
         # Check whitelist first (reduce false positives)
-        if self._is_whitelisted(message_lower):
+        if self._is_whitelisted(message_lower, found):
             result.reasoning = "Message matches whitelist pattern"
             return result
         
         # Stage 1: Keyword Analysis
-        keyword_result = self._analyze_keywords(message_lower)
+        keyword_result = self._analyze_keywords(message_lower, found)
         result.keyword_score = keyword_result["score"]
         result.suspicious_elements.extend(keyword_result["matches"])
         
         # Stage 2: Pattern Analysis
-        pattern_result = self._analyze_patterns(message_lower)
+        pattern_result = self._analyze_patterns(message_lower, found)
         result.pattern_score = pattern_result["score"]
         result.scam_type = pattern_result["scam_type"]
         result.scammer_type = pattern_result["scammer_type"]
         result.tactics = pattern_result["tactics"]
         
         # Stage 3: Context Analysis (conversation history)
-        context_result = self._analyze_context(message, conversation_history)
+        context_result = self._analyze_context(message, conversation_history, message_lower)
         result.context_score = context_result["score"]
         
         # Calculate final confidence
@@ -111,88 +171,88 @@ class ScamDetector:
         result.reasoning = self._generate_reasoning(result)
         
         logger.info(
-            f"Scam detection: is_scam={result.is_scam}, "
-            f"confidence={result.confidence:.2f}, "
-            f"type={result.scam_type}"
+            "Scam detection: is_scam=%s, confidence=%.2f, type=%s",
+            result.is_scam, result.confidence, result.scam_type
         )
         
         return result
     
-    def _is_whitelisted(self, message: str) -> bool:
+    def _is_whitelisted(self, message: str, found: Optional[Set[str]] = None) -> bool:
         """Check if message matches whitelist patterns."""
-        for phrase in WHITELIST_PHRASES:
-            if phrase in message:
-                return True
-        return False
+        if found is None:
+            found = _keyword_index.find(message)
+        return not _whitelist.isdisjoint(found)
     
-    def _analyze_keywords(self, message: str) -> Dict:
+    def _analyze_keywords(self, message: str, found: Optional[Set[str]] = None) -> Dict:
         """
         Analyze message for suspicious keywords.
         Returns score (0-1) and list of matched keywords.
         """
+        if found is None:
+            found = _keyword_index.find(message)
+        if not found:
+            return {"score": 0.0, "matches": []}
+        
         matches = []
-        scores = []
+        score_sum = 0.0
+        categories_hit = 0
         
         # Check each keyword category with different weights
-        keyword_categories = [
-            (URGENCY_KEYWORDS, 0.8, "urgency"),
-            (FINANCIAL_KEYWORDS, 0.9, "financial"),
-            (AUTHORITY_KEYWORDS, 0.7, "authority"),
-            (THREAT_KEYWORDS, 0.85, "threat"),
-            (REWARD_KEYWORDS, 0.75, "reward"),
-            (JOB_KEYWORDS, 0.6, "job"),
-            (PHISHING_KEYWORDS, 0.85, "phishing")
-        ]
-        
-        for keywords, weight, category in keyword_categories:
-            category_matches = [kw for kw in keywords if kw in message]
+        for keywords, weight, category in KEYWORD_CATEGORIES:
+            category_matches = [kw for kw in keywords if kw in found]
             if category_matches:
-                matches.extend(category_matches)
+                matches += category_matches
                 # Score based on number of matches and weight
-                category_score = min(len(category_matches) * 0.15 * weight, weight)
-                scores.append(category_score)
+                category_score = len(category_matches) * 0.15 * weight
+                score_sum += category_score if category_score < weight else weight
+                categories_hit += 1
         
         # Calculate overall keyword score
-        if scores:
-            final_score = min(sum(scores) / len(scores) + 0.1 * len(matches), 1.0)
-        else:
-            final_score = 0.0
-        
-        return {"score": final_score, "matches": matches}
+        if not categories_hit:
+            return {"score": 0.0, "matches": matches}
+        final_score = score_sum / categories_hit + 0.1 * len(matches)
+        return {"score": final_score if final_score < 1.0 else 1.0, "matches": matches}
     
-    def _analyze_patterns(self, message: str) -> Dict:
+    def _analyze_patterns(self, message: str, found: Optional[Set[str]] = None) -> Dict:
         """
         Analyze message for scam patterns.
         Classifies scam type and scammer behavior.
         """
+        if found is None:
+            found = _keyword_index.find(message)
         scam_type = None
         scammer_type = None
         tactics = []
         max_score = 0.0
         
+        counts = [0] * len(_pattern_rows)
+        for kw in found:
+            for row in _pattern_incidence.get(kw, ()):
+                counts[row] += 1
+        
         # Detect scam type
-        for stype, keywords in SCAM_TYPE_PATTERNS.items():
-            matches = sum(1 for kw in keywords if kw in message)
-            if matches > 0:
-                score = matches / len(keywords)
+        for row in range(_scammer_rows_start):
+            if counts[row]:
+                stype, total = _pattern_rows[row]
+                score = counts[row] / total
                 if score > max_score:
                     max_score = score
                     scam_type = stype
         
         # Detect scammer behavior type
         scammer_max = 0.0
-        for stype, keywords in SCAMMER_TYPE_PATTERNS.items():
-            matches = sum(1 for kw in keywords if kw in message)
-            if matches > 0:
-                score = matches / len(keywords)
+        for row in range(_scammer_rows_start, _tactic_rows_start):
+            if counts[row]:
+                stype, total = _pattern_rows[row]
+                score = counts[row] / total
                 if score > scammer_max:
                     scammer_max = score
                     scammer_type = stype
         
         # Detect psychological tactics
-        for tactic, keywords in TACTIC_PATTERNS.items():
-            if any(kw in message for kw in keywords):
-                tactics.append(tactic)
+        for row in range(_tactic_rows_start, len(_pattern_rows)):
+            if counts[row]:
+                tactics.append(_pattern_rows[row][0])
         
         return {
             "score": max_score,
@@ -204,10 +264,12 @@ class ScamDetector:
     def _analyze_context(
         self, 
         message: str, 
-        conversation_history: Optional[List]
+        conversation_history: Optional[List],
+        message_lower: Optional[str] = None
     ) -> Dict:
         """
         Analyze conversation context for scam patterns.
+        Pass message_lower when the caller has already lowercased message.
         """
         score = 0.0
         
@@ -215,33 +277,35 @@ class ScamDetector:
             return {"score": score}
         
         # Count scam indicators across conversation
-        all_messages = " ".join([
-            msg.content if hasattr(msg, 'content') else str(msg)
-            for msg in conversation_history
-        ]) + " " + message
+        if message_lower is None:
+            message_lower = message.lower()
+        all_messages_lower = " ".join(map(_message_text, conversation_history)).lower() + " " + message_lower
         
-        all_messages_lower = all_messages.lower()
+        # One scan of the whole conversation; the early and recent windows
+        # are picked out of it by position
+        hits = _keyword_index.find_all(all_messages_lower)
+        found = {kw for _, kw in hits}
         
         # Progressive disclosure pattern (common in scams)
         if len(conversation_history) > 2:
-            # Check if urgency increases over time
-            recent = all_messages_lower[-500:]
-            early = all_messages_lower[:500]
-            
-            recent_urgency = sum(1 for kw in URGENCY_KEYWORDS if kw in recent)
-            early_urgency = sum(1 for kw in URGENCY_KEYWORDS if kw in early)
+            # Check if urgency increases over time (last vs first 500 chars)
+            recent_start = len(all_messages_lower) - 500
+            recent_found = {kw for start, kw in hits if start >= recent_start}
+            early_found = {kw for start, kw in hits if start + len(kw) <= 500}
+            recent_urgency = len(_urgency_keywords.intersection(recent_found))
+            early_urgency = len(_urgency_keywords.intersection(early_found))
             
             if recent_urgency > early_urgency:
                 score += 0.2
         
         # Check for escalating financial requests
-        financial_density = sum(1 for kw in FINANCIAL_KEYWORDS if kw in all_messages_lower)
+        financial_density = len(_financial_keywords.intersection(found))
         score += min(financial_density * 0.05, 0.3)
         
         # Check for typical scam conversation flow
-        if "verify" in all_messages_lower and "account" in all_messages_lower:
+        if "verify" in found and "account" in found:
             score += 0.15
-        if "otp" in all_messages_lower or "pin" in all_messages_lower:
+        if "otp" in found or "pin" in found:
             score += 0.2
         
         return {"score": min(score, 1.0)}
@@ -265,7 +329,7 @@ class ScamDetector:
         )
         
         # Boost if multiple high scores
-        high_scores = sum(1 for s in [keyword_score, pattern_score, context_score] if s > 0.6)
+        high_scores = (keyword_score > 0.6) + (pattern_score > 0.6) + (context_score > 0.6)
         if high_scores >= 2:
             confidence = min(confidence * 1.15, 1.0)
         
@@ -313,6 +377,10 @@ class ScamDetector:
         return " ".join(parts)
 
 
+# Terms suggesting a scripted, more sophisticated operation
+_technical_terms_index = KeywordIndex(["verification", "protocol", "system", "process", "department"])
+
+
 class ScammerProfiler:
     """
     Build behavioral profile of scammer based on conversation analysis.
@@ -340,14 +408,12 @@ class ScammerProfiler:
             return profile
         
         # Analyze message patterns
-        all_text = " ".join([
-            msg.content if hasattr(msg, 'content') else str(msg)
-            for msg in conversation_history
-        ]).lower()
+        # Extract each message's text once; it is reused for the length average
+        texts = list(map(_message_text, conversation_history))
+        all_text = " ".join(texts).lower()
         
         # Detect sophistication level
-        technical_terms = ["verification", "protocol", "system", "process", "department"]
-        tech_count = sum(1 for t in technical_terms if t in all_text)
+        tech_count = len(_technical_terms_index.find(all_text))
         
         if tech_count > 5:
             profile["sophistication_level"] = "high"
@@ -363,7 +429,7 @@ class ScammerProfiler:
             "uses_authority": "authority" in detection_result.tactics,
             "uses_fear": "fear" in detection_result.tactics,
             "uses_greed": "greed" in detection_result.tactics,
-            "message_length_avg": self._avg_message_length(conversation_history),
+            "message_length_avg": self._avg_message_length(texts),
             "response_pattern": self._detect_response_pattern(conversation_history)
         }
         
@@ -374,11 +440,7 @@ class ScammerProfiler:
         if not history:
             return "unknown"
         
-        lengths = [
-            len(msg.content) if hasattr(msg, 'content') else len(str(msg))
-            for msg in history
-        ]
-        avg = sum(lengths) / len(lengths)
+        avg = sum(len(_message_text(msg)) for msg in history) / len(history)
         
         if avg < 50:
             return "short"
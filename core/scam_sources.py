@@ -13,15 +13,19 @@ Sources:
 - Social media scam reports
 """
 import re
+import sys
+import heapq
 import logging
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 from datetime import datetime
 from dataclasses import dataclass
 
+from utils.keyword_index import KeywordIndex
+
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ScamReport:
     """A reported scam from external sources."""
     source: str
@@ -208,6 +212,28 @@ KNOWN_SCAM_DATABASE = {
     ],
 }
 
+# Report keywords repeat across reports, so share one object per keyword
+for _reports in KNOWN_SCAM_DATABASE.values():
+    for _report in _reports:
+        _report.keywords[:] = [sys.intern(kw) for kw in _report.keywords]
+del _reports, _report
+
+# Related scam types, also searched for broader matching
+RELATED_SCAM_TYPES = {
+    "digital_arrest": ["impersonation"],
+    "banking": ["upi_fraud", "phishing"],
+    "upi_fraud": ["banking", "phishing"],
+    "job_scam": ["investment"],
+    "lottery": ["phishing"],
+    "impersonation": ["digital_arrest", "tech_support"],
+    "investment": ["job_scam"],
+}
+
+# Index over all report keywords, so a message is scanned once per lookup
+_report_keyword_index = KeywordIndex(
+    kw for reports in KNOWN_SCAM_DATABASE.values() for report in reports for kw in report.keywords
+)
+
 # Known scam phone numbers (redacted for safety, patterns only)
 KNOWN_SCAM_PATTERNS = {
     "phone_prefixes": [
@@ -227,6 +253,14 @@ KNOWN_SCAM_PATTERNS = {
     ]
 }
 
+# Suspicious URL patterns
+_SUSPICIOUS_URL_RE = re.compile(
+    r"bit\.ly|tinyurl|goo\.gl"  # URL shorteners
+    r"|\.xyz$|\.tk$|\.ml$"  # Suspicious TLDs
+    r"|login.*bank|verify.*account",  # Phishing patterns
+    re.IGNORECASE
+)
+
 
 class ScamSourceLookup:
     """
@@ -237,6 +271,33 @@ class ScamSourceLookup:
     def __init__(self):
         self.database = KNOWN_SCAM_DATABASE
         self.patterns = KNOWN_SCAM_PATTERNS
+        # All UPI patterns as one alternation, compiled once
+        self._upi_re = re.compile("|".join(f"(?:{p})" for p in self.patterns["upi_patterns"]))
+        # Per scam type: the reports to search (its own, then related types'),
+        # their warnings, formatted once as reports don't change, and a
+        # keyword -> report positions incidence map
+        self._candidates: Dict[str, Tuple[Tuple[ScamReport, ...], Tuple[str, ...], Dict[str, Tuple[int, ...]]]] = {}
+        for scam_type in [*self.database, *RELATED_SCAM_TYPES]:
+            reports = tuple(
+                report
+                for report_type in [scam_type, *self._get_related_types(scam_type)]
+                for report in self.database.get(report_type, [])
+            )
+            self._candidates[scam_type] = (
+                reports,
+                tuple(self._generate_warning(report) for report in reports),
+                self._build_incidence(reports)
+            )
+        self._stats_cache: Dict[str, Dict] = {}
+    
+    @staticmethod
+    def _build_incidence(reports: Tuple[ScamReport, ...]) -> Dict[str, Tuple[int, ...]]:
+        """Map each report keyword to the positions of the reports containing it."""
+        incidence: Dict[str, Tuple[int, ...]] = {}
+        for position, report in enumerate(reports):
+            for kw in set(report.keywords):
+                incidence[kw] = incidence.get(kw, ()) + (position,)
+        return incidence
     
     def find_similar_scams(
         self,
@@ -250,72 +311,81 @@ class ScamSourceLookup:
         Returns:
             List of matching scam reports with relevance score
         """
-        results = []
-        message_lower = message.lower()
+        candidates = self._candidates.get(scam_type)
+        if candidates is None:
+            return []
+        reports, warnings, incidence = candidates
         
-        # Get reports for this scam type
-        type_reports = self.database.get(scam_type, [])
+        found = _report_keyword_index.find(message.lower())
+        contact_hits = self._count_suspicious_contacts(intelligence)
         
-        # Also check related types
-        related_types = self._get_related_types(scam_type)
-        for rt in related_types:
-            type_reports.extend(self.database.get(rt, []))
+        # Count keyword matches for every report from one pass over the hits
+        keyword_matches = [0] * len(reports)
+        for kw in found:
+            for position in incidence.get(kw, ()):
+                keyword_matches[position] += 1
         
-        for report in type_reports:
-            score = self._calculate_relevance(message_lower, report, intelligence)
+        scored = []
+        for position, matches in enumerate(keyword_matches):
+            score = self._relevance_score(matches, contact_hits)
             if score > 0.3:  # Minimum relevance threshold
-                results.append({
-                    "source": report.source,
-                    "title": report.title,
-                    "description": report.description,
-                    "date_reported": report.date_reported,
-                    "victims_count": report.victims_count,
-                    "amount_lost": report.amount_lost,
-                    "relevance_score": round(score, 2),
-                    "warning": self._generate_warning(report)
-                })
+                scored.append((round(score, 2), position))
         
-        # Sort by relevance
-        results.sort(key=lambda x: x["relevance_score"], reverse=True)
-        return results[:3]  # Top 3 matches
+        # Top 3 by relevance; ties keep report order
+        results = []
+        for score, position in heapq.nlargest(3, scored, key=lambda item: item[0]):
+            report = reports[position]
+            results.append({
+                "source": report.source,
+                "title": report.title,
+                "description": report.description,
+                "date_reported": report.date_reported,
+                "victims_count": report.victims_count,
+                "amount_lost": report.amount_lost,
+                "relevance_score": score,
+                "warning": warnings[position]
+            })
+        return results
     
     def _calculate_relevance(
         self,
         message: str,
         report: ScamReport,
-        intelligence: Dict = None
+        intelligence: Dict = None,
+        found: Optional[Set[str]] = None
     ) -> float:
         """Calculate relevance score between message and report."""
+        if found is None:
+            found = _report_keyword_index.find(message)
+        keyword_matches = sum(1 for kw in report.keywords if kw in found)
+        return self._relevance_score(keyword_matches, self._count_suspicious_contacts(intelligence))
+    
+    def _relevance_score(self, keyword_matches: int, contact_hits: int) -> float:
+        """Relevance from keyword matches and suspicious contact info found."""
         score = 0.0
         
         # Keyword matching
-        keyword_matches = sum(1 for kw in report.keywords if kw in message)
         if keyword_matches > 0:
             score += min(keyword_matches * 0.15, 0.6)
         
-        # Check for known contact info
-        if intelligence:
-            for phone in intelligence.get("phone_numbers", []):
-                if self._is_suspicious_number(phone):
-                    score += 0.2
-            for upi in intelligence.get("upi_ids", []):
-                if self._is_suspicious_upi(upi):
-                    score += 0.2
+        # Known contact info
+        for _ in range(contact_hits):
+            score += 0.2
         
         return min(score, 1.0)
     
+    def _count_suspicious_contacts(self, intelligence: Dict = None) -> int:
+        """Count phone numbers and UPI IDs matching known scam patterns."""
+        if not intelligence:
+            return 0
+        return (
+            sum(1 for phone in intelligence.get("phone_numbers", []) if self._is_suspicious_number(phone))
+            + sum(1 for upi in intelligence.get("upi_ids", []) if self._is_suspicious_upi(upi))
+        )
+    
     def _get_related_types(self, scam_type: str) -> List[str]:
         """Get related scam types for broader matching."""
-        relations = {
-            "digital_arrest": ["impersonation"],
-            "banking": ["upi_fraud", "phishing"],
-            "upi_fraud": ["banking", "phishing"],
-            "job_scam": ["investment"],
-            "lottery": ["phishing"],
-            "impersonation": ["digital_arrest", "tech_support"],
-            "investment": ["job_scam"],
-        }
-        return relations.get(scam_type, [])
+        return RELATED_SCAM_TYPES.get(scam_type, [])
     
     def _is_suspicious_number(self, phone: str) -> bool:
         """Check if phone number matches suspicious patterns."""
@@ -326,11 +396,7 @@ class ScamSourceLookup:
     
     def _is_suspicious_upi(self, upi: str) -> bool:
         """Check if UPI ID matches suspicious patterns."""
-        upi_lower = upi.lower()
-        for pattern in self.patterns["upi_patterns"]:
-            if re.match(pattern, upi_lower):
-                return True
-        return False
+        return self._upi_re.match(upi.lower()) is not None
     
     def _generate_warning(self, report: ScamReport) -> str:
         """Generate a user-friendly warning message."""
@@ -343,6 +409,22 @@ class ScamSourceLookup:
     
     def get_scam_statistics(self, scam_type: str) -> Dict:
         """Get statistics about a scam type."""
+        if scam_type not in self.database:
+            return {"known": False}
+        
+        stats = self._stats_cache.get(scam_type)
+        if stats is None:
+            # Reports are static, so each known type's statistics are computed once
+            stats = self._stats_cache[scam_type] = self._compute_scam_statistics(scam_type)
+        
+        # Callers get their own copy of the mutable sources list
+        result = dict(stats)
+        if "sources" in result:
+            result["sources"] = list(result["sources"])
+        return result
+    
+    def _compute_scam_statistics(self, scam_type: str) -> Dict:
+        """Compute statistics about a scam type from its reports."""
         reports = self.database.get(scam_type, [])
         
         if not reports:
@@ -379,17 +461,8 @@ class ScamSourceLookup:
         if upi and self._is_suspicious_upi(upi):
             warnings.append(f"UPI {upi} matches patterns used by scammers")
         
-        if url:
-            # Check for suspicious URL patterns
-            suspicious_url_patterns = [
-                r"bit\.ly", r"tinyurl", r"goo\.gl",  # URL shorteners
-                r"\.xyz$", r"\.tk$", r"\.ml$",  # Suspicious TLDs
-                r"login.*bank", r"verify.*account",  # Phishing patterns
-            ]
-            for pattern in suspicious_url_patterns:
-                if re.search(pattern, url.lower()):
-                    warnings.append(f"URL {url} matches phishing patterns")
-                    break
+        if url and _SUSPICIOUS_URL_RE.search(url):
+            warnings.append(f"URL {url} matches phishing patterns")
         
         if warnings:
             return True, " | ".join(warnings)
@@ -17,18 +17,50 @@ Sources:
 - Phone number prefix analysis
 """
 import re
+import os
 import json
+import atexit
 import logging
-from typing import Dict, List, Optional, Tuple
+import threading
+from typing import Any, Dict, List, Optional, Tuple
 from dataclasses import dataclass, field
+from functools import lru_cache
 from datetime import datetime
+from urllib.parse import urlsplit
 from pathlib import Path
 import hashlib
 
+from utils.keyword_index import KeywordIndex
+from utils.wal import WriteAheadLog
+
 logger = logging.getLogger(__name__)
 
+# orjson is several times faster than stdlib json; fall back if not installed.
+# The database snapshot stays indented so it remains readable on disk.
+try:
+    import orjson
+    
+    def _dumps_indented(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    
+    _loads = orjson.loads
+except ImportError:
+    orjson = None
+    
+    def _dumps_indented(obj: Any) -> bytes:
+        return json.dumps(obj, indent=2).encode()
+    
+    _loads = json.loads
 
-@dataclass
+# Identifiers reported at least this many times are confirmed scammers
+CONFIRMED_REPORT_COUNT = 5
+
+# Reports are appended to a write-ahead log next to the database file, which
+# is folded into a fresh snapshot once it holds this many entries (or at exit)
+WAL_ROTATE_ENTRIES = 1000
+
+
+@dataclass(slots=True)
 class VerificationResult:
     """Result of scammer verification."""
     identifier: str
@@ -111,6 +143,297 @@ VALID_INDIAN_MOBILE_PREFIXES = [
     "6", "7", "8", "9"  # Indian mobile numbers start with these
 ]
 
+# Toll-free number patterns (real toll-free numbers are inbound only)
+TOLL_FREE_PATTERNS = ["1800", "1860"]
+
+# URL shorteners (hide the real destination)
+URL_SHORTENERS = ["bit.ly", "tinyurl", "goo.gl", "t.co", "ow.ly", "is.gd", "buff.ly", "cutt.ly"]
+
+# Suspicious top-level domains
+SUSPICIOUS_TLDS = [".xyz", ".tk", ".ml", ".ga", ".cf", ".gq", ".top", ".work", ".click"]
+
+# Brands commonly impersonated in phishing URLs, with the keywords that name them
+BRAND_KEYWORDS = {
+    "sbi": ["sbi", "statebank"],
+    "hdfc": ["hdfc"],
+    "icici": ["icici"],
+    "axis": ["axis"],
+    "paytm": ["paytm"],
+    "phonepe": ["phonepe"],
+    "gpay": ["googlepay", "gpay"],
+    "amazon": ["amazon"],
+    "flipkart": ["flipkart"],
+}
+
+# Domain suffixes each brand legitimately serves from
+BRAND_DOMAIN_SUFFIXES = [".com", ".in", ".co.in"]
+
+# Login/verify/update keywords in URLs (phishing indicators)
+PHISHING_PATH_KEYWORDS = ["login", "verify", "update", "secure", "account", "confirm", "signin"]
+
+# Official names impersonated in UPI handles, in the order they are reported
+OFFICIAL_UPI_NAMES = ["sbi", "hdfc", "icici", "axis", "rbi", "paytm", "phonepe", "gpay"]
+
+# Identifier hashing is keyed lookup, not cryptography, so BLAKE2b (much
+# cheaper than SHA-256 here) is used; SHA-256 only to find legacy entries
+_blake2b = hashlib.blake2b
+_sha256 = hashlib.sha256
+
+
+@lru_cache(maxsize=4096)
+def _identifier_hash(identifier: str) -> str:
+    """Database key for an identifier (memoized, as identifiers recur across messages)."""
+    return _blake2b(identifier.lower().encode(), digest_size=8).hexdigest()
+
+
+@lru_cache(maxsize=4096)
+def _legacy_identifier_hash(identifier: str) -> str:
+    """SHA-256 based key from before the BLAKE2 switch, checked on every database miss."""
+    return _sha256(identifier.lower().encode()).hexdigest()[:16]
+
+
+# Keyword indexes, so each identifier is scanned once
+_UPI_KEYWORD_INDEX = KeywordIndex(SUSPICIOUS_UPI_KEYWORDS + OFFICIAL_UPI_NAMES)
+_BRAND_KEYWORD_INDEX = KeywordIndex(kw for keywords in BRAND_KEYWORDS.values() for kw in keywords)
+_PATH_KEYWORD_INDEX = KeywordIndex(PHISHING_PATH_KEYWORDS)
+
+# Tuples for a single str.endswith call
+_LEGITIMATE_UPI_SUFFIXES = tuple(LEGITIMATE_UPI_SUFFIXES)
+_SUSPICIOUS_TLDS = tuple(SUSPICIOUS_TLDS)
+
+# Phone prefixes without spaces, as they appear in a cleaned number
+_SUSPICIOUS_PHONE_PREFIX_PAIRS = tuple((prefix, prefix.replace(" ", "")) for prefix in SUSPICIOUS_PHONE_PREFIXES)
+_SUSPICIOUS_PHONE_PREFIXES_CLEAN = tuple(prefix_clean for _, prefix_clean in _SUSPICIOUS_PHONE_PREFIX_PAIRS)
+
+# Sets for intersecting with the keywords found in an identifier
+_OFFICIAL_UPI_NAMES = frozenset(OFFICIAL_UPI_NAMES)
+_VALID_INDIAN_MOBILE_PREFIXES = frozenset(VALID_INDIAN_MOBILE_PREFIXES)
+
+# Shorteners as whole hostname labels, matched against ".<host>."
+_SHORTENER_LABELS = tuple((shortener, f".{shortener}.") for shortener in URL_SHORTENERS)
+
+# The brand each brand keyword names
+_KEYWORD_BRANDS = {kw: brand for brand, keywords in BRAND_KEYWORDS.items() for kw in keywords}
+
+# The handles each official name legitimately owns
+_OFFICIAL_UPI_HANDLES = {name: (f"@{name}", f"@ok{name}") for name in OFFICIAL_UPI_NAMES}
+
+
+def _build_brand_domain_trie() -> Dict:
+    """Trie of legitimate brand domains keyed by reversed labels (in -> co -> sbi)."""
+    trie: Dict = {}
+    for brand in BRAND_KEYWORDS:
+        for suffix in BRAND_DOMAIN_SUFFIXES:
+            node = trie
+            for label in reversed(f"{brand}{suffix}".split(".")):
+                node = node.setdefault(label, {})
+            node[""] = brand
+    return trie
+
+
+_BRAND_DOMAIN_TRIE = _build_brand_domain_trie()
+
+# Compiled once at import
+_SUSPICIOUS_UPI_RE = re.compile("|".join(f"(?:{p})" for p in SUSPICIOUS_UPI_PATTERNS))
+_IFSC_RE = re.compile(r'^[A-Z]{4}0[A-Z0-9]{6}$')
+_IPV4_HOST_RE = re.compile(r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}')
+
+
+# =============================================================================
+# PATTERN SIGNALS
+# =============================================================================
+# Pattern checks depend only on the normalized identifier, never on the
+# reported database, so their results are memoized. Each returns
+# (score, reason) pairs in the order they apply.
+
+Signals = Tuple[Tuple[float, str], ...]
+
+
+@lru_cache(maxsize=4096)
+def _upi_signals(upi_lower: str) -> Signals:
+    """Pattern-based risk signals for a lowercased, stripped UPI ID."""
+    signals = []
+    
+    # Check for suspicious keywords
+    found = _UPI_KEYWORD_INDEX.find(upi_lower)
+    keyword_matches = [kw for kw in SUSPICIOUS_UPI_KEYWORDS if kw in found] if found else []
+    
+    if keyword_matches:
+        signals.append((
+            min(len(keyword_matches) * 0.15, 0.4),
+            f"Contains suspicious keywords: {', '.join(keyword_matches[:3])}"
+        ))
+    
+    # Check against suspicious patterns
+    if _SUSPICIOUS_UPI_RE.match(upi_lower):
+        signals.append((0.2, "Matches suspicious pattern"))
+    
+    # Check handle suffix
+    if not upi_lower.endswith(_LEGITIMATE_UPI_SUFFIXES) and "@" in upi_lower:
+        signals.append((0.1, "Unusual UPI handle suffix"))
+    
+    # Check for impersonation attempts
+    named = found & _OFFICIAL_UPI_NAMES
+    if named:
+        for name in OFFICIAL_UPI_NAMES:
+            if name in named and not upi_lower.endswith(_OFFICIAL_UPI_HANDLES[name]):
+                signals.append((0.25, f"Possible impersonation of {name.upper()}"))
+                break
+    
+    # Check for numeric-heavy handles (often scam accounts)
+    handle_part = upi_lower.split("@")[0] if "@" in upi_lower else upi_lower
+    digit_ratio = sum(map(str.isdigit, handle_part)) / len(handle_part) if handle_part else 0
+    if digit_ratio > 0.6:
+        signals.append((0.15, "Handle is mostly numbers (possible bot account)"))
+    
+    return tuple(signals)
+
+
+@lru_cache(maxsize=4096)
+def _phone_signals(phone_clean: str) -> Signals:
+    """Pattern-based risk signals for a phone number with separators removed."""
+    signals = []
+    
+    # Check for suspicious prefixes
+    if phone_clean.startswith(_SUSPICIOUS_PHONE_PREFIXES_CLEAN):
+        prefix = next(
+            prefix for prefix, prefix_clean in _SUSPICIOUS_PHONE_PREFIX_PAIRS
+            if phone_clean.startswith(prefix_clean)
+        )
+        signals.append((0.35, f"Suspicious prefix: {prefix} (often used by scammers)"))
+    
+    # Check if valid Indian mobile
+    if phone_clean.startswith("+91") or phone_clean.startswith("91"):
+        # Extract the main number
+        main_num = phone_clean.replace("+91", "").replace("91", "", 1).lstrip("0")
+        
+        if len(main_num) == 10:
+            first_digit = main_num[0]
+            if first_digit not in _VALID_INDIAN_MOBILE_PREFIXES:
+                signals.append((0.2, "Not a valid Indian mobile number format"))
+        else:
+            signals.append((0.15, "Invalid phone number length"))
+    
+    # Check for international numbers claiming to be Indian officials
+    if not phone_clean.startswith("+91") and not phone_clean.startswith("91"):
+        if phone_clean.startswith("+"):
+            signals.append((0.25, "International number (Indian officials don't call from abroad)"))
+    
+    # Check for toll-free impersonation
+    for pattern in TOLL_FREE_PATTERNS:
+        if pattern in phone_clean:
+            # Real toll-free numbers are inbound only
+            signals.append((0.1, "Contains toll-free pattern (may be impersonation)"))
+    
+    return tuple(signals)
+
+
+@lru_cache(maxsize=4096)
+def _bank_account_signals(account_clean: str, ifsc: Optional[str]) -> Signals:
+    """Pattern-based risk signals for a bank account number and optional IFSC."""
+    signals = []
+    
+    # Basic validation
+    if not account_clean.isdigit():
+        signals.append((0.2, "Invalid account number format"))
+    
+    # Length check (Indian accounts are typically 9-18 digits)
+    if len(account_clean) < 9 or len(account_clean) > 18:
+        signals.append((0.15, "Unusual account number length"))
+    
+    # IFSC validation if provided
+    if ifsc:
+        ifsc_clean = ifsc.upper().strip()
+        # IFSC format: 4 letters + 0 + 6 alphanumeric
+        if not _IFSC_RE.match(ifsc_clean):
+            signals.append((0.2, "Invalid IFSC code format"))
+    
+    # Check for suspicious patterns (repeated digits often fake)
+    if len(set(account_clean)) <= 3:
+        signals.append((0.25, "Account number has suspicious pattern (few unique digits)"))
+    
+    return tuple(signals)
+
+
+@lru_cache(maxsize=4096)
+def _url_signals(url_lower: str) -> Signals:
+    """Pattern-based risk signals for a lowercased, stripped URL."""
+    signals = []
+    # Parsed once; domain checks look at the hostname only
+    host = _url_hostname(url_lower)
+    
+    # URL shorteners (hide real destination)
+    dotted_host = f".{host}."
+    for shortener, label in _SHORTENER_LABELS:
+        if label in dotted_host:
+            signals.append((0.3, f"Uses URL shortener ({shortener}) - hides real destination"))
+            break
+    
+    # Suspicious TLDs
+    if host.endswith(_SUSPICIOUS_TLDS):
+        tld = next(tld for tld in SUSPICIOUS_TLDS if host.endswith(tld))
+        signals.append((0.25, f"Suspicious domain extension ({tld})"))
+    
+    # Brand impersonation (anything not hosted on the brand's own domain)
+    named = {_KEYWORD_BRANDS[kw] for kw in _BRAND_KEYWORD_INDEX.find(url_lower)}
+    if named:
+        named.discard(_legitimate_brand(host))
+        for brand in BRAND_KEYWORDS:
+            if brand in named:
+                signals.append((0.35, f"Possible {brand.upper()} impersonation"))
+    
+    # Login/verify/update in URL (phishing indicators, in the path or the host)
+    if _PATH_KEYWORD_INDEX.find(url_lower):
+        signals.append((0.1, "Contains phishing-related path keywords"))
+    
+    # IP address instead of domain
+    if _IPV4_HOST_RE.fullmatch(host):
+        signals.append((0.4, "Uses IP address instead of domain name"))
+    
+    # Excessive subdomains (often used to look legitimate)
+    if host.count('.') > 3:
+        signals.append((0.15, "Excessive subdomains (obfuscation technique)"))
+    
+    return tuple(signals)
+
+
+def _strip_separators(value: str) -> str:
+    """Remove whitespace and dashes (str.split() splits on the same whitespace as \\s)."""
+    return "".join(value.split()).replace("-", "")
+
+
+def _url_hostname(url_lower: str) -> str:
+    """Hostname of a URL, also when it is given without a scheme."""
+    try:
+        hostname = urlsplit(url_lower if "//" in url_lower else "//" + url_lower).hostname
+    except ValueError:
+        return ""
+    return hostname or ""
+
+
+def _legitimate_brand(hostname: str) -> Optional[str]:
+    """The brand whose official domain hosts hostname, if any."""
+    brand = None
+    node = _BRAND_DOMAIN_TRIE
+    for label in reversed(hostname.split(".")):
+        node = node.get(label)
+        if node is None:
+            break
+        brand = node.get("", brand)
+    return brand
+
+
+# Risk levels that raise an alert in batch verification
+_ALERT_RISK_LEVELS = frozenset(("high", "critical"))
+
+
+def _critical_alert(label: str, identifier: str, result: VerificationResult) -> str:
+    """Summary alert line for a high-risk identifier."""
+    level = result.risk_level.upper()
+    if label == "URL":
+        return f"URL: {level} risk phishing link"
+    return f"{label} {identifier}: {level} risk - {result.reasons[0] if result.reasons else 'suspicious'}"
+
 
 class ScammerVerifier:
     """
@@ -118,16 +441,31 @@ class ScammerVerifier:
     Uses pattern analysis + learned database.
     """
     
-    def __init__(self, database_path: str = "scammer_database.json"):
+    def __init__(
+        self,
+        database_path: str = "scammer_database.json",
+        fast_path_threshold: int = CONFIRMED_REPORT_COUNT
+    ):
         self.database_path = Path(database_path)
+        self.wal_path = self.database_path.with_name(self.database_path.name + ".wal")
+        # Identifiers reported this many times are critical without further analysis
+        self.fast_path_threshold = fast_path_threshold
+        
+        # Append-only log of changes since the last snapshot, flushed on every write
+        self._wal = WriteAheadLog(self.wal_path, "scammer database", sync=True)
+        
+        # Guards database changes and the WAL when reports arrive from several threads
+        self._lock = threading.RLock()
+        
         self.database = self._load_database()
+        self._wal.replay(self._apply_wal_entry)
+        atexit.register(self.flush)
     
     def _load_database(self) -> Dict:
         """Load reported scammer database."""
         if self.database_path.exists():
             try:
-                with open(self.database_path, 'r') as f:
-                    return json.load(f)
+                return _loads(self.database_path.read_bytes())
             except Exception as e:
                 logger.warning(f"Failed to load scammer database: {e}")
         
@@ -142,14 +480,41 @@ class ScammerVerifier:
             }
         }
     
+    def _apply_wal_entry(self, wal_entry: Dict[str, Any]):
+        """Apply one logged change to the in-memory database."""
+        table = self.database.setdefault(wal_entry["k"], {})
+        if "r" in wal_entry:
+            entry = table.pop(wal_entry["r"], None)
+            if entry is not None:
+                table[wal_entry["h"]] = entry
+        else:
+            table[wal_entry["h"]] = wal_entry["e"]
+            self.database["metadata"]["total_reports"] = wal_entry["n"]
+    
+    def _log(self, wal_entry: Dict[str, Any]):
+        """Append a change to the WAL, snapshotting once the WAL is large."""
+        self._wal.append(wal_entry)
+        if self._wal.entries >= WAL_ROTATE_ENTRIES:
+            self._save_database()
+    
     def _save_database(self):
-        """Save database to disk."""
+        """Save a full snapshot to disk and drop the WAL it supersedes."""
         try:
-            with open(self.database_path, 'w') as f:
-                json.dump(self.database, f, indent=2)
+            # Write to a temp file and swap it in so a crash never leaves a torn file
+            tmp_path = self.database_path.with_name(self.database_path.name + ".tmp")
+            tmp_path.write_bytes(_dumps_indented(self.database))
+            os.replace(tmp_path, self.database_path)
+            
+            self._wal.reset()
         except Exception as e:
             logger.error(f"Failed to save scammer database: {e}")
     
+    def flush(self):
+        """Fold logged changes into the database file."""
+        with self._lock:
+            if self._wal.entries:
+                self._save_database()
+    
     # =========================================================================
     # MAIN VERIFICATION METHODS
     # =========================================================================
@@ -169,53 +534,17 @@ class ScammerVerifier:
         risk_score = 0.0
         
         # 1. Check if in reported database
-        db_entry = self.database["upi_ids"].get(self._hash_id(upi_id))
+        db_entry = self._find_entry("upi_ids", upi_id)
         if db_entry:
             risk_score += 0.4
             reasons.append(f"Previously reported {db_entry['report_count']} time(s)")
+            if db_entry["report_count"] >= self.fast_path_threshold:
+                return self._confirmed_result(upi_id, "upi", db_entry, reasons)
         
-        # 2. Check for suspicious keywords
-        keyword_matches = []
-        for keyword in SUSPICIOUS_UPI_KEYWORDS:
-            if keyword in upi_lower:
-                keyword_matches.append(keyword)
-        
-        if keyword_matches:
-            risk_score += min(len(keyword_matches) * 0.15, 0.4)
-            reasons.append(f"Contains suspicious keywords: {', '.join(keyword_matches[:3])}")
-        
-        # 3. Check against suspicious patterns
-        for pattern in SUSPICIOUS_UPI_PATTERNS:
-            if re.match(pattern, upi_lower):
-                risk_score += 0.2
-                reasons.append(f"Matches suspicious pattern")
-                break
-        
-        # 4. Check handle suffix
-        suffix_found = False
-        for suffix in LEGITIMATE_UPI_SUFFIXES:
-            if upi_lower.endswith(suffix):
-                suffix_found = True
-                break
-        
-        if not suffix_found and "@" in upi_lower:
-            risk_score += 0.1
-            reasons.append("Unusual UPI handle suffix")
-        
-        # 5. Check for impersonation attempts
-        official_names = ["sbi", "hdfc", "icici", "axis", "rbi", "paytm", "phonepe", "gpay"]
-        for name in official_names:
-            if name in upi_lower and not upi_lower.endswith(f"@{name}") and not upi_lower.endswith(f"@ok{name}"):
-                risk_score += 0.25
-                reasons.append(f"Possible impersonation of {name.upper()}")
-                break
-        
-        # 6. Check for numeric-heavy handles (often scam accounts)
-        handle_part = upi_lower.split("@")[0] if "@" in upi_lower else upi_lower
-        digit_ratio = sum(c.isdigit() for c in handle_part) / len(handle_part) if handle_part else 0
-        if digit_ratio > 0.6:
-            risk_score += 0.15
-            reasons.append("Handle is mostly numbers (possible bot account)")
+        # 2-6. Pattern analysis
+        for score, reason in _upi_signals(upi_lower):
+            risk_score += score
+            reasons.append(reason)
         
         # Calculate final result
         risk_score = min(risk_score, 1.0)
@@ -245,51 +574,22 @@ class ScammerVerifier:
         4. Database lookup
         """
         # Normalize phone number
-        phone_clean = re.sub(r'[\s\-\(\)]', '', phone)
+        phone_clean = _strip_separators(phone).replace('(', '').replace(')', '')
         reasons = []
         risk_score = 0.0
         
         # 1. Check if in reported database
-        db_entry = self.database["phone_numbers"].get(self._hash_id(phone_clean))
+        db_entry = self._find_entry("phone_numbers", phone_clean)
         if db_entry:
             risk_score += 0.5
             reasons.append(f"Previously reported {db_entry['report_count']} time(s)")
+            if db_entry["report_count"] >= self.fast_path_threshold:
+                return self._confirmed_result(phone, "phone", db_entry, reasons)
         
-        # 2. Check for suspicious prefixes
-        for prefix in SUSPICIOUS_PHONE_PREFIXES:
-            prefix_clean = prefix.replace(" ", "")
-            if phone_clean.startswith(prefix_clean):
-                risk_score += 0.35
-                reasons.append(f"Suspicious prefix: {prefix} (often used by scammers)")
-                break
-        
-        # 3. Check if valid Indian mobile
-        if phone_clean.startswith("+91") or phone_clean.startswith("91"):
-            # Extract the main number
-            main_num = phone_clean.replace("+91", "").replace("91", "", 1).lstrip("0")
-            
-            if len(main_num) == 10:
-                first_digit = main_num[0]
-                if first_digit not in VALID_INDIAN_MOBILE_PREFIXES:
-                    risk_score += 0.2
-                    reasons.append("Not a valid Indian mobile number format")
-            else:
-                risk_score += 0.15
-                reasons.append("Invalid phone number length")
-        
-        # 4. Check for international numbers claiming to be Indian officials
-        if not phone_clean.startswith("+91") and not phone_clean.startswith("91"):
-            if phone_clean.startswith("+"):
-                risk_score += 0.25
-                reasons.append("International number (Indian officials don't call from abroad)")
-        
-        # 5. Check for toll-free impersonation
-        toll_free_patterns = ["1800", "1860"]
-        for pattern in toll_free_patterns:
-            if pattern in phone_clean:
-                # Real toll-free numbers are inbound only
-                risk_score += 0.1
-                reasons.append("Contains toll-free pattern (may be impersonation)")
+        # 2-5. Pattern analysis
+        for score, reason in _phone_signals(phone_clean):
+            risk_score += score
+            reasons.append(reason)
         
         risk_score = min(risk_score, 1.0)
         risk_level = self._get_risk_level(risk_score)
@@ -314,38 +614,22 @@ class ScammerVerifier:
         Note: Limited verification possible without API access.
         Uses pattern analysis and database lookup.
         """
-        account_clean = re.sub(r'[\s\-]', '', account_number)
+        account_clean = _strip_separators(account_number)
         reasons = []
         risk_score = 0.0
         
         # 1. Check if in reported database
-        db_entry = self.database["bank_accounts"].get(self._hash_id(account_clean))
+        db_entry = self._find_entry("bank_accounts", account_clean)
         if db_entry:
             risk_score += 0.6
             reasons.append(f"Previously reported {db_entry['report_count']} time(s) in scams")
+            if db_entry["report_count"] >= self.fast_path_threshold:
+                return self._confirmed_result(account_number, "bank_account", db_entry, reasons)
         
-        # 2. Basic validation
-        if not account_clean.isdigit():
-            risk_score += 0.2
-            reasons.append("Invalid account number format")
-        
-        # 3. Length check (Indian accounts are typically 9-18 digits)
-        if len(account_clean) < 9 or len(account_clean) > 18:
-            risk_score += 0.15
-            reasons.append("Unusual account number length")
-        
-        # 4. IFSC validation if provided
-        if ifsc:
-            ifsc_clean = ifsc.upper().strip()
-            # IFSC format: 4 letters + 0 + 6 alphanumeric
-            if not re.match(r'^[A-Z]{4}0[A-Z0-9]{6}$', ifsc_clean):
-                risk_score += 0.2
-                reasons.append("Invalid IFSC code format")
-        
-        # 5. Check for suspicious patterns (repeated digits often fake)
-        if len(set(account_clean)) <= 3:
-            risk_score += 0.25
-            reasons.append("Account number has suspicious pattern (few unique digits)")
+        # 2-5. Pattern analysis
+        for score, reason in _bank_account_signals(account_clean, ifsc):
+            risk_score += score
+            reasons.append(reason)
         
         risk_score = min(risk_score, 1.0)
         risk_level = self._get_risk_level(risk_score)
@@ -378,68 +662,17 @@ class ScammerVerifier:
         risk_score = 0.0
         
         # 1. Check if in reported database
-        db_entry = self.database["urls"].get(self._hash_id(url_lower))
+        db_entry = self._find_entry("urls", url_lower)
         if db_entry:
             risk_score += 0.5
             reasons.append(f"Previously reported as phishing")
+            if db_entry["report_count"] >= self.fast_path_threshold:
+                return self._confirmed_result(url, "url", db_entry, reasons)
         
-        # 2. URL shorteners (hide real destination)
-        shorteners = ["bit.ly", "tinyurl", "goo.gl", "t.co", "ow.ly", "is.gd", "buff.ly", "cutt.ly"]
-        for shortener in shorteners:
-            if shortener in url_lower:
-                risk_score += 0.3
-                reasons.append(f"Uses URL shortener ({shortener}) - hides real destination")
-                break
-        
-        # 3. Suspicious TLDs
-        suspicious_tlds = [".xyz", ".tk", ".ml", ".ga", ".cf", ".gq", ".top", ".work", ".click"]
-        for tld in suspicious_tlds:
-            if url_lower.endswith(tld):
-                risk_score += 0.25
-                reasons.append(f"Suspicious domain extension ({tld})")
-                break
-        
-        # 4. Brand impersonation
-        brands = {
-            "sbi": ["sbi", "statebank"],
-            "hdfc": ["hdfc"],
-            "icici": ["icici"],
-            "axis": ["axis"],
-            "paytm": ["paytm"],
-            "phonepe": ["phonepe"],
-            "gpay": ["googlepay", "gpay"],
-            "amazon": ["amazon"],
-            "flipkart": ["flipkart"],
-        }
-        
-        for brand, keywords in brands.items():
-            for kw in keywords:
-                if kw in url_lower:
-                    # Check if it's the real domain
-                    real_domains = [f"{brand}.com", f"{brand}.in", f"{brand}.co.in"]
-                    is_real = any(rd in url_lower for rd in real_domains)
-                    if not is_real:
-                        risk_score += 0.35
-                        reasons.append(f"Possible {brand.upper()} impersonation")
-                        break
-        
-        # 5. Login/verify/update in URL path (phishing indicators)
-        phishing_paths = ["login", "verify", "update", "secure", "account", "confirm", "signin"]
-        for path in phishing_paths:
-            if path in url_lower:
-                risk_score += 0.1
-                reasons.append("Contains phishing-related path keywords")
-                break
-        
-        # 6. IP address instead of domain
-        if re.search(r'https?://\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}', url_lower):
-            risk_score += 0.4
-            reasons.append("Uses IP address instead of domain name")
-        
-        # 7. Excessive subdomains (often used to look legitimate)
-        if url_lower.count('.') > 3:
-            risk_score += 0.15
-            reasons.append("Excessive subdomains (obfuscation technique)")
+        # 2-7. Pattern analysis
+        for score, reason in _url_signals(url_lower):
+            risk_score += score
+            reasons.append(reason)
         
         risk_score = min(risk_score, 1.0)
         risk_level = self._get_risk_level(risk_score)
@@ -484,60 +717,34 @@ class ScammerVerifier:
             }
         }
         
-        highest_risk_score = 0.0
+        checks = (
+            ("upi_ids", self.verify_upi, "UPI"),
+            ("phone_numbers", self.verify_phone, "Phone"),
+            ("bank_accounts", self.verify_bank_account, None),
+            ("urls", self.verify_url, "URL"),
+        )
         
-        # Verify UPI IDs
-        for upi in intelligence.get("upi_ids", []):
-            result = self.verify_upi(upi)
-            results["upi_ids"].append(result)
-            results["summary"]["total_checked"] += 1
-            if result.is_suspicious:
-                results["summary"]["total_suspicious"] += 1
-            if result.risk_score > highest_risk_score:
-                highest_risk_score = result.risk_score
-            if result.risk_level in ["high", "critical"]:
-                results["summary"]["critical_alerts"].append(
-                    f"UPI {upi}: {result.risk_level.upper()} risk - {result.reasons[0] if result.reasons else 'suspicious'}"
-                )
-        
-        # Verify phone numbers
-        for phone in intelligence.get("phone_numbers", []):
-            result = self.verify_phone(phone)
-            results["phone_numbers"].append(result)
-            results["summary"]["total_checked"] += 1
-            if result.is_suspicious:
-                results["summary"]["total_suspicious"] += 1
-            if result.risk_score > highest_risk_score:
-                highest_risk_score = result.risk_score
-            if result.risk_level in ["high", "critical"]:
-                results["summary"]["critical_alerts"].append(
-                    f"Phone {phone}: {result.risk_level.upper()} risk - {result.reasons[0] if result.reasons else 'suspicious'}"
-                )
-        
-        # Verify bank accounts
-        for account in intelligence.get("bank_accounts", []):
-            result = self.verify_bank_account(account)
-            results["bank_accounts"].append(result)
-            results["summary"]["total_checked"] += 1
-            if result.is_suspicious:
-                results["summary"]["total_suspicious"] += 1
-            if result.risk_score > highest_risk_score:
-                highest_risk_score = result.risk_score
-        
-        # Verify URLs
-        for url in intelligence.get("urls", []):
-            result = self.verify_url(url)
-            results["urls"].append(result)
-            results["summary"]["total_checked"] += 1
-            if result.is_suspicious:
-                results["summary"]["total_suspicious"] += 1
-            if result.risk_score > highest_risk_score:
-                highest_risk_score = result.risk_score
-            if result.risk_level in ["high", "critical"]:
-                results["summary"]["critical_alerts"].append(
-                    f"URL: {result.risk_level.upper()} risk phishing link"
-                )
+        total_checked = 0
+        total_suspicious = 0
+        highest_risk_score = 0.0
+        critical_alerts = results["summary"]["critical_alerts"]
         
+        for key, verify, alert_label in checks:
+            identifiers = intelligence.get(key, [])
+            type_results = [verify(identifier) for identifier in identifiers]
+            results[key] = type_results
+            total_checked += len(type_results)
+            
+            for identifier, result in zip(identifiers, type_results):
+                if result.is_suspicious:
+                    total_suspicious += 1
+                if result.risk_score > highest_risk_score:
+                    highest_risk_score = result.risk_score
+                if alert_label and result.risk_level in _ALERT_RISK_LEVELS:
+                    critical_alerts.append(_critical_alert(alert_label, identifier, result))
+        
+        results["summary"]["total_checked"] = total_checked
+        results["summary"]["total_suspicious"] = total_suspicious
         results["summary"]["highest_risk"] = self._get_risk_level(highest_risk_score)
         
         return results
@@ -569,33 +776,33 @@ class ScammerVerifier:
         }
         db_key = db_key_map.get(identifier_type, f"{identifier_type}s")
         
-        if db_key not in self.database:
-            self.database[db_key] = {}
-        
-        if id_hash not in self.database[db_key]:
-            self.database[db_key][id_hash] = {
-                "identifier_masked": self._mask_identifier(identifier, identifier_type),
-                "report_count": 0,
-                "first_reported": now,
-                "last_reported": now,
-                "scam_types": [],
-                "session_ids": []
-            }
-        
-        entry = self.database[db_key][id_hash]
-        entry["report_count"] += 1
-        entry["last_reported"] = now
-        
-        if scam_type and scam_type not in entry["scam_types"]:
-            entry["scam_types"].append(scam_type)
-        
-        if session_id and session_id not in entry["session_ids"]:
-            entry["session_ids"].append(session_id)
-            # Keep only last 10 sessions
-            entry["session_ids"] = entry["session_ids"][-10:]
-        
-        self.database["metadata"]["total_reports"] += 1
-        self._save_database()
+        with self._lock:
+            table = self.database.setdefault(db_key, {})
+            
+            if self._find_entry(db_key, identifier) is None:
+                table[id_hash] = {
+                    "identifier_masked": self._mask_identifier(identifier, identifier_type),
+                    "report_count": 0,
+                    "first_reported": now,
+                    "last_reported": now,
+                    "scam_types": [],
+                    "session_ids": []
+                }
+            
+            entry = table[id_hash]
+            entry["report_count"] += 1
+            entry["last_reported"] = now
+            
+            if scam_type and scam_type not in entry["scam_types"]:
+                entry["scam_types"].append(scam_type)
+            
+            if session_id and session_id not in entry["session_ids"]:
+                entry["session_ids"].append(session_id)
+                # Keep only last 10 sessions
+                entry["session_ids"] = entry["session_ids"][-10:]
+            
+            self.database["metadata"]["total_reports"] += 1
+            self._log({"k": db_key, "h": id_hash, "e": entry, "n": self.database["metadata"]["total_reports"]})
         
         logger.info(f"Reported scammer {identifier_type}: {self._mask_identifier(identifier, identifier_type)}")
     
@@ -605,7 +812,28 @@ class ScammerVerifier:
     
     def _hash_id(self, identifier: str) -> str:
         """Create hash of identifier for storage (privacy)."""
-        return hashlib.sha256(identifier.lower().encode()).hexdigest()[:16]
+        return _identifier_hash(identifier)
+    
+    def _legacy_hash_id(self, identifier: str) -> str:
+        """SHA-256 based hash used by databases written before the BLAKE2 switch."""
+        return _legacy_identifier_hash(identifier)
+    
+    def _find_entry(self, db_key: str, identifier: str) -> Optional[Dict]:
+        """Database entry for an identifier, re-keying a legacy hash entry if found."""
+        table = self.database.setdefault(db_key, {})
+        id_hash = self._hash_id(identifier)
+        entry = table.get(id_hash)
+        if entry is None:
+            legacy_hash = self._legacy_hash_id(identifier)
+            with self._lock:
+                entry = table.pop(legacy_hash, None)
+                if entry is not None:
+                    table[id_hash] = entry
+                    self._log({"k": db_key, "h": id_hash, "r": legacy_hash})
+                else:
+                    # Another thread may have just re-keyed it
+                    entry = table.get(id_hash)
+        return entry
     
     def _mask_identifier(self, identifier: str, id_type: str) -> str:
         """Mask identifier for logging (privacy)."""
@@ -617,7 +845,7 @@ class ScammerVerifier:
                 masked = handle[:2] + "***" + handle[-1] if len(handle) > 3 else "***"
                 return f"{masked}@{suffix}"
         elif id_type == "phone":
-            clean = re.sub(r'[\s\-]', '', identifier)
+            clean = _strip_separators(identifier)
             return clean[:4] + "****" + clean[-4:] if len(clean) > 8 else "****"
         elif id_type == "bank_account":
             return identifier[:4] + "****" + identifier[-4:] if len(identifier) > 8 else "****"
@@ -625,6 +853,27 @@ class ScammerVerifier:
             return identifier[:30] + "..." if len(identifier) > 30 else identifier
         return "***"
     
+    def _confirmed_result(
+        self,
+        identifier: str,
+        identifier_type: str,
+        db_entry: Dict,
+        reasons: List[str]
+    ) -> VerificationResult:
+        """Critical result for an identifier the database already confirms as a scammer."""
+        return VerificationResult(
+            identifier=identifier,
+            identifier_type=identifier_type,
+            is_suspicious=True,
+            risk_score=1.0,
+            risk_level="critical",
+            reasons=reasons,
+            reported_count=db_entry["report_count"],
+            first_reported=db_entry.get("first_reported"),
+            last_reported=db_entry.get("last_reported"),
+            associated_scam_types=db_entry.get("scam_types", [])
+        )
+    
     def _get_risk_level(self, score: float) -> str:
         """Convert risk score to level."""
         if score >= 0.8:
@@ -3,8 +3,9 @@ Session management for honeypot conversations.
 """
 import json
 import logging
-from datetime import datetime
-from typing import Optional, Dict, List, Any
+import time
+from datetime import datetime, timezone
+from typing import Optional, Dict, List, Any, Tuple
 from dataclasses import dataclass, field
 
 from api.models import ConversationState
@@ -12,15 +13,54 @@ from utils.storage import get_storage_backend, StorageBackend
 
 logger = logging.getLogger(__name__)
 
+# orjson is several times faster than stdlib json; fall back if not installed.
+# Stored values stay str, as the storage backends expect.
+try:
+    import orjson
+    
+    def _dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode()
+    
+    _loads = orjson.loads
+except ImportError:
+    orjson = None
+    
+    def _dumps(obj: Any) -> str:
+        return json.dumps(obj, separators=(",", ":"))
+    
+    _loads = json.loads
+
+# Sessions (and their message lists) expire after a day without activity
+SESSION_TTL_SECONDS = 86400
+
+# How long a scan of active session IDs is reused
+ACTIVE_SESSIONS_TTL_SECONDS = 5.0
+
+# Intelligence lists merged without duplicates, and the cap on keywords
+INTELLIGENCE_LIST_KEYS = ("bank_accounts", "upi_ids", "phone_numbers", "urls", "emails")
+MAX_KEYWORDS = 20
+
+
+def _now_ms() -> int:
+    """Current time as epoch milliseconds."""
+    return time.time_ns() // 1_000_000
+
+
+def _to_epoch_ms(value: Any) -> int:
+    """Epoch milliseconds from a stored timestamp (int, or naive UTC ISO string from older sessions)."""
+    if isinstance(value, (int, float)):
+        return int(value)
+    return int(datetime.fromisoformat(value).replace(tzinfo=timezone.utc).timestamp() * 1000)
+
 
-@dataclass
+@dataclass(slots=True)
 class Session:
     """Represents a conversation session."""
     session_id: str
     state: ConversationState = ConversationState.PROBE
     persona: Optional[str] = None
     conversation_turn: int = 0
-    messages: List[Dict[str, str]] = field(default_factory=list)
+    messages: List[Dict[str, Any]] = field(default_factory=list)
     intelligence: Dict[str, List] = field(default_factory=lambda: {
         "bank_accounts": [],
         "upi_ids": [],
@@ -33,32 +73,62 @@ class Session:
     scam_detected: bool = False
     scam_confidence: float = 0.0
     scam_type: Optional[str] = None
-    created_at: datetime = field(default_factory=datetime.utcnow)
-    last_activity: datetime = field(default_factory=datetime.utcnow)
+    # Epoch milliseconds; created_at/last_activity give them as naive UTC datetimes
+    created_at_ms: int = field(default_factory=_now_ms)
+    last_activity_ms: int = field(default_factory=_now_ms)
     callback_sent: bool = False
+    # Messages already in storage; only later ones are appended on save
+    _saved_messages: int = field(default=0, repr=False, compare=False)
+    # Per intelligence key: (the list, set of its items), for O(1) duplicate checks
+    _intel_seen: Dict[str, Tuple[List, set]] = field(default_factory=dict, repr=False, compare=False)
     
     def add_message(self, role: str, content: str):
         """Add a message to the conversation history."""
+        now = _now_ms()
         self.messages.append({
             "role": role,
             "content": content,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": now
         })
-        self.last_activity = datetime.utcnow()
+        self.last_activity_ms = now
+    
+    @property
+    def created_at(self) -> datetime:
+        """Session creation time (naive UTC)."""
+        return datetime.fromtimestamp(self.created_at_ms / 1000, timezone.utc).replace(tzinfo=None)
+    
+    @property
+    def last_activity(self) -> datetime:
+        """Time of the last message (naive UTC)."""
+        return datetime.fromtimestamp(self.last_activity_ms / 1000, timezone.utc).replace(tzinfo=None)
+    
+    def _merge_items(self, key: str, new_items, limit: Optional[int] = None):
+        """Append items not already in intelligence[key], in order, up to limit."""
+        items = self.intelligence.setdefault(key, [])
+        cached = self._intel_seen.get(key)
+        if cached is None or cached[0] is not items or len(cached[1]) != len(items):
+            # First merge, or the list was replaced or changed elsewhere
+            seen = set(items)
+            if len(seen) != len(items):
+                items[:] = dict.fromkeys(items)
+            cached = self._intel_seen[key] = (items, seen)
+        seen = cached[1]
+        
+        for item in new_items:
+            if limit is not None and len(items) >= limit:
+                break
+            if item not in seen:
+                seen.add(item)
+                items.append(item)
     
     def update_intelligence(self, new_intel: Dict[str, Any]):
         """Merge new intelligence with existing."""
-        for key in ["bank_accounts", "upi_ids", "phone_numbers", "urls", "emails"]:
-            existing = set(self.intelligence.get(key, []))
+        for key in INTELLIGENCE_LIST_KEYS:
             new_items = new_intel.get(key, [])
-            if isinstance(new_items, list):
-                existing.update(new_items)
-            self.intelligence[key] = list(existing)
+            self._merge_items(key, new_items if isinstance(new_items, list) else [])
         
-        # Merge keywords
-        keywords = set(self.intelligence.get("keywords", []))
-        keywords.update(new_intel.get("keywords", []))
-        self.intelligence["keywords"] = list(keywords)[:20]  # Limit keywords
+        # Merge keywords (first MAX_KEYWORDS distinct ones are kept)
+        self._merge_items("keywords", new_intel.get("keywords", []), limit=MAX_KEYWORDS)
         
         # Update confidence scores
         for key, conf in new_intel.get("confidence_scores", {}).items():
@@ -77,8 +147,8 @@ class Session:
             "scam_detected": self.scam_detected,
             "scam_confidence": self.scam_confidence,
             "scam_type": self.scam_type,
-            "created_at": self.created_at.isoformat(),
-            "last_activity": self.last_activity.isoformat(),
+            "created_at": self.created_at_ms,
+            "last_activity": self.last_activity_ms,
             "callback_sent": self.callback_sent
         }
     
@@ -105,9 +175,9 @@ class Session:
         session.callback_sent = data.get("callback_sent", False)
         
         if data.get("created_at"):
-            session.created_at = datetime.fromisoformat(data["created_at"])
+            session.created_at_ms = _to_epoch_ms(data["created_at"])
         if data.get("last_activity"):
-            session.last_activity = datetime.fromisoformat(data["last_activity"])
+            session.last_activity_ms = _to_epoch_ms(data["last_activity"])
         
         return session
 
@@ -120,6 +190,9 @@ class SessionManager:
     def __init__(self, use_redis: bool = False, redis_url: Optional[str] = None):
         self._storage: StorageBackend = get_storage_backend(use_redis, redis_url)
         self._prefix = "honeypot:session:"
+        self._messages_prefix = "honeypot:messages:"
+        # (monotonic time, session IDs) of the last active-session scan
+        self._active_sessions: Optional[Tuple[float, List[str]]] = None
         self._stats = {
             "total_processed": 0,
             "scams_detected": 0,
@@ -131,6 +204,10 @@ class SessionManager:
         """Create storage key for session."""
         return f"{self._prefix}{session_id}"
     
+    def _make_messages_key(self, session_id: str) -> str:
+        """Create storage key for a session's append-only message list."""
+        return f"{self._messages_prefix}{session_id}"
+    
     def get_session(self, session_id: str) -> Optional[Session]:
         """Get existing session by ID."""
         key = self._make_key(session_id)
@@ -140,7 +217,16 @@ class SessionManager:
             return None
         
         try:
-            return Session.from_dict(json.loads(data))
+            session_data = _loads(data)
+            # Sessions saved before messages moved to their own list carry them inline
+            legacy = "messages" in session_data
+            if not legacy:
+                session_data["messages"] = [
+                    _loads(m) for m in self._storage.get_list(self._make_messages_key(session_id))
+                ]
+            session = Session.from_dict(session_data)
+            session._saved_messages = 0 if legacy else len(session.messages)
+            return session
         except Exception as e:
             logger.error(f"Error loading session {session_id}: {e}")
             return None
@@ -164,8 +250,10 @@ class SessionManager:
                         msg.get("content", "")
                     )
         
-        # Save to storage
+        # Save to storage, dropping any message list left from an unreadable session
+        self._storage.delete(self._make_messages_key(session_id))
         self._save_session(session)
+        self._active_sessions = None
         
         logger.info(f"Created new session: {session_id}")
         return session
@@ -198,16 +286,30 @@ class SessionManager:
         return self._save_session(session)
     
     def _save_session(self, session: Session) -> bool:
-        """Save session to storage."""
+        """
+        Save session to storage.
+        Messages are appended to the session's message list, so each save
+        writes only the messages added since the last one.
+        """
         key = self._make_key(session.session_id)
-        data = json.dumps(session.to_dict())
+        data = session.to_dict()
+        messages = data.pop("messages")
+        
+        new_messages = [_dumps(m) for m in messages[session._saved_messages:]]
+        if not self._storage.append_list(
+            self._make_messages_key(session.session_id), new_messages, expiry_seconds=SESSION_TTL_SECONDS
+        ):
+            return False
+        session._saved_messages = len(messages)
         
         # Set with 24-hour expiry
-        return self._storage.set(key, data, expiry_seconds=86400)
+        return self._storage.set(key, _dumps(data), expiry_seconds=SESSION_TTL_SECONDS)
     
     def delete_session(self, session_id: str) -> bool:
         """Delete a session."""
         key = self._make_key(session_id)
+        self._storage.delete(self._make_messages_key(session_id))
+        self._active_sessions = None
         return self._storage.delete(key)
     
     def should_exit(self, session: Session) -> bool:
@@ -247,9 +349,19 @@ class SessionManager:
         return False
     
     def get_active_sessions(self) -> List[str]:
-        """Get list of active session IDs."""
-        keys = self._storage.keys(f"{self._prefix}*")
-        return [k.replace(self._prefix, "") for k in keys]
+        """
+        Get list of active session IDs.
+        A scan is reused for ACTIVE_SESSIONS_TTL_SECONDS, or until a session
+        is created or deleted here.
+        """
+        now = time.monotonic()
+        if self._active_sessions is not None and now - self._active_sessions[0] < ACTIVE_SESSIONS_TTL_SECONDS:
+            return list(self._active_sessions[1])
+        
+        prefix_len = len(self._prefix)
+        session_ids = [k[prefix_len:] for k in self._storage.keys(f"{self._prefix}*")]
+        self._active_sessions = (now, session_ids)
+        return list(session_ids)
     
     def get_stats(self) -> Dict:
         """Get session statistics."""
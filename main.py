@@ -18,6 +18,7 @@ from fastapi.responses import JSONResponse
 from api.routes import router
 from api.middleware import APIKeyMiddleware, RequestLoggingMiddleware
 from config import settings
+from core.multi_llm_detector import multi_llm_detector
 
 # Configure logging
 logging.basicConfig(
@@ -65,6 +66,9 @@ async def lifespan(app: FastAPI):
     else:
         logger.warning("✗ Gemini API key not set")
     
+    # Pre-connect LLM provider hosts so the first request skips DNS + TLS setup
+    await multi_llm_detector.warmup()
+    
     logger.info("=" * 50)
     logger.info("🚀 Honeypot is ready to receive messages!")
     logger.info("=" * 50)
@@ -73,6 +77,7 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("🛑 Honeypot shutting down...")
+    await multi_llm_detector.aclose()
 
 
 # Create FastAPI application
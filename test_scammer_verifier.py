@@ -182,8 +182,8 @@ def test_scammer_reporting():
         session_id="test-session-2"
     )
     
-    # Reload database to verify persistence
-    test_verifier._load_database()
+    # Reload database to verify persistence (write out batched reports first)
+    test_verifier.flush()
     test_verifier.database = test_verifier._load_database()
     
     # Now verify - should be flagged as reported
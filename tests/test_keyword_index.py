@@ -0,0 +1,55 @@
+"""
+Keyword index tests.
+"""
+import pytest
+
+from core.scam_detector import KEYWORD_CATEGORIES
+from utils.keyword_index import KeywordIndex
+
+
+ALL_KEYWORDS = [kw for keywords, _, _ in KEYWORD_CATEGORIES for kw in keywords]
+
+MESSAGES = [
+    "",
+    "hello, how are you?",
+    "URGENT: your bank account is blocked, share otp immediately",
+    "your bank account number and pin please, transfer ₹5000 right now",
+    "verify your kyc via upi or paytm, last chance, act now!",
+    "pinpoint verification of the upinder transfers",
+    "turant paisa bhejna hai, khata band ho jayega",
+    "your account blocked, pay via upi now",
+]
+
+
+class TestKeywordIndex:
+    """Test the index finds exactly the keywords a substring test would."""
+
+    @pytest.mark.parametrize("message", MESSAGES)
+    def test_matches_substring_test(self, message):
+        """Test find() agrees with `kw in message` over the detector keywords."""
+        index = KeywordIndex(ALL_KEYWORDS)
+        assert index.find(message) == {kw for kw in ALL_KEYWORDS if kw in message}
+
+    def test_overlapping_and_nested_keywords(self):
+        """Test keywords inside or overlapping other keywords are all reported."""
+        index = KeywordIndex(["he", "she", "his", "hers", "e", "ers"])
+        assert index.find("ushers") == {"he", "she", "hers", "e", "ers"}
+        assert index.find("xyz") == set()
+
+        nested = KeywordIndex(["ab", "b", "urgent", "gent"])
+        assert sorted(nested.find_all("ab urgent")) == [(0, "ab"), (1, "b"), (3, "urgent"), (5, "gent")]
+
+    @pytest.mark.parametrize("message", MESSAGES)
+    def test_find_all_reports_every_occurrence(self, message):
+        """Test find_all() gives the start of every occurrence of every keyword."""
+        index = KeywordIndex(ALL_KEYWORDS)
+        expected = {
+            (start, kw) for kw in set(ALL_KEYWORDS)
+            for start in range(len(message)) if message.startswith(kw, start)
+        }
+        assert sorted(index.find_all(message)) == sorted(expected)
+
+    def test_empty_index(self):
+        """Test an index with no keywords finds nothing."""
+        assert KeywordIndex([]).find("anything") == set()
+        assert KeywordIndex([]).find_all("anything") == []
@@ -0,0 +1,160 @@
+"""
+Multi-LLM ensemble detector tests.
+"""
+import json
+
+import httpx
+import pytest
+
+from core.multi_llm_detector import MultiLLMDetector, LLMResponse, LLMProvider, _Keys
+
+
+def make_response(provider, is_scam, confidence, scam_type=None):
+    """Build a successful LLMResponse for consensus tests."""
+    return LLMResponse(
+        provider=provider,
+        is_scam=is_scam,
+        confidence=confidence,
+        scam_type=scam_type,
+        reasoning="test",
+        response_time_ms=10,
+        success=True
+    )
+
+
+@pytest.fixture
+def detector():
+    """Detector with no providers configured."""
+    return MultiLLMDetector(_Keys(None, None, None, None, None, None))
+
+
+class TestConsensus:
+    """Test ensemble consensus calculation."""
+
+    def test_majority_scam(self, detector):
+        """Test majority scam vote with most common scam type."""
+        responses = [
+            make_response(LLMProvider.POLLINATIONS, True, 0.9, "upi"),
+            make_response(LLMProvider.CEREBRAS, True, 0.8, "upi"),
+            make_response(LLMProvider.GROQ, False, 0.4, "banking"),
+        ]
+        result = detector._calculate_consensus(responses, min_consensus=2)
+
+        assert result["is_scam"] is True
+        assert result["scam_type"] == "upi"
+        assert result["votes"] == {"scam": 2, "not_scam": 1, "total": 3}
+        assert result["consensus_strength"] == 0.67
+        assert result["combined_reasoning"].startswith("[pollinations] test")
+
+    def test_none_scam_type_ignored(self, detector):
+        """Test 'none' scam types are not counted."""
+        responses = [
+            make_response(LLMProvider.POLLINATIONS, False, 0.2, "none"),
+            make_response(LLMProvider.CEREBRAS, False, 0.1, None),
+        ]
+        result = detector._calculate_consensus(responses, min_consensus=2)
+
+        assert result["is_scam"] is False
+        assert result["scam_type"] is None
+
+    def test_non_verbose_omits_per_response_detail(self, detector):
+        """Test verbose=False returns only aggregate fields."""
+        responses = [make_response(LLMProvider.POLLINATIONS, True, 0.9, "upi")]
+        result = detector._calculate_consensus(responses, min_consensus=1, verbose=False)
+
+        assert result["is_scam"] is True
+        assert "responses" not in result
+        assert "combined_reasoning" not in result
+
+    @pytest.mark.asyncio
+    async def test_no_providers_configured(self, detector):
+        """Test ensemble with no API keys returns an error result."""
+        result = await detector.detect_with_ensemble("hello")
+
+        assert result["is_scam"] is False
+        assert result["error"] == "No LLM APIs configured"
+
+
+def mock_client(handler):
+    """AsyncClient whose requests are answered by handler."""
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+class TestOpenAICompatProviders:
+    """Test the shared OpenAI-compatible provider path."""
+
+    @pytest.mark.asyncio
+    async def test_success_response(self, detector):
+        """Test a chat completion is parsed into a successful LLMResponse."""
+        def handler(request):
+            assert request.url.host == "api.cerebras.ai"
+            content = '{"is_scam": true, "confidence": 0.9, "scam_type": "upi", "reasoning": "asks for UPI"}'
+            return httpx.Response(200, json={"choices": [{"message": {"content": content}}]})
+
+        detector._client = mock_client(handler)
+        response = await detector._detect_cerebras("send money to scammer@upi")
+
+        assert response.success is True
+        assert response.provider == LLMProvider.CEREBRAS
+        assert response.is_scam is True
+        assert response.scam_type == "upi"
+
+    @pytest.mark.asyncio
+    async def test_http_error_response(self, detector):
+        """Test an HTTP error becomes a failed LLMResponse."""
+        detector._client = mock_client(lambda request: httpx.Response(500))
+        response = await detector._detect_pollinations("hello")
+
+        assert response.success is False
+        assert response.confidence == 0.0
+        assert "500" in response.error
+
+
+class TestDetectBatch:
+    """Test batched multi-message detection."""
+
+    @pytest.mark.asyncio
+    async def test_batch_with_single_fallback(self):
+        """Test one batched call per chunk, with single calls for unanswered messages."""
+        calls = []
+
+        def handler(request):
+            body = json.loads(request.content)
+            prompt = body["messages"][0]["content"]
+            calls.append(prompt)
+            if "MESSAGES (JSON array" in prompt:
+                # Only answer the first message of the batch
+                content = '[{"index": 0, "is_scam": true, "confidence": 0.9, "scam_type": "upi", "reasoning": "x"}]'
+            else:
+                content = '{"is_scam": false, "confidence": 0.2, "scam_type": "none", "reasoning": "y"}'
+            return httpx.Response(200, json={"choices": [{"message": {"content": content}}]})
+
+        detector = MultiLLMDetector(_Keys("key", None, None, None, None, None))
+        detector._client = mock_client(handler)
+        results = await detector.detect_batch(["pay now to scam@upi", "hi mom"])
+
+        assert len(calls) == 2
+        assert [r["is_scam"] for r in results] == [True, False]
+        assert results[0]["scam_type"] == "upi"
+
+    @pytest.mark.asyncio
+    async def test_rate_limited_batch_is_not_retried_per_message(self):
+        """Test a 429 on the batched call fails the chunk without single-message calls."""
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(429)
+
+        detector = MultiLLMDetector(_Keys("key", None, None, None, None, None))
+        detector._client = mock_client(handler)
+        results = await detector.detect_batch(["pay now to scam@upi", "hi mom", "your OTP is 1234"])
+
+        assert len(calls) == 1
+        assert len(results) == 3
+        assert all(r["is_scam"] is False and r["ensemble_confidence"] == 0.0 for r in results)
+
+    @pytest.mark.asyncio
+    async def test_empty_batch(self, detector):
+        """Test an empty batch returns no results."""
+        assert await detector.detect_batch([]) == []
@@ -0,0 +1,162 @@
+"""
+Pattern memory tests.
+"""
+import json
+import os
+
+import pytest
+
+from core.pattern_memory import PatternMemory, PatternStore
+
+
+@pytest.fixture
+def memory(tmp_path):
+    """Pattern memory backed by a temporary file."""
+    memory = PatternMemory(storage_path=str(tmp_path / "pattern_memory.json"))
+    yield memory
+    memory.close()
+
+
+INTELLIGENCE = {
+    "phone_numbers": ["+919876543210"],
+    "upi_ids": ["scammer@ybl"],
+    "urls": ["https://Fake-Bank.example/login/"],
+    "keywords": ["urgent", "blocked", "otp"],
+}
+
+
+class TestPatternMemory:
+    """Test recording and matching patterns."""
+
+    def test_unknown_message_has_no_matches(self, memory):
+        """Test nothing matches before any pattern is recorded."""
+        assert memory.check_patterns("Your account is blocked", INTELLIGENCE) == []
+
+    def test_recorded_patterns_match(self, memory):
+        """Test recorded message, phone, UPI, URL and keyword combo all match again."""
+        memory.record_pattern("Your account 1234 is blocked!", INTELLIGENCE, "banking", is_confirmed_scam=True)
+        matches = memory.check_patterns("your account 9999 is BLOCKED", INTELLIGENCE)
+
+        types = {m.pattern_type for m in matches}
+        assert types == {
+            "message_template", "known_scam_phone", "known_scam_upi",
+            "known_scam_url", "keyword_combination"
+        }
+        assert all(m.times_seen == 1 for m in matches)
+        assert all(m.associated_scam_types == ["banking"] for m in matches)
+
+    def test_scam_types_accumulate_without_duplicates(self, memory):
+        """Test each scam type is listed once per pattern."""
+        phones = {"phone_numbers": ["+919000000001"]}
+        for scam_type in ("banking", "upi", "banking", None):
+            memory.record_pattern("x", phones, scam_type, is_confirmed_scam=True)
+
+        match = memory.check_patterns("y", phones)[0]
+        assert sorted(match.associated_scam_types) == ["banking", "upi"]
+        assert sorted(memory.phone_numbers.to_dict()["+919000000001"]["scam_types"]) == ["banking", "upi"]
+
+    def test_legacy_message_hash_is_migrated(self, memory):
+        """Test entries keyed by the old MD5 hash still match and are re-keyed on record."""
+        message = "Pay the fine now"
+        legacy_key = memory._legacy_hash_message(message)
+        with open(memory.storage_path, "w") as f:
+            json.dump({"message_hashes": {legacy_key: {
+                "count": 2, "first_seen": "2026-01-01T00:00:00",
+                "last_seen": "2026-01-01T00:00:00", "scam_types": ["other"]
+            }}}, f)
+        memory = PatternMemory(storage_path=memory.storage_path)
+
+        matches = memory.check_patterns(message, {})
+        assert matches[0].times_seen == 2
+
+        memory.record_pattern(message, {}, "other")
+        assert legacy_key not in memory.message_hashes
+        assert not memory._legacy_message_hashes
+        store = memory.message_hashes
+        assert store.counts[store.get(memory._hash_message(message))] == 3
+        memory.close()
+
+    def test_legacy_lookup_skipped_without_legacy_keys(self, memory, monkeypatch):
+        """Test a pattern file with no legacy keys never computes the MD5 hash."""
+        memory.record_pattern("Pay the fine now", {}, "other")
+        memory._save_patterns()
+
+        reloaded = PatternMemory(storage_path=memory.storage_path)
+        monkeypatch.setattr(reloaded, "_legacy_hash_normalized", None)
+        assert reloaded.check_patterns("Pay the fine now", {})[0].times_seen == 1
+        assert reloaded.check_patterns("Something new", {}) == []
+        reloaded.record_pattern("Something new", {}, "other")
+        reloaded.close()
+
+    def test_unseen_keyword_skips_combo_lookup(self, memory):
+        """Test a combo with a keyword never recorded does not match, in any order."""
+        memory.record_pattern("Your account is blocked", INTELLIGENCE, "banking")
+
+        reordered = {"keywords": ["otp", "urgent", "blocked"]}
+        assert memory.check_patterns("x", reordered)[0].pattern_type == "keyword_combination"
+        assert memory.check_patterns("x", {"keywords": ["otp", "urgent", "prize"]}) == []
+
+    def test_save_and_reload(self, memory):
+        """Test patterns survive a save/load round trip."""
+        memory.record_pattern("Claim your refund", INTELLIGENCE, "upi", is_confirmed_scam=True)
+        memory._save_patterns()
+
+        reloaded = PatternMemory(storage_path=memory.storage_path)
+        assert reloaded.get_stats() == memory.get_stats()
+        assert len(reloaded.check_patterns("Claim your refund", INTELLIGENCE)) == 5
+        assert reloaded._combo_words == {"urgent", "blocked", "otp"}
+        with open(memory.storage_path) as f:
+            assert "blocked|otp|urgent" in json.load(f)["keyword_combos"]
+
+    def test_timestamps_are_epoch_in_memory_and_iso_on_disk(self, memory):
+        """Test ISO timestamps from the pattern file load as epoch seconds and save back unchanged."""
+        memory.phone_numbers = PatternStore.from_dict({"+911234567890": {
+            "count": 1, "first_seen": "2026-01-01T00:00:00",
+            "last_seen": "2026-01-02T00:00:00", "scam_types": []
+        }})
+
+        match = memory.check_patterns("x", {"phone_numbers": ["+911234567890"]})[0]
+        assert match.first_seen == 1767225600
+        assert match.last_seen - match.first_seen == 86400
+        assert memory.phone_numbers.to_dict()["+911234567890"]["first_seen"] == "2026-01-01T00:00:00"
+
+    def test_unsaved_changes_replayed_from_wal(self, memory):
+        """Test patterns recorded after the last snapshot are restored from the WAL."""
+        memory.record_pattern("Claim your refund", INTELLIGENCE, "upi", is_confirmed_scam=True)
+        memory.create_scammer_fingerprint("session-1", ["refund"])
+        memory.flush()
+
+        reloaded = PatternMemory(storage_path=memory.storage_path)
+        assert reloaded.get_stats() == memory.get_stats()
+        assert reloaded.check_patterns("Claim your refund", INTELLIGENCE)[0].times_seen == 1
+
+    def test_close_stops_flusher_and_releases_wal(self, memory):
+        """Test close joins the background flusher and closes the WAL handle."""
+        memory.start()
+        flusher = memory._flusher
+        memory.record_pattern("Claim your refund", INTELLIGENCE, "upi")
+        memory.close()
+
+        assert not flusher.is_alive()
+        assert memory._flusher is None and not memory._wal.is_open
+        assert PatternMemory(storage_path=memory.storage_path).get_stats() == memory.get_stats()
+
+    def test_flush_rotates_large_wal_into_snapshot(self, memory, monkeypatch):
+        """Test flush folds the WAL into a snapshot once it reaches the rotation size."""
+        monkeypatch.setattr("core.pattern_memory.WAL_ROTATE_ENTRIES", 1)
+        memory.record_pattern("Claim your refund", INTELLIGENCE, "upi")
+        memory.flush()
+
+        assert not os.path.exists(memory.wal_path)
+        assert os.path.exists(memory.storage_path)
+        assert PatternMemory(storage_path=memory.storage_path).get_stats() == memory.get_stats()
+
+    def test_memory_boost(self, memory):
+        """Test boost is the top match plus half of the rest, capped at 0.8."""
+        memory.record_pattern("Win a lottery prize", INTELLIGENCE, "lottery", is_confirmed_scam=True)
+        matches = memory.check_patterns("Win a lottery prize", INTELLIGENCE)
+
+        boosts = sorted((m.confidence_boost for m in matches), reverse=True)
+        expected = min(boosts[0] + 0.5 * sum(boosts[1:]), 0.8)
+        assert memory.calculate_memory_boost(matches) == pytest.approx(expected)
+        assert memory.calculate_memory_boost([]) == 0.0
@@ -0,0 +1,118 @@
+"""
+Request cache tests.
+"""
+import asyncio
+
+import pytest
+
+from core.request_cache import RequestCache
+
+
+class TestGetOrExecute:
+    """Test caching and deduplication in get_or_execute."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_one_execution(self):
+        """Test concurrent callers for one key run the executor once."""
+        cache = RequestCache()
+        calls = 0
+
+        async def executor():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"is_scam": True}
+
+        results = await asyncio.gather(*(cache.get_or_execute("k", executor) for _ in range(5)))
+
+        assert calls == 1
+        assert all(r == {"is_scam": True} for r in results)
+        stats = cache.get_stats()
+        assert stats["misses"] == 1
+        assert stats["pending_joins"] == 4
+
+    @pytest.mark.asyncio
+    async def test_cached_result_is_reused(self):
+        """Test a completed result is served from cache."""
+        cache = RequestCache()
+        calls = 0
+
+        async def executor():
+            nonlocal calls
+            calls += 1
+            return "result"
+
+        assert await cache.get_or_execute("k", executor) == "result"
+        assert await cache.get_or_execute("k", executor) == "result"
+        assert calls == 1
+        assert cache.get_stats()["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_failure_propagates_to_waiters_and_is_not_cached(self):
+        """Test an executor error reaches joined waiters and the key can be retried."""
+        cache = RequestCache()
+
+        async def failing():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("provider down")
+
+        results = await asyncio.gather(
+            cache.get_or_execute("k", failing),
+            cache.get_or_execute("k", failing),
+            return_exceptions=True
+        )
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+        async def succeeding():
+            return "ok"
+
+        assert await cache.get_or_execute("k", succeeding) == "ok"
+
+
+class TestExpiryAndEviction:
+    """Test TTL expiry and size eviction via the expiry heap."""
+
+    @pytest.mark.asyncio
+    async def test_expired_entries_are_purged(self):
+        """Test an expired result is dropped and re-executed."""
+        cache = RequestCache()
+        calls = 0
+
+        async def executor():
+            nonlocal calls
+            calls += 1
+            return calls
+
+        assert await cache.get_or_execute("k", executor, ttl=0.01) == 1
+        await asyncio.sleep(0.02)
+        assert await cache.get_or_execute("other", executor) == 2
+
+        assert "k" not in cache.cache
+        assert cache.get_stats()["expirations"] == 1
+        assert await cache.get_or_execute("k", executor) == 3
+
+    @pytest.mark.asyncio
+    async def test_eviction_drops_soonest_expiring_entry(self):
+        """Test a full cache evicts the entry closest to expiry."""
+        cache = RequestCache(max_size=2)
+
+        async def executor():
+            return "result"
+
+        await cache.get_or_execute("long", executor, ttl=60)
+        await cache.get_or_execute("short", executor, ttl=5)
+        await cache.get_or_execute("new", executor, ttl=60)
+
+        assert set(cache.cache) == {"long", "new"}
+        assert cache.get_stats()["evictions"] == 1
+
+
+class TestMakeKey:
+    """Test cache key canonicalization."""
+
+    def test_case_and_surrounding_whitespace_ignored(self):
+        """Test keys match across case and leading/trailing whitespace."""
+        cache = RequestCache()
+        assert cache.make_key("  Pay NOW\n") == cache.make_key("pay now")
+        assert cache.make_key("ÜBERWEISUNG") == cache.make_key("überweisung")
+        assert cache.make_key("pay now") != cache.make_key("pay later")
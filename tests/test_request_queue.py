@@ -0,0 +1,357 @@
+"""
+Rate-limit aware request queue tests.
+"""
+import asyncio
+import threading
+
+import httpx
+import pytest
+
+from core.request_queue import ProviderState, RateLimitAwareQueue, Throttle, _is_rate_limit_error
+
+
+def local_fallback():
+    """Local detection result used when no provider answers."""
+    return {"is_scam": False, "confidence": 0.3}
+
+
+class TestExecuteWithFailover:
+    """Test provider failover, caching and request sharing."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_requests_share_one_call(self):
+        """Test concurrent callers for one key call the provider once."""
+        queue = RateLimitAwareQueue(provider_order=["groq", "local"])
+        calls = 0
+
+        async def groq():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"is_scam": True, "confidence": 0.9}
+
+        results = await asyncio.gather(*(
+            queue.execute_with_failover("k", {"groq": groq}, local_fallback) for _ in range(5)
+        ))
+
+        assert calls == 1
+        assert all(r["is_scam"] is True and r["_provider"] == "groq" for r in results)
+        assert queue.stats["inflight_joins"] == 4
+        assert queue.inflight == {}
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_fails_over_to_next_provider(self):
+        """Test a 429 marks the provider rate limited and the next one answers."""
+        queue = RateLimitAwareQueue(provider_order=["groq", "gemini", "local"])
+
+        async def groq():
+            raise RuntimeError("429 Too Many Requests")
+
+        async def gemini():
+            return {"is_scam": True, "confidence": 0.8}
+
+        result = await queue.execute_with_failover("k", {"groq": groq, "gemini": gemini}, local_fallback)
+
+        assert result["_provider"] == "gemini"
+        assert queue.stats["failovers"] == 1
+        assert not queue.providers["groq"].is_available()
+
+    @pytest.mark.asyncio
+    async def test_local_fallback_and_cache_hit(self):
+        """Test local fallback is used when no provider is configured, then served from cache."""
+        queue = RateLimitAwareQueue(provider_order=["groq", "local"])
+
+        first = await queue.execute_with_failover("k", {}, local_fallback)
+        second = await queue.execute_with_failover("k", {}, local_fallback)
+
+        assert first["_provider"] == "local"
+        assert first["_cached"] is False
+        assert second["_cached"] is True
+        assert queue.stats["cache_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_miss_and_hit_return_independent_dicts(self):
+        """Test a miss and a hit return the same type and neither shares the cached object."""
+        queue = RateLimitAwareQueue(provider_order=["groq", "local"])
+
+        first = await queue.execute_with_failover("k", {}, local_fallback)
+        first["is_scam"] = True
+        second = await queue.execute_with_failover("k", {}, local_fallback)
+        second["confidence"] = 1.0
+        third = await queue.execute_with_failover("k", {}, local_fallback)
+
+        assert type(first) is type(second) is dict
+        assert third["is_scam"] is False and third["confidence"] == 0.3
+
+    @pytest.mark.asyncio
+    async def test_slow_provider_is_hedged(self):
+        """Test a slow provider is raced by the next one and the loser is cancelled."""
+        queue = RateLimitAwareQueue(provider_order=["gemini", "groq", "local"], hedge_delay=0.01)
+        cancelled = False
+
+        async def gemini():
+            nonlocal cancelled
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled = True
+                raise
+
+        async def groq():
+            return {"is_scam": True, "confidence": 0.9}
+
+        result = await asyncio.wait_for(
+            queue.execute_with_failover("k", {"gemini": gemini, "groq": groq}, local_fallback), timeout=1
+        )
+
+        assert result["_provider"] == "groq"
+        assert queue.stats["hedges"] == 1
+        assert cancelled
+
+    def test_spread_load_is_sticky_per_key(self):
+        """Test spread_load starts different keys at different providers, consistently per key."""
+        queue = RateLimitAwareQueue(provider_order=["groq", "gemini", "local"], spread_load=True)
+        functions = {"groq": lambda: None, "gemini": lambda: None}
+
+        def first_provider(key):
+            return next(queue._available_providers(key, functions))[0]
+
+        starts = {first_provider(f"key-{n}") for n in range(20)}
+        assert starts == {"groq", "gemini"}
+        assert first_provider("key-1") == first_provider("key-1")
+
+    @pytest.mark.asyncio
+    async def test_local_fallback_runs_off_the_event_loop(self):
+        """Test the sync local fallback runs in the CPU pool, not the loop thread."""
+        queue = RateLimitAwareQueue(provider_order=["local"])
+        loop_thread = threading.get_ident()
+
+        def fallback():
+            return {"is_scam": False, "thread": threading.get_ident()}
+
+        result = await queue.execute_with_failover("k", {}, fallback)
+        assert result["thread"] != loop_thread
+
+
+class TestSubmit:
+    """Test queued submission."""
+
+    @pytest.mark.asyncio
+    async def test_full_queue_sheds_requests(self):
+        """Test submissions beyond the queue bound get the default result."""
+        queue = RateLimitAwareQueue(max_concurrent=1)
+        release = asyncio.Event()
+
+        async def blocked():
+            await release.wait()
+            return "done"
+
+        tasks = [asyncio.create_task(queue.submit(blocked, admission_timeout=0.01)) for _ in range(8)]
+        await asyncio.sleep(0.05)
+        release.set()
+        results = await asyncio.gather(*tasks)
+
+        assert results.count("done") == 5  # One running plus max_concurrent * 4 queued
+        assert queue.stats["shed"] == 3
+        assert all(r["error"] is True for r in results if r != "done")
+        await queue.stop()
+
+    @pytest.mark.asyncio
+    async def test_workers_run_requests_concurrently(self):
+        """Test up to max_concurrent queued requests run at the same time."""
+        queue = RateLimitAwareQueue(max_concurrent=3)
+        running = 0
+        peak = 0
+
+        async def request():
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return "ok"
+
+        results = await asyncio.gather(*(queue.submit(request) for _ in range(6)))
+        await queue.stop()
+
+        assert results == ["ok"] * 6
+        assert peak == 3
+        assert queue.stats["processed"] == 6
+
+    @pytest.mark.asyncio
+    async def test_cached_submit_results_are_copies(self):
+        """Test submit returns a fresh dict on a miss and on a hit."""
+        queue = RateLimitAwareQueue()
+
+        async def request():
+            return {"n": 1}
+
+        first = await queue.submit(request, cache_key="k")
+        first["n"] = 2
+        second = await queue.submit(request, cache_key="k")
+        second["n"] = 3
+        third = await queue.submit(request, cache_key="k")
+        await queue.stop()
+
+        assert type(first) is type(second) is dict
+        assert third["n"] == 1
+        assert queue.stats["cache_hits"] == 2
+
+
+class TestClientLimit:
+    """Test per-client burst protection."""
+
+    def test_limit_within_window(self, monkeypatch):
+        """Test a client is blocked past the limit until old requests leave the window."""
+        now = 1000.0
+        monkeypatch.setattr("core.request_queue.time.monotonic", lambda: now)
+        queue = RateLimitAwareQueue()
+
+        assert [queue.check_client_limit("c", limit=2, window=60) for _ in range(3)] == [True, True, False]
+
+        now += 61
+        assert queue.check_client_limit("c", limit=2, window=60)
+
+    def test_idle_clients_are_forgotten(self, monkeypatch):
+        """Test history for clients idle longer than the window is dropped."""
+        now = 1000.0
+        monkeypatch.setattr("core.request_queue.time.monotonic", lambda: now)
+        queue = RateLimitAwareQueue()
+        queue.check_client_limit("old", window=60)
+
+        now += 61
+        queue.check_client_limit("new", window=60)
+
+        assert list(queue.client_request_history) == ["new"]
+
+
+class TestProviderState:
+    """Test provider availability bookkeeping."""
+
+    def test_rate_limit_cooldown_backs_off_and_resets(self):
+        """Test each consecutive rate limit doubles the cooldown until a success."""
+        provider = ProviderState(name="groq")
+
+        cooldowns = [provider.mark_rate_limited(cooldown_seconds=30) for _ in range(3)]
+        assert 30 <= cooldowns[0] < 35
+        assert 60 <= cooldowns[1] < 65
+        assert 120 <= cooldowns[2] < 125
+        assert 600 <= provider.mark_rate_limited(cooldown_seconds=300) < 605
+
+        provider.mark_success()
+        assert provider.consecutive_rate_limits == 0
+        assert provider.is_available()
+
+    def test_circuit_half_opens_for_one_probe(self, monkeypatch):
+        """Test an errored provider lets one probe through after the open period."""
+        now = 1000.0
+        monkeypatch.setattr("core.request_queue.time.monotonic", lambda: now)
+        provider = ProviderState(name="groq", open_seconds=30)
+        for _ in range(3):
+            provider.mark_error()
+        assert not provider.is_available()
+
+        now += 31
+        assert provider.is_available(claim_probe=False)
+        assert provider.is_available()
+        assert not provider.is_available()  # Probe in flight
+
+        provider.mark_error()
+        assert not provider.is_available()
+
+        now += 31
+        assert provider.is_available()
+        provider.mark_success()
+        assert provider.is_available()
+        assert provider.is_available()
+
+
+class TestRateLimitClassification:
+    """Test recognising rate-limit errors."""
+
+    def test_rate_limit_errors(self):
+        """Test status codes and provider messages that mean rate limited."""
+        request = httpx.Request("POST", "https://api.groq.com")
+        assert _is_rate_limit_error(httpx.HTTPStatusError("", request=request, response=httpx.Response(429)))
+        assert _is_rate_limit_error(RuntimeError("RESOURCE_EXHAUSTED: Quota exceeded"))
+        assert _is_rate_limit_error(RuntimeError("Rate limit reached for model"))
+
+    def test_other_errors(self):
+        """Test ordinary failures are not treated as rate limits."""
+        request = httpx.Request("POST", "https://api.groq.com")
+        assert not _is_rate_limit_error(httpx.HTTPStatusError("", request=request, response=httpx.Response(500)))
+        assert not _is_rate_limit_error(RuntimeError("connection reset"))
+
+
+class TestCache:
+    """Test result cache expiry and eviction."""
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """Test the cache evicts the least recently read entry once full."""
+        queue = RateLimitAwareQueue(max_cache_size=2)
+        queue._cache_result("a", {"n": 1})
+        queue._cache_result("b", {"n": 2})
+        assert queue._get_cached("a")["n"] == 1
+
+        queue._cache_result("c", {"n": 3})
+
+        assert list(queue.cache) == ["a", "c"]
+
+    def test_expired_entries_are_removed(self):
+        """Test expired entries are dropped on the next insert."""
+        queue = RateLimitAwareQueue(cache_ttl_seconds=-1)
+        queue._cache_result("a", {"n": 1})
+        queue._cache_result("b", {"n": 2})
+
+        assert "a" not in queue.cache
+        assert queue._get_cached("b") is None
+
+
+class TestThrottle:
+    """Test per-provider pacing."""
+
+    @pytest.mark.asyncio
+    async def test_calls_beyond_burst_are_paced(self):
+        """Test calls past the bucket capacity wait for tokens to refill."""
+        throttle = Throttle(rate=2, concurrency=5, period=0.1)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+
+        for _ in range(3):
+            assert await throttle.acquire() is True
+            throttle.release()
+
+        assert loop.time() - start >= 0.04
+
+    @pytest.mark.asyncio
+    async def test_paused_throttle_rejects_immediately(self):
+        """Test a paused throttle turns callers away so they can fail over."""
+        throttle = Throttle(rate=1, concurrency=1)
+        throttle.pause(60)
+
+        assert await throttle.acquire() is False
+        # The concurrency slot was given back
+        assert throttle._semaphore.locked() is False
+
+    @pytest.mark.asyncio
+    async def test_acquire_gives_up_at_deadline(self):
+        """Test a caller stops waiting for a busy throttle after its timeout."""
+        throttle = Throttle(rate=10, concurrency=1)
+        assert await throttle.acquire() is True
+
+        assert await throttle.acquire(timeout=0.01) is False
+
+        throttle.release()
+        assert await throttle.acquire(timeout=0.01) is True
+
+    @pytest.mark.asyncio
+    async def test_busy_provider_falls_back_to_local(self):
+        """Test local fallback isn't held up by a saturated provider."""
+        queue = RateLimitAwareQueue(max_concurrent=1, provider_order=["groq", "local"], provider_wait_timeout=0.01)
+        assert await queue.throttles["groq"].acquire() is True
+
+        async def groq():
+            return {"is_scam": True}
+
+        result = await queue.execute_with_failover("k", {"groq": groq}, local_fallback)
+        assert result["_provider"] == "local"
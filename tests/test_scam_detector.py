@@ -0,0 +1,69 @@
+"""
+Rule-based scam detector tests.
+"""
+from types import SimpleNamespace
+
+import pytest
+
+from core.scam_detector import ScamDetectionResult, ScamDetector, ScammerProfiler
+
+
+class TestScamDetector:
+    """Test the keyword, pattern and context stages."""
+
+    @pytest.mark.asyncio
+    async def test_scam_message_is_detected(self):
+        """Test an obvious banking scam is classified with its tactics."""
+        result = await ScamDetector(confidence_threshold=0.3).detect(
+            "URGENT: your bank account is blocked. Share OTP immediately or face arrest",
+            conversation_history=["hello", "your kyc is pending", "verify your account now"]
+        )
+
+        assert result.is_scam
+        assert result.scam_type == "banking"
+        assert {"urgency", "fear"} <= set(result.tactics)
+        assert "otp" in result.suspicious_elements
+        assert result.context_score > 0
+
+    @pytest.mark.asyncio
+    async def test_benign_message(self):
+        """Test an ordinary message scores nothing."""
+        result = await ScamDetector().detect("see you at dinner tonight")
+
+        assert not result.is_scam
+        assert result.confidence == 0.0
+        assert result.suspicious_elements == []
+
+    def test_stages_scan_message_when_not_given_matches(self):
+        """Test stages scan the message themselves when called without precomputed matches."""
+        detector = ScamDetector()
+        message = "click the link to verify your paytm kyc, limited offer"
+
+        assert detector._analyze_patterns(message)["scam_type"] == "phishing"
+        assert detector._analyze_keywords(message)["matches"] == ["paytm", "verify", "kyc", "offer"]
+
+    @pytest.mark.asyncio
+    async def test_whitelisted_message_skips_analysis(self):
+        """Test a whitelist phrase short-circuits detection."""
+        result = await ScamDetector().detect("Thank you for calling, your account is BLOCKED, share otp")
+
+        assert result.reasoning == "Message matches whitelist pattern"
+        assert result.confidence == 0.0
+        assert result.suspicious_elements == []
+
+
+class TestScammerProfiler:
+    """Test behavioral profiling from conversation history."""
+
+    def test_history_entries_of_mixed_types(self):
+        """Test message objects and plain strings are both read as text."""
+        history = [
+            SimpleNamespace(content="Verification protocol of the system"),
+            "x" * 200,
+            SimpleNamespace(content="department process"),
+        ]
+        profile = ScammerProfiler().build_profile(history, ScamDetectionResult(tactics=["fear"]))
+
+        assert profile["sophistication_level"] == "medium"
+        assert profile["behavioral_fingerprint"]["message_length_avg"] == "medium"
+        assert profile["behavioral_fingerprint"]["uses_fear"] is True
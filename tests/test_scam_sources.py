@@ -0,0 +1,93 @@
+"""
+Scam source lookup tests.
+"""
+import dataclasses
+
+import pytest
+
+from core.scam_sources import KNOWN_SCAM_DATABASE, ScamSourceLookup
+
+
+@pytest.fixture
+def lookup():
+    """Fresh scam source lookup."""
+    return ScamSourceLookup()
+
+
+class TestFindSimilarScams:
+    """Test matching messages to reported scams."""
+
+    def test_reports_ranked_by_relevance(self, lookup):
+        """Test matching reports from the type and its related types come back best first."""
+        message = "Your account blocked! Complete KYC, verify and share OTP or click link to update"
+        results = lookup.find_similar_scams("banking", message, {"upi_ids": ["refund@ybl"]})
+
+        assert [r["title"] for r in results] == ["Bank Account Blocking Fraud", "Fake Bank Website Phishing"]
+        assert results[0]["relevance_score"] == 0.8
+        assert results[0]["warning"].startswith("⚠️ WARNING: Similar scam reported by RBI Alert.")
+
+    def test_lookup_leaves_database_unchanged(self, lookup):
+        """Test repeated lookups don't add related reports to the database."""
+        sizes = {t: len(reports) for t, reports in lookup.database.items()}
+        for _ in range(3):
+            lookup.find_similar_scams("banking", "otp")
+
+        assert {t: len(reports) for t, reports in lookup.database.items()} == sizes
+
+
+class TestScamStatistics:
+    """Test per-type statistics."""
+
+    def test_statistics_are_cached_and_isolated(self, lookup):
+        """Test repeated calls agree and changing a result doesn't affect the next."""
+        stats = lookup.get_scam_statistics("banking")
+        assert stats["total_victims"] == 175000
+        assert stats["latest_report"] == "2025-10"
+
+        stats["known"] = False
+        stats["sources"].append("tampered")
+        fresh = lookup.get_scam_statistics("banking")
+        assert fresh["known"] is True
+        assert "tampered" not in fresh["sources"]
+
+    def test_unknown_types_are_not_cached(self, lookup):
+        """Test arbitrary scam types report unknown without growing the cache."""
+        assert lookup.get_scam_statistics("unknown") == {"known": False}
+        assert "unknown" not in lookup._stats_cache
+
+
+class TestKnownScammer:
+    """Test contact info checks against known scam patterns."""
+
+    @pytest.mark.parametrize("upi,expected", [
+        ("refund.desk@okaxis", True),
+        ("rahul@ybl", True),
+        ("CustomerCare123@upi", True),
+        ("shop@paytm", True),
+        ("rahul@okicici", False),
+        ("ybl@okhdfc", False),
+    ])
+    def test_suspicious_upi(self, lookup, upi, expected):
+        """Test UPI IDs are matched against every suspicious pattern."""
+        assert lookup._is_suspicious_upi(upi) is expected
+
+    @pytest.mark.parametrize("url,expected", [
+        ("https://BIT.LY/abc", True),
+        ("http://free-prize.xyz", True),
+        ("http://secure-Login.example/Bank", True),
+        ("https://sbi.co.in/login", False),
+        ("http://prize.xyz/claim", False),
+    ])
+    def test_suspicious_url(self, lookup, url, expected):
+        """Test URLs are checked case-insensitively against phishing patterns."""
+        assert lookup.check_known_scammer(url=url)[0] is expected
+
+
+class TestScamReport:
+    """Test the report record."""
+
+    def test_reports_are_read_only(self):
+        """Test known reports can't be modified in place."""
+        report = KNOWN_SCAM_DATABASE["banking"][0]
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            report.victims_count = 0
@@ -0,0 +1,160 @@
+"""
+Scammer verifier tests.
+"""
+import hashlib
+import json
+
+import pytest
+
+from core.scammer_verifier import ScammerVerifier
+
+
+@pytest.fixture
+def verifier(tmp_path):
+    """Verifier backed by a temporary database file."""
+    return ScammerVerifier(database_path=str(tmp_path / "scammer_database.json"))
+
+
+class TestVerifyUpi:
+    """Test UPI ID risk analysis."""
+
+    @pytest.mark.parametrize("upi", ["9876543210@ybl", "abc123456@paytm", "supportdesk@ybl", "myrefund@okaxis"])
+    def test_suspicious_patterns(self, verifier, upi):
+        """Test bot-like and impersonation handles match a suspicious pattern."""
+        assert "Matches suspicious pattern" in verifier.verify_upi(upi).reasons
+
+    def test_ordinary_handle(self, verifier):
+        """Test a plain personal handle on a known PSP is low risk."""
+        result = verifier.verify_upi("rahul.sharma@ybl")
+
+        assert not result.is_suspicious
+        assert result.reasons == []
+        assert result.risk_level == "low"
+
+    def test_repeat_lookup_sees_new_report(self, verifier):
+        """Test a repeated check reflects a report made in between."""
+        upi = "supportdesk@ybl"
+        before = verifier.verify_upi(upi)
+        verifier.report_scammer(upi, "upi", "banking")
+        after = verifier.verify_upi(upi)
+
+        assert after.reasons == ["Previously reported 1 time(s)"] + before.reasons
+        assert after.reported_count == 1
+        assert after.risk_score > before.risk_score
+
+    def test_confirmed_scammer_skips_analysis(self, tmp_path):
+        """Test an identifier reported fast_path_threshold times is critical on its reports alone."""
+        verifier = ScammerVerifier(database_path=str(tmp_path / "db.json"), fast_path_threshold=2)
+        for _ in range(2):
+            verifier.report_scammer("rahul.sharma@ybl", "upi", "banking")
+
+        result = verifier.verify_upi("rahul.sharma@ybl")
+        assert result.risk_level == "critical"
+        assert result.risk_score == 1.0
+        assert result.reasons == ["Previously reported 2 time(s)"]
+        assert result.associated_scam_types == ["banking"]
+
+
+class TestVerifyBankAccount:
+    """Test bank account checks."""
+
+    def test_ifsc_format(self, verifier):
+        """Test IFSC codes are validated case-insensitively."""
+        assert verifier.verify_bank_account("123456789012", "sbin0001234").reasons == []
+        assert "Invalid IFSC code format" in verifier.verify_bank_account("123456789012", "SBI00012").reasons
+
+
+class TestVerifyUrl:
+    """Test phishing URL checks."""
+
+    def test_ip_address_host(self, verifier):
+        """Test a raw IP address host is flagged."""
+        result = verifier.verify_url("http://192.168.10.5/login")
+
+        assert "Uses IP address instead of domain name" in result.reasons
+        assert result.is_suspicious
+
+    def test_shortener_and_brand_impersonation(self, verifier):
+        """Test shorteners, impersonated brands and phishing paths are each reported once."""
+        result = verifier.verify_url("https://bit.ly/sbi-statebank-paytm-login-verify")
+
+        assert result.reasons == [
+            "Uses URL shortener (bit.ly) - hides real destination",
+            "Possible SBI impersonation",
+            "Possible PAYTM impersonation",
+            "Contains phishing-related path keywords",
+        ]
+        assert result.risk_level == "critical"
+
+    def test_domain_checks_use_hostname(self, verifier):
+        """Test shortener and TLD checks look at the host, not the rest of the URL."""
+        assert verifier.verify_url("https://secret.com/?next=bit.ly").reasons == []
+        assert verifier.verify_url("http://free-prize.xyz/claim").reasons == ["Suspicious domain extension (.xyz)"]
+
+    def test_real_brand_domain(self, verifier):
+        """Test a brand's own domain is not flagged as impersonation."""
+        assert verifier.verify_url("https://www.sbi.co.in").reasons == []
+
+    @pytest.mark.parametrize("url", [
+        "https://sbi.co.in.secure-verify.xyz/login",
+        "https://notsbi.co.in",
+        "http://evil.example/sbi.com",
+    ])
+    def test_brand_domain_outside_hostname(self, verifier, url):
+        """Test a brand domain only counts as real when it is the URL's own host."""
+        assert "Possible SBI impersonation" in verifier.verify_url(url).reasons
+
+    def test_brand_subdomain_without_scheme(self, verifier):
+        """Test subdomains of a brand's domain are real, with or without a scheme."""
+        assert verifier.verify_url("netbanking.hdfc.com/login").reasons == [
+            "Contains phishing-related path keywords",
+        ]
+
+
+class TestDatabase:
+    """Test the reported scammer database on disk."""
+
+    def test_reports_survive_reload(self, tmp_path):
+        """Test reported identifiers are found by a verifier loading the same file."""
+        path = str(tmp_path / "scammer_database.json")
+        ScammerVerifier(database_path=path).report_scammer("+919876543210", "phone", "banking")
+
+        result = ScammerVerifier(database_path=path).verify_phone("+919876543210")
+        assert result.reported_count == 1
+        assert result.associated_scam_types == ["banking"]
+
+    def test_reports_are_logged_until_flush(self, tmp_path):
+        """Test reports are appended to the WAL and folded into the database file on flush()."""
+        path = tmp_path / "scammer_database.json"
+        verifier = ScammerVerifier(database_path=str(path))
+        for _ in range(3):
+            verifier.report_scammer("+919876543210", "phone", "banking")
+
+        assert not path.exists()
+        assert len(verifier.wal_path.read_bytes().splitlines()) == 3
+        assert ScammerVerifier(database_path=str(path)).verify_phone("+919876543210").reported_count == 3
+
+        verifier.flush()
+        assert not verifier.wal_path.exists()
+        reloaded = ScammerVerifier(database_path=str(path))
+        assert reloaded.verify_phone("+919876543210").reported_count == 3
+        assert reloaded.get_statistics()["total_reports"] == 3
+
+    def test_legacy_hash_keys_are_migrated(self, tmp_path):
+        """Test entries keyed by the old SHA-256 hash are found and re-keyed on lookup."""
+        path = tmp_path / "scammer_database.json"
+        legacy_hash = hashlib.sha256(b"refund.desk@ybl").hexdigest()[:16]
+        entry = {"identifier_masked": "ref***@ybl", "report_count": 2, "scam_types": ["refund"]}
+        path.write_text(json.dumps({
+            "upi_ids": {legacy_hash: entry}, "phone_numbers": {}, "bank_accounts": {}, "urls": {},
+            "metadata": {"total_reports": 2},
+        }))
+
+        verifier = ScammerVerifier(database_path=str(path))
+        assert verifier.verify_upi("Refund.Desk@ybl").reported_count == 2
+        verifier.report_scammer("refund.desk@ybl", "upi", "refund")
+        verifier.flush()
+
+        upi_ids = json.loads(path.read_text())["upi_ids"]
+        assert legacy_hash not in upi_ids
+        assert [e["report_count"] for e in upi_ids.values()] == [3]
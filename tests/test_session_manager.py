@@ -0,0 +1,137 @@
+"""
+Session manager tests.
+"""
+import json
+from datetime import datetime
+
+import pytest
+
+from api.models import ConversationState
+from core.session_manager import Session, SessionManager
+
+
+@pytest.fixture
+def manager():
+    """Session manager on in-memory storage."""
+    return SessionManager()
+
+
+class TestSessionStorage:
+    """Test saving and loading sessions."""
+
+    def test_round_trip(self, manager):
+        """Test a saved session loads back with its messages, state and intelligence."""
+        session = manager.create_session("s1", [{"role": "user", "content": "hello"}])
+        session.add_message("assistant", "hi, who is this?")
+        session.state = ConversationState.EXTRACT
+        session.update_intelligence({"upi_ids": ["refund@ybl"], "keywords": ["otp"]})
+        manager.update_session(session)
+
+        loaded = manager.get_session("s1")
+        assert [m["content"] for m in loaded.messages] == ["hello", "hi, who is this?"]
+        assert loaded.state == ConversationState.EXTRACT
+        assert loaded.intelligence["upi_ids"] == ["refund@ybl"]
+
+    def test_saves_append_only_new_messages(self, manager):
+        """Test each save appends the messages added since the last one."""
+        session = manager.create_session("s1", [{"role": "user", "content": "hello"}])
+        for turn in range(3):
+            session.add_message("user", f"message {turn}")
+            manager.update_session(session)
+
+        stored = manager._storage.get_list(manager._make_messages_key("s1"))
+        assert [json.loads(m)["content"] for m in stored] == ["hello", "message 0", "message 1", "message 2"]
+        assert "messages" not in json.loads(manager._storage.get(manager._make_key("s1")))
+        assert manager.get_active_sessions() == ["s1"]
+
+    def test_legacy_session_with_inline_messages(self, manager):
+        """Test a session stored with its messages inline loads and moves them to the list on save."""
+        legacy = Session(session_id="old")
+        legacy.add_message("user", "hello")
+        manager._storage.set(manager._make_key("old"), json.dumps(legacy.to_dict()))
+
+        session = manager.get_session("old")
+        assert [m["content"] for m in session.messages] == ["hello"]
+        session.add_message("assistant", "hi")
+        manager.update_session(session)
+
+        assert [m["content"] for m in manager.get_session("old").messages] == ["hello", "hi"]
+
+    def test_timestamps_are_epoch_ms(self, manager):
+        """Test timestamps are stored as epoch milliseconds and read back as UTC datetimes."""
+        session = manager.create_session("s1", [{"role": "user", "content": "hello"}])
+        stored = json.loads(manager._storage.get(manager._make_key("s1")))
+
+        assert isinstance(session.messages[0]["timestamp"], int)
+        assert stored["last_activity"] == session.messages[0]["timestamp"]
+        assert abs((manager.get_session("s1").created_at - datetime.utcnow()).total_seconds()) < 60
+
+    def test_iso_timestamps_from_older_sessions(self):
+        """Test sessions stored with ISO timestamps still load."""
+        session = Session.from_dict({
+            "session_id": "old",
+            "created_at": "2025-01-02T03:04:05.678000",
+            "last_activity": "2025-01-02T03:14:05",
+        })
+
+        assert session.created_at == datetime(2025, 1, 2, 3, 4, 5, 678000)
+        assert session.last_activity_ms - session.created_at_ms == 599322
+
+    def test_delete_removes_messages(self, manager):
+        """Test deleting a session also drops its message list."""
+        manager.create_session("s1", [{"role": "user", "content": "hello"}])
+
+        assert manager.delete_session("s1")
+        assert manager.get_session("s1") is None
+        assert manager._storage.get_list(manager._make_messages_key("s1")) == []
+
+
+class TestActiveSessions:
+    """Test active session listing."""
+
+    def test_scan_is_reused_until_sessions_change(self, manager, monkeypatch):
+        """Test stats reuse a recent scan, and creating or deleting a session refreshes it."""
+        manager.create_session("s1")
+        scans = []
+        keys = manager._storage.keys
+        monkeypatch.setattr(manager._storage, "keys", lambda pattern: scans.append(pattern) or keys(pattern))
+
+        assert manager.get_active_sessions() == ["s1"]
+        assert manager.get_stats()["active_sessions"] == 1
+        assert len(scans) == 1
+
+        manager.create_session("s2")
+        assert sorted(manager.get_active_sessions()) == ["s1", "s2"]
+        manager.delete_session("s1")
+        assert manager.get_active_sessions() == ["s2"]
+        assert len(scans) == 3
+
+
+class TestUpdateIntelligence:
+    """Test merging extracted intelligence into a session."""
+
+    def test_merge_keeps_order_without_duplicates(self):
+        """Test repeated items are added once, in first-seen order."""
+        session = Session(session_id="s1")
+        session.update_intelligence({"upi_ids": ["a@ybl", "b@ybl"], "phone_numbers": "not a list"})
+        session.update_intelligence({"upi_ids": ["b@ybl", "c@ybl", "a@ybl"]})
+
+        assert session.intelligence["upi_ids"] == ["a@ybl", "b@ybl", "c@ybl"]
+        assert session.intelligence["phone_numbers"] == []
+
+    def test_keywords_are_capped(self):
+        """Test only the first MAX_KEYWORDS distinct keywords are kept."""
+        session = Session(session_id="s1")
+        session.update_intelligence({"keywords": [f"k{i}" for i in range(15)]})
+        session.update_intelligence({"keywords": [f"k{i}" for i in range(10, 30)]})
+
+        assert session.intelligence["keywords"] == [f"k{i}" for i in range(20)]
+
+    def test_replaced_lists_are_respected(self):
+        """Test merging into a list loaded or replaced after earlier merges."""
+        session = Session(session_id="s1")
+        session.update_intelligence({"urls": ["http://a.xyz"]})
+        session.intelligence = {"urls": ["http://b.xyz", "http://b.xyz"]}
+        session.update_intelligence({"urls": ["http://a.xyz", "http://b.xyz"]})
+
+        assert session.intelligence["urls"] == ["http://b.xyz", "http://a.xyz"]
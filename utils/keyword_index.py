@@ -0,0 +1,109 @@
+"""
+Multi-keyword substring index.
+
+Finds which of many keywords occur in a text in a single pass, with the
+same result as testing ``keyword in text`` for each one.
+"""
+import re
+import sys
+from typing import Dict, FrozenSet, Iterable, List, Set, Tuple
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+def _trie_regex(trie: Dict) -> str:
+    """Render a character trie as a regex preferring the longest keyword."""
+    branches = [re.escape(char) + _trie_regex(child) for char, child in trie.items() if char]
+    if not branches:
+        return ""
+    if len(branches) == 1 and "" not in trie:
+        return branches[0]
+    group = "(?:" + "|".join(branches) + ")"
+    # A keyword ends here, so the rest is optional (greedy, so longer wins)
+    return group + "?" if "" in trie else group
+
+
+class KeywordIndex:
+    """
+    Index over a fixed keyword set.
+    Uses a pyahocorasick automaton when installed, otherwise a trie-shaped
+    regex that reports the longest keyword starting at each position.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = tuple(dict.fromkeys(sys.intern(kw) for kw in keywords if kw))
+
+        # Every keyword found inside each keyword, itself included, so a
+        # longest match also reports the shorter keywords it covers
+        self._contained: Dict[str, FrozenSet[str]] = {
+            kw: frozenset(other for other in self.keywords if other in kw)
+            for kw in self.keywords
+        }
+        # Keywords that are prefixes of each keyword, itself included. The regex
+        # matches at every offset, so occurrences further inside a keyword are
+        # reported by the match starting there
+        self._prefixes: Dict[str, Tuple[str, ...]] = {
+            kw: tuple(other for other in self._contained[kw] if kw.startswith(other))
+            for kw in self.keywords
+        }
+
+        self._automaton = None
+        self._regex = None
+        if ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for kw in self.keywords:
+                self._automaton.add_word(kw, kw)
+            self._automaton.make_automaton()
+        elif self.keywords:
+            trie: Dict = {}
+            for kw in self.keywords:
+                node = trie
+                for char in kw:
+                    node = node.setdefault(char, {})
+                node[""] = {}
+            self._regex = re.compile("(?=(" + _trie_regex(trie) + "))", re.DOTALL)
+
+    def find(self, text: str) -> Set[str]:
+        """
+        Find the indexed keywords occurring in text.
+
+        Args:
+            text: Text to scan (matched case-sensitively)
+
+        Returns:
+            Set of keywords that are substrings of text
+        """
+        if self._automaton is not None:
+            if not self.keywords:
+                return set()
+            return {kw for _, kw in self._automaton.iter(text)}
+        if self._regex is None:
+            return set()
+        contained = self._contained
+        return set().union(*[contained[kw] for kw in set(self._regex.findall(text))])
+
+    def find_all(self, text: str) -> List[Tuple[int, str]]:
+        """
+        Find every occurrence of the indexed keywords in text.
+
+        Args:
+            text: Text to scan (matched case-sensitively)
+
+        Returns:
+            List of (start offset, keyword) pairs, one per occurrence
+        """
+        if self._automaton is not None:
+            if not self.keywords:
+                return []
+            return [(end - len(kw) + 1, kw) for end, kw in self._automaton.iter(text)]
+        if self._regex is None:
+            return []
+        prefixes = self._prefixes
+        return [
+            (match.start(), kw)
+            for match in self._regex.finditer(text)
+            for kw in prefixes[match.group(1)]
+        ]
@@ -2,6 +2,7 @@
 Utility patterns for scam detection and intelligence extraction.
 """
 import re
+import sys
 from typing import List, Pattern
 
 # ============================================
@@ -205,3 +206,22 @@ LEGITIMATE_DOMAINS = [
     r"hdfcbank\.com$",
     r"icicibank\.com$"
 ]
+
+
+# ============================================
+# KEYWORD INTERNING
+# ============================================
+
+def _intern_keywords(keywords: List[str]) -> None:
+    """Intern keywords in place so each distinct keyword is one shared object."""
+    keywords[:] = [sys.intern(kw) for kw in keywords]
+
+
+for _keywords in (
+    URGENCY_KEYWORDS, FINANCIAL_KEYWORDS, AUTHORITY_KEYWORDS, THREAT_KEYWORDS,
+    REWARD_KEYWORDS, JOB_KEYWORDS, PHISHING_KEYWORDS, CRYPTO_KEYWORDS,
+    ROMANCE_KEYWORDS, TECH_SUPPORT_KEYWORDS, ARREST_KEYWORDS, WHITELIST_PHRASES,
+    *SCAM_TYPE_PATTERNS.values(), *SCAMMER_TYPE_PATTERNS.values(), *TACTIC_PATTERNS.values()
+):
+    _intern_keywords(_keywords)
+del _keywords
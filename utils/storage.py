@@ -2,7 +2,7 @@
 Storage abstraction layer for session management.
 """
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from datetime import datetime, timedelta
 import json
 import logging
@@ -37,6 +37,16 @@ class StorageBackend(ABC):
     def keys(self, pattern: str = "*") -> list:
         """Get keys matching pattern."""
         pass
+    
+    @abstractmethod
+    def append_list(self, key: str, values: List[str], expiry_seconds: Optional[int] = None) -> bool:
+        """Append values to the list at key, (re)setting its expiry."""
+        pass
+    
+    @abstractmethod
+    def get_list(self, key: str) -> List[str]:
+        """Get all values of the list at key (empty if missing)."""
+        pass
 
 
 class InMemoryStorage(StorageBackend):
@@ -97,6 +107,27 @@ class InMemoryStorage(StorageBackend):
         prefix = pattern.rstrip("*")
         return [k for k in self._store.keys() if k.startswith(prefix)]
     
+    def append_list(self, key: str, values: List[str], expiry_seconds: Optional[int] = None) -> bool:
+        """Append values to the list at key, (re)setting its expiry."""
+        try:
+            if self.get(key) is None:  # Missing or expired
+                self._store[key] = {"value": [], "expiry": None}
+            
+            item = self._store[key]
+            item["value"].extend(values)
+            
+            if expiry_seconds:
+                item["expiry"] = datetime.utcnow() + timedelta(seconds=expiry_seconds)
+            
+            return True
+        except Exception as e:
+            logger.error(f"Error appending to list {key}: {e}")
+            return False
+    
+    def get_list(self, key: str) -> List[str]:
+        """Get all values of the list at key (empty if missing or expired)."""
+        return list(self.get(key) or [])
+    
     def _cleanup_expired(self):
         """Remove expired keys."""
         now = datetime.utcnow()
@@ -168,11 +199,33 @@ class RedisStorage(StorageBackend):
             return False
     
     def keys(self, pattern: str = "*") -> list:
-        """Get keys matching pattern."""
+        """Get keys matching pattern (incremental SCAN, so Redis isn't blocked)."""
+        try:
+            return list(self._client.scan_iter(match=pattern, count=500))
+        except Exception as e:
+            logger.error(f"Redis SCAN error for {pattern}: {e}")
+            return []
+    
+    def append_list(self, key: str, values: List[str], expiry_seconds: Optional[int] = None) -> bool:
+        """Append values to the list at key, (re)setting its expiry, in one round trip."""
+        try:
+            pipe = self._client.pipeline(transaction=False)
+            if values:
+                pipe.rpush(key, *values)
+            if expiry_seconds:
+                pipe.expire(key, expiry_seconds)
+            pipe.execute()
+            return True
+        except Exception as e:
+            logger.error(f"Redis RPUSH error for {key}: {e}")
+            return False
+    
+    def get_list(self, key: str) -> List[str]:
+        """Get all values of the list at key."""
         try:
-            return self._client.keys(pattern)
+            return self._client.lrange(key, 0, -1)
         except Exception as e:
-            logger.error(f"Redis KEYS error for {pattern}: {e}")
+            logger.error(f"Redis LRANGE error for {key}: {e}")
             return []
 
 
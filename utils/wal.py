@@ -0,0 +1,122 @@
+"""
+Append-only write-ahead log.
+
+Stores that keep a full JSON snapshot on disk log each change as one JSON
+line, replay the log on top of the snapshot at startup, and reset it once
+a new snapshot supersedes it.
+"""
+import json
+import logging
+import os
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+# orjson is several times faster than stdlib json; fall back if not installed
+try:
+    import orjson
+
+    def _dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+    _loads = orjson.loads
+except ImportError:
+    orjson = None
+
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode()
+
+    _loads = json.loads
+
+
+class WriteAheadLog:
+    """
+    Log of changes made since a store's last snapshot.
+    The file is opened on the first append. Callers serialize access.
+    """
+
+    def __init__(self, path: str, name: str, sync: bool = False):
+        """
+        Args:
+            path: Log file path
+            name: Store name used in log messages
+            sync: Flush every append instead of waiting for flush()
+        """
+        self.path = path
+        self.name = name
+        self.sync = sync
+        self.entries = 0  # Entries since the last snapshot
+        self._dirty = 0  # Entries appended since the last flush
+        self._file = None
+
+    @property
+    def is_open(self) -> bool:
+        return self._file is not None
+
+    def replay(self, apply: Callable[[Dict[str, Any]], None]):
+        """Apply each logged entry in order, dropping a torn final line."""
+        try:
+            with open(self.path, 'r+b') as f:
+                offset = good_end = 0
+                line = b""
+                for line in f:
+                    offset += len(line)
+                    try:
+                        apply(_loads(line))
+                    except Exception:
+                        # A torn final line from a crash; everything before it is applied
+                        logger.warning(f"Skipping unreadable {self.name} WAL entry")
+                        continue
+                    good_end = offset
+                    self.entries += 1
+
+                # Make sure the next append starts on a line of its own
+                if good_end < offset:
+                    f.truncate(good_end)
+                elif not line.endswith(b"\n") and offset:
+                    f.write(b"\n")
+            if self.entries:
+                logger.info(f"Replayed {self.entries} {self.name} WAL entries")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.error(f"Error replaying {self.name} WAL: {e}")
+
+    def append(self, entry: Dict[str, Any]):
+        """Append one change to the log."""
+        try:
+            if self._file is None:
+                self._file = open(self.path, 'ab')
+            self._file.write(_dumps(entry) + b"\n")
+            if self.sync:
+                self._file.flush()
+            else:
+                self._dirty += 1
+            self.entries += 1
+        except Exception as e:
+            logger.error(f"Error writing {self.name} WAL: {e}")
+
+    def flush(self):
+        """Flush buffered appends to the file."""
+        if self._dirty and self._file is not None:
+            try:
+                self._file.flush()
+            except Exception as e:
+                logger.error(f"Error flushing {self.name} WAL: {e}")
+        self._dirty = 0
+
+    def close(self):
+        """Flush and close the file; the next append reopens it."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._dirty = 0
+
+    def reset(self):
+        """Drop the log once a new snapshot supersedes it."""
+        self.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        self.entries = 0